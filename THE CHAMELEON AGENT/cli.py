@@ -0,0 +1,244 @@
+"""
+Chameleon Agent - Offline Scoring CLI
+Streams a JSONL or CSV dump of messages through scam detection and entity
+extraction on every core, writing one JSON result per line
+
+Usage:
+    python cli.py reports.jsonl -o scored.jsonl
+    python cli.py export.csv --field text --id-field report_id -o scored.jsonl
+    python cli.py reports.jsonl -o scored.jsonl --resume
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple, TextIO
+
+from src.batch.batch_scorer import init_worker, score_message
+
+logger = logging.getLogger("chameleon.cli")
+
+# (offset, next_offset, record id, message, parse error) for one input record.
+# next_offset is the byte position right after the record: resuming there
+# continues with the following record.
+Record = Tuple[int, int, Any, Optional[str], Optional[str]]
+
+
+def read_jsonl(path: str, start: int, field: str, id_field: Optional[str]) -> Iterator[Record]:
+    """Stream records from a JSONL file, starting at byte offset `start`"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            next_offset = offset + len(line)
+            if line.strip():
+                try:
+                    obj = json.loads(line)
+                    record_id = obj.get(id_field) if id_field else None
+                    yield offset, next_offset, record_id, str(obj[field]), None
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    yield offset, next_offset, None, None, f"Unreadable record: {e!r}"
+            offset = next_offset
+
+
+def read_csv(path: str, start: int, field: str, id_field: Optional[str]) -> Iterator[Record]:
+    """Stream records from a CSV file with a header row, starting at byte offset `start`"""
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8-sig")]))
+        if field not in header:
+            raise ValueError(f"Column '{field}' not found in CSV header: {header}")
+
+        offset = max(start, len(header_line))
+        f.seek(offset)
+        position = offset
+
+        def lines() -> Iterator[str]:
+            # csv.reader pulls exactly the lines of one record (quoted fields may
+            # span several), so `position` is the end of the record just parsed
+            nonlocal position
+            for raw in f:
+                position += len(raw)
+                yield raw.decode("utf-8", errors="replace")
+
+        for row in csv.reader(lines()):
+            if row:
+                record = dict(zip(header, row))
+                record_id = record.get(id_field) if id_field else None
+                if field in record:
+                    yield offset, position, record_id, record[field], None
+                else:
+                    yield offset, position, record_id, None, f"Missing column '{field}'"
+            offset = position
+
+
+def score_records(records: List[Record]) -> List[Dict[str, Any]]:
+    """Score one chunk of records (the unit of work sent to a pool process)"""
+    results = []
+    for offset, next_offset, record_id, message, error in records:
+        result: Dict[str, Any] = {"offset": offset, "next_offset": next_offset}
+        if record_id is not None:
+            result["id"] = record_id
+        if error is not None:
+            result["error"] = error
+        else:
+            result.update(score_message(message))
+        results.append(result)
+    return results
+
+
+def chunked(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    """Group records into lists of `size`"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def resume_offset(output_path: str) -> int:
+    """
+    Input offset to resume from, taken from the last complete line of the output
+
+    A trailing partial line (the process died mid-write) is truncated away.
+    """
+    if not os.path.exists(output_path):
+        return 0
+
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        block = 64 * 1024
+        tail = b""
+        pos = end
+        # Read backwards until the tail holds one complete line
+        while pos > 0 and tail.count(b"\n") < 2:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+
+        if not tail.endswith(b"\n"):
+            cut = tail.rfind(b"\n") + 1
+            f.truncate(pos + cut)
+            tail = tail[:cut]
+
+        lines = tail.rstrip(b"\n").split(b"\n")
+        if not lines[-1]:
+            return 0
+        return json.loads(lines[-1])["next_offset"]
+
+
+class ThroughputReporter:
+    """Logs messages/sec and the resume offset at a fixed interval"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.count = 0
+        self.errors = 0
+        self.offset = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def update(self, results: List[Dict[str, Any]]) -> None:
+        self.count += len(results)
+        self.errors += sum(1 for result in results if "error" in result)
+        self.offset = results[-1]["next_offset"]
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report("progress")
+
+    def report(self, label: str) -> None:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        logger.info(f"{label}: {self.count} messages ({self.errors} unreadable) in {elapsed:.1f}s, "
+                    f"{self.count / elapsed:.0f} msg/s, resume offset {self.offset}")
+
+
+def run(args: argparse.Namespace) -> ThroughputReporter:
+    """Score the input file and write results; returns the final counters"""
+    input_format = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+
+    start = args.start_offset
+    if args.resume:
+        if args.output == "-":
+            raise ValueError("--resume needs an --output file")
+        start = resume_offset(args.output)
+        logger.info(f"Resuming at byte offset {start}")
+
+    reader = read_csv if input_format == "csv" else read_jsonl
+    chunks = chunked(reader(args.input, start, args.field, args.id_field), args.chunk_size)
+    reporter = ThroughputReporter(args.progress_interval)
+    reporter.offset = start
+
+    out: TextIO = sys.stdout if args.output == "-" else open(
+        args.output, "a" if start and args.resume else "w", encoding="utf-8"
+    )
+
+    def write(results: List[Dict[str, Any]]) -> None:
+        out.write("".join(json.dumps(result) + "\n" for result in results))
+        out.flush()
+        reporter.update(results)
+
+    try:
+        if args.workers == 1:
+            init_worker()
+            for chunk in chunks:
+                write(score_records(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+                # Bounded look-ahead keeps memory flat; results are written in input order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(score_records, chunk))
+                    if len(pending) >= args.workers * 2:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    reporter.report("done")
+    return reporter
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Score a JSONL/CSV dump of messages for scams and extract intelligence (no LLM)."
+    )
+    parser.add_argument("input", help="JSONL or CSV file of messages")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from extension)")
+    parser.add_argument("--field", default="message", help="JSON key / CSV column holding the message")
+    parser.add_argument("--id-field", help="JSON key / CSV column copied to each result as 'id'")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Messages per unit of work")
+    parser.add_argument("--start-offset", type=int, default=0, help="Input byte offset to start at")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue after the last result in --output (appends to it)")
+    parser.add_argument("--progress-interval", type=float, default=5.0,
+                        help="Seconds between throughput reports")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+    logging.getLogger("src.extraction").setLevel(logging.WARNING)
+    run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
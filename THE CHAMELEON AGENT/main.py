@@ -4,12 +4,15 @@ Agentic Honey-Pot for Scam Detection & Intelligence Extraction
 """
 
 from fastapi import FastAPI, Header, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import os
+import json
+import asyncio
 from dotenv import load_dotenv
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 # Load environment variables
@@ -24,27 +27,53 @@ logger = logging.getLogger(__name__)
 
 # Import our modules (will create these next)
 from src.detection.scam_detector import ScamDetector
+from src.detection.campaigns import create_campaign_clusterer
 from src.personas.persona_manager import PersonaManager
 from src.agent.conversation_manager import ConversationManager
 from src.extraction.entity_extractor import EntityExtractor
-from src.api.response_models import HoneypotResponse
+from src.batch.batch_scorer import BatchScorer
+from src.api.response_models import HoneypotResponse, BatchResponse
+from src.storage.intel_index import KINDS
+from src.monitoring.metrics import REGISTRY, STAGE_SECONDS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Rebuild state from the event log on startup; on shutdown release pooled LLM
+    connections and batch workers and save the intelligence index
+    """
+    if os.getenv("EVENT_LOG_REPLAY", "true").lower() == "true":
+        conversation_manager.restore_from_log(max_age_seconds=float(os.getenv("STATE_TTL_SECONDS", "86400")))
+    yield
+    await conversation_manager.aclose()
+    if conversation_manager.intel_index is not None and os.getenv("INTEL_INDEX_PATH"):
+        conversation_manager.intel_index.save(os.getenv("INTEL_INDEX_PATH"))
+    batch_scorer.close()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Chameleon Agent - Agentic Honey-Pot",
     description="AI-powered honeypot for scam detection and intelligence extraction",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Initialize components
 scam_detector = ScamDetector()
+campaign_clusterer = create_campaign_clusterer()
 persona_manager = PersonaManager()
 conversation_manager = ConversationManager()
 entity_extractor = EntityExtractor()
+batch_scorer = BatchScorer()
 
 # API Key from environment
 HONEYPOT_API_KEY = os.getenv("HONEYPOT_API_KEY", "default_key_change_me")
 
+# Largest accepted /honeypot/batch request
+BATCH_MAX_MESSAGES = int(os.getenv("BATCH_MAX_MESSAGES", "10000"))
+
 
 # Request Models
 class ConversationMessage(BaseModel):
@@ -58,11 +87,16 @@ class HoneypotRequest(BaseModel):
     history: Optional[List[ConversationMessage]] = Field(default=[], description="Conversation history")
 
 
+class BatchRequest(BaseModel):
+    messages: List[str] = Field(..., description="Messages to score")
+    generate_replies: bool = Field(default=False, description="Also generate an opening agent reply per message (calls the LLM)")
+
+
 # Middleware for API Key Authentication
 @app.middleware("http")
 async def verify_api_key(request: Request, call_next):
-    """Verify API key for all requests except health check"""
-    if request.url.path == "/health":
+    """Verify API key for all requests except health/readiness checks and metrics scrapes"""
+    if request.url.path in ("/health", "/ready", "/metrics"):
         return await call_next(request)
     
     api_key = request.headers.get("X-API-Key")
@@ -86,12 +120,90 @@ async def verify_api_key(request: Request, call_next):
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
+    llm_client = conversation_manager.llm_client
+    llm_cache = llm_client.cache
     return {
         "status": "healthy",
         "service": "chameleon-agent",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "llm_cache": llm_cache.stats() if llm_cache is not None else None,
+        "llm_backends": llm_client.router.stats(),
+        "llm_context_cache": llm_client.context_cache.stats() if llm_client.context_cache is not None else None,
+        "fast_reply": conversation_manager.fast_reply.stats() if conversation_manager.fast_reply is not None else None,
+        "event_log": conversation_manager.event_log.stats() if conversation_manager.event_log is not None else None,
+        "intel_index": conversation_manager.intel_index.stats() if conversation_manager.intel_index is not None else None,
+        "campaigns": campaign_clusterer.stats() if campaign_clusterer is not None else None
+    }
+
+
+# Readiness Endpoint
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: the first probe starts loading the LLM client in the background;
+    503 until it is ready, so no user request pays for the import
+    """
+    if not conversation_manager.warm_up():
+        return JSONResponse(status_code=503, content={"status": "warming"})
+    return {"status": "ready"}
+
+
+# Metrics Endpoint
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint (per-process counters; scrape every worker)"""
+    return Response(content=REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
+
+def assign_campaign(message: str, scam_analysis: Dict[str, Any]) -> Optional[str]:
+    """Campaign ID of a message detected as a scam (None otherwise or when clustering is off)"""
+    if campaign_clusterer is None or not scam_analysis['is_scam']:
+        return None
+    with STAGE_SECONDS.time(stage="campaign"):
+        return campaign_clusterer.assign(message, scam_analysis.get('scam_type'))
+
+
+def build_honeypot_response(
+    request: HoneypotRequest,
+    scam_analysis: Dict[str, Any],
+    persona: Any,
+    agent_response: str,
+    campaign_id: Optional[str] = None
+) -> HoneypotResponse:
+    """Run extraction and assemble the API response once the agent has replied"""
+    # Step 4: Extract intelligence from conversation history + new message
+    # (only text not scanned on earlier turns is processed)
+    all_messages = [msg.content for msg in request.history] + [request.message, agent_response]
+    with STAGE_SECONDS.time(stage="extraction"):
+        extracted_intelligence = conversation_manager.extract_intelligence(
+            request.conversation_id, all_messages, entity_extractor
+        )
+    
+    # Step 5: Calculate engagement metrics
+    session = conversation_manager.get_conversation_metrics(request.conversation_id)
+    engagement_metrics = {
+        "turn_count": len(request.history) + 1,
+        "engagement_duration_seconds": session["engagement_duration_seconds"],
+        "persona_used": persona.name,
+        "extraction_success_rate": extracted_intelligence.get("extraction_count", 0) / max(len(request.history), 1)
     }
+    
+    # Step 6: Build response
+    return HoneypotResponse(
+        scam_detected=scam_analysis['is_scam'],
+        scam_type=scam_analysis.get('scam_type', 'unknown'),
+        confidence=scam_analysis.get('confidence', 0.0),
+        agent_response=agent_response,
+        extracted_intelligence=extracted_intelligence.get('extracted_data', {}),
+        engagement_metrics=engagement_metrics,
+        metadata={
+            "conversation_id": request.conversation_id,
+            "campaign_id": campaign_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "model_version": "chameleon-v1.0"
+        }
+    )
 
 
 # Main Honeypot Endpoint
@@ -104,62 +216,173 @@ async def honeypot_endpoint(request: HoneypotRequest):
     try:
         logger.info(f"Processing conversation: {request.conversation_id}")
         
-        # Step 1: Detect scam intent and type
-        scam_analysis = scam_detector.analyze(request.message, request.history)
+        with STAGE_SECONDS.time(stage="total"):
+            # Step 1: Detect scam intent and type
+            with STAGE_SECONDS.time(stage="detection"):
+                scam_analysis = scam_detector.analyze(request.message, request.history)
+            campaign_id = assign_campaign(request.message, scam_analysis)
+            
+            logger.info(f"Scam detected: {scam_analysis['is_scam']}, Type: {scam_analysis.get('scam_type')}, Confidence: {scam_analysis.get('confidence')}")
+            
+            # Step 2: Select appropriate persona based on scam type
+            with STAGE_SECONDS.time(stage="persona_selection"):
+                persona = persona_manager.select_persona(scam_analysis['scam_type'])
+            
+            # Step 3: Generate agent response using conversation manager
+            # (includes prompt_build, the reply cache lookup and the LLM call)
+            with STAGE_SECONDS.time(stage="response_generation"):
+                agent_response = await conversation_manager.generate_response(
+                    message=request.message,
+                    conversation_id=request.conversation_id,
+                    history=request.history,
+                    persona=persona,
+                    scam_type=scam_analysis['scam_type'],
+                    turn_count=len(request.history) + 1
+                )
+            
+            response = build_honeypot_response(request, scam_analysis, persona, agent_response, campaign_id)
         
-        logger.info(f"Scam detected: {scam_analysis['is_scam']}, Type: {scam_analysis.get('scam_type')}, Confidence: {scam_analysis.get('confidence')}")
-        
-        # Step 2: Select appropriate persona based on scam type
-        persona = persona_manager.select_persona(scam_analysis['scam_type'])
+        logger.info(f"Response generated successfully for {request.conversation_id}")
+        return response
         
-        # Step 3: Generate agent response using conversation manager
-        agent_response = await conversation_manager.generate_response(
-            message=request.message,
-            conversation_id=request.conversation_id,
-            history=request.history,
-            persona=persona,
-            scam_type=scam_analysis['scam_type'],
-            turn_count=len(request.history) + 1
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
         )
+
+
+# Streaming Honeypot Endpoint
+@app.post("/honeypot/stream")
+async def honeypot_stream_endpoint(request: HoneypotRequest):
+    """
+    Streaming variant of /honeypot.
+    Emits newline-delimited JSON: {"type": "token", "text": ...} frames as the
+    LLM produces them, then one {"type": "final", "response": <HoneypotResponse>}
+    frame carrying detection, extraction and engagement metrics.
+    """
+    logger.info(f"Streaming conversation: {request.conversation_id}")
+    
+    scam_analysis = scam_detector.analyze(request.message, request.history)
+    campaign_id = assign_campaign(request.message, scam_analysis)
+    persona = persona_manager.select_persona(scam_analysis['scam_type'])
+    
+    async def frames():
+        parts = []
+        try:
+            async for chunk in conversation_manager.stream_response(
+                message=request.message,
+                conversation_id=request.conversation_id,
+                history=request.history,
+                persona=persona,
+                scam_type=scam_analysis['scam_type'],
+                turn_count=len(request.history) + 1
+            ):
+                parts.append(chunk)
+                yield json.dumps({"type": "token", "text": chunk}) + "\n"
+            
+            response = build_honeypot_response(request, scam_analysis, persona, "".join(parts).strip(), campaign_id)
+            yield json.dumps({"type": "final", "response": response.model_dump()}) + "\n"
         
-        # Step 4: Extract intelligence from conversation history + new message
-        all_messages = [msg.content for msg in request.history] + [request.message, agent_response]
-        extracted_intelligence = entity_extractor.extract(all_messages)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming response: {str(e)}", exc_info=True)
+            yield json.dumps({"type": "error", "detail": f"Internal server error: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+
+# Batch Scoring Endpoint
+@app.post("/honeypot/batch", response_model=BatchResponse)
+async def honeypot_batch_endpoint(request: BatchRequest):
+    """
+    Score many messages in one call: scam detection and entity extraction
+    across a process pool, results in request order. No conversation state is
+    touched and no LLM reply is generated unless generate_replies is set.
+    """
+    if len(request.messages) > BATCH_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.messages)} messages (max {BATCH_MAX_MESSAGES})"
+        )
+    
+    try:
+        logger.info(f"Scoring batch of {len(request.messages)} messages")
+        results = await batch_scorer.score_async(request.messages)
+        if campaign_clusterer is not None:
+            await asyncio.to_thread(assign_batch_campaigns, request.messages, results)
         
-        # Step 5: Calculate engagement metrics
-        engagement_metrics = {
-            "turn_count": len(request.history) + 1,
-            "engagement_duration_seconds": (len(request.history) + 1) * 15,  # Estimate
-            "persona_used": persona.name,
-            "extraction_success_rate": extracted_intelligence.get("extraction_count", 0) / max(len(request.history), 1)
-        }
+        if request.generate_replies:
+            replies = await asyncio.gather(*(
+                generate_opening_reply(message, result["scam_type"])
+                for message, result in zip(request.messages, results)
+            ))
+            for result, reply in zip(results, replies):
+                result["agent_response"] = reply
         
-        # Step 6: Build response
-        response = HoneypotResponse(
-            scam_detected=scam_analysis['is_scam'],
-            scam_type=scam_analysis.get('scam_type', 'unknown'),
-            confidence=scam_analysis.get('confidence', 0.0),
-            agent_response=agent_response,
-            extracted_intelligence=extracted_intelligence.get('extracted_data', {}),
-            engagement_metrics=engagement_metrics,
-            metadata={
-                "conversation_id": request.conversation_id,
-                "timestamp": datetime.utcnow().isoformat(),
-                "model_version": "chameleon-v1.0"
-            }
+        return BatchResponse(
+            results=results,
+            total=len(results),
+            scams_detected=sum(1 for result in results if result["scam_detected"])
         )
         
-        logger.info(f"Response generated successfully for {request.conversation_id}")
-        return response
-        
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        logger.error(f"Error scoring batch: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
 
+def assign_batch_campaigns(messages: List[str], results: List[Dict[str, Any]]) -> None:
+    """Add the campaign ID of each message detected as a scam to its batch result"""
+    for message, result in zip(messages, results):
+        if result["scam_detected"]:
+            result["campaign_id"] = campaign_clusterer.assign(message, result["scam_type"])
+
+
+async def generate_opening_reply(message: str, scam_type: Optional[str]) -> str:
+    """First-turn persona reply to a standalone message (batch mode)"""
+    persona = persona_manager.select_persona(scam_type)
+    return await conversation_manager.llm_client.generate_response(
+        system_prompt=persona.get_system_prompt(scam_type, "trust_building", 1),
+        user_message=message
+    )
+
+
+# Intelligence Search Endpoint
+@app.get("/intel/search")
+async def intel_search_endpoint(value: str, kind: Optional[str] = None, limit: int = 100):
+    """
+    Look up a UPI ID, bank account, phone number or URL across all conversations
+    this worker has seen: how many, which personas engaged them, first/last seen.
+    Values are normalized (case, URL scheme, phone prefix) before lookup; without
+    `kind` every kind is tried.
+    """
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown kind '{kind}', expected one of {', '.join(KINDS)}")
+    if conversation_manager.intel_index is None:
+        raise HTTPException(status_code=503, detail="Intelligence index is disabled (INTEL_INDEX=off)")
+    
+    results = conversation_manager.intel_index.search(value, kind, max(limit, 0))
+    return {"query": value, "results": results}
+
+
+# Campaigns Endpoint
+@app.get("/campaigns")
+async def campaigns_endpoint(limit: int = 20, active_within: Optional[float] = None):
+    """
+    Live view of scam campaigns (clusters of near-duplicate messages) seen by this
+    worker, largest first; `active_within` keeps only campaigns with a message in
+    the last that many seconds.
+    """
+    if campaign_clusterer is None:
+        raise HTTPException(status_code=503, detail="Campaign clustering is disabled (CAMPAIGNS=off)")
+    
+    return {"stats": campaign_clusterer.stats(), "campaigns": campaign_clusterer.top(max(limit, 0), active_within)}
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -170,6 +393,11 @@ async def root():
         "endpoints": {
             "health": "/health",
             "honeypot": "POST /honeypot",
+            "honeypot_stream": "POST /honeypot/stream",
+            "honeypot_batch": "POST /honeypot/batch",
+            "intel_search": "/intel/search?value=...",
+            "campaigns": "/campaigns",
+            "metrics": "/metrics",
             "docs": "/docs"
         },
         "description": "AI-powered honeypot for scam detection and intelligence extraction"
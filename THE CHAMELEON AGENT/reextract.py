@@ -0,0 +1,83 @@
+"""
+Chameleon Agent - Event Log Re-extraction
+Re-runs the current entity extractor over every conversation recorded in the
+event log (no LLM calls) and writes one JSON result per conversation with the
+entities found and what changed against the entities logged at the time
+
+Usage:
+    python reextract.py chameleon_events -o reextracted.jsonl
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+from typing import List, Dict, Any, Optional, TextIO
+
+from src.agent.conversation_manager import ConversationManager
+from src.extraction.entity_extractor import EntityExtractor, ENTITY_KEYS
+from src.storage.event_log import EventLog
+
+logger = logging.getLogger("chameleon.reextract")
+
+
+def entity_changes(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+    """Entities (by their identifying value) only in `after` ("added") or only in `before` ("removed")"""
+    changes = {}
+    for entity_type, key in ENTITY_KEYS.items():
+        old = {entity[key] for entity in before.get(entity_type, [])}
+        new = {entity[key] for entity in after.get(entity_type, [])}
+        if old != new:
+            changes[entity_type] = {"added": sorted(new - old), "removed": sorted(old - new)}
+    return changes
+
+
+def run(args: argparse.Namespace) -> Dict[str, int]:
+    """Re-extract every logged conversation; returns counters"""
+    extractor = EntityExtractor()
+    conversations = ConversationManager.logged_conversations(EventLog(args.event_log))
+    counts = {"conversations": 0, "changed": 0}
+
+    out: TextIO = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for conversation_id, conversation in conversations.items():
+            result = extractor.extract(conversation["messages"])
+            changes = entity_changes(conversation["extracted_data"], result["extracted_data"])
+            out.write(json.dumps({
+                "conversation_id": conversation_id,
+                "messages": len(conversation["messages"]),
+                "extracted_data": result["extracted_data"],
+                "changes": changes
+            }) + "\n")
+            counts["conversations"] += 1
+            counts["changed"] += bool(changes)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    logger.info(f"Re-extracted {counts['conversations']} conversations, {counts['changed']} with different entities")
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Re-run entity extraction over the conversations in the event log (no LLM)."
+    )
+    parser.add_argument("event_log", help="Event log directory (EVENT_LOG_DIR)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+    logging.getLogger("src.extraction").setLevel(logging.WARNING)
+    run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
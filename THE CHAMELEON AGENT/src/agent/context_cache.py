@@ -0,0 +1,99 @@
+"""
+Context Cache
+Tracks provider-side cached contents (Gemini cachedContents) for the static
+persona system prompts, so each turn only sends the conversation delta
+"""
+
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from src.monitoring.metrics import CONTEXT_CACHE
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+class ContextCache:
+    """
+    Registry of cached-content handles keyed on backend and system prompt
+
+    A handle is reused until shortly before its provider-side TTL runs out,
+    then a new one is created on the next call. When the provider refuses to
+    cache a prompt (e.g. below its minimum size), the refusal is remembered
+    for a while and the prompt is sent inline instead. Handles are per
+    process: each worker registers its own.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, retry_seconds: float = 600):
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        # Renew before the provider drops the handle under an in-flight call
+        self.refresh_margin = min(60.0, ttl_seconds / 10)
+        # key -> (handle name, or None when the prompt is sent inline; valid until)
+        self._handles: Dict[CacheKey, Tuple[Optional[str], float]] = {}
+        self._creating: Dict[CacheKey, "asyncio.Future[Optional[str]]"] = {}
+
+    @staticmethod
+    def make_key(backend: str, system_prompt: str) -> CacheKey:
+        return backend, hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: CacheKey) -> Tuple[bool, Optional[str]]:
+        """(known, handle name) for key; known is False once the entry expired"""
+        entry = self._handles.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            return False, None
+        return True, entry[0]
+
+    async def get_or_create(self, key: CacheKey, create: Callable[[float], Awaitable[str]]) -> Optional[str]:
+        """
+        Handle name for key, registering the prompt with `create(ttl_seconds)`
+        if there is no live handle
+
+        Concurrent calls for the same key share a single creation request.
+
+        Returns:
+            The cached content name, or None if the prompt must be sent inline
+        """
+        known, name = self.lookup(key)
+        if known:
+            CONTEXT_CACHE.inc(outcome="hit" if name else "inline")
+            return name
+
+        pending = self._creating.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._create(key, create))
+            self._creating[key] = pending
+            pending.add_done_callback(lambda _: self._creating.pop(key, None))
+        # Shielded: a caller cancelled mid-creation (hedge loser) must not
+        # cancel the creation others are waiting for
+        return await asyncio.shield(pending)
+
+    async def _create(self, key: CacheKey, create: Callable[[float], Awaitable[str]]) -> Optional[str]:
+        try:
+            name = await create(self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Context caching unavailable for {key[0]}, sending prompt inline: {e!r}")
+            self._handles[key] = (None, time.monotonic() + self.retry_seconds)
+            CONTEXT_CACHE.inc(outcome="unsupported")
+            return None
+
+        self._handles[key] = (name, time.monotonic() + self.ttl_seconds - self.refresh_margin)
+        CONTEXT_CACHE.inc(outcome="created")
+        return name
+
+    def invalidate(self, key: CacheKey) -> None:
+        """Forget a handle the provider no longer recognises"""
+        self._handles.pop(key, None)
+        CONTEXT_CACHE.inc(outcome="invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        live = [name for name, valid_until in self._handles.values() if valid_until > now]
+        return {
+            "handles": sum(1 for name in live if name),
+            "inline_prompts": sum(1 for name in live if not name),
+            "ttl_seconds": self.ttl_seconds
+        }
@@ -3,10 +3,20 @@ Conversation Manager
 Manages multi-turn conversations with strategic engagement phases
 """
 
-from typing import List, Dict, Any, Optional
+import time
+import asyncio
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 import logging
 from src.personas.persona_manager import Persona
 from src.agent.llm_client import LLMClient
+from src.agent.response_cache import ResponseCache
+from src.agent.fast_reply import FastReplyEngine, create_fast_reply_engine
+from src.agent.turn_coalescer import TurnCoalescer
+from src.extraction.entity_extractor import EntityExtractor
+from src.storage.state_store import StateStore, create_state_store
+from src.storage.event_log import EventLog, create_event_log
+from src.storage.intel_index import IntelIndex, create_intel_index
+from src.monitoring.metrics import STAGE_SECONDS, LIVE_SESSIONS, FAST_REPLIES
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +24,69 @@ logger = logging.getLogger(__name__)
 class ConversationManager:
     """Manages conversation state and generates strategic responses"""
     
-    def __init__(self):
-        self.llm_client = LLMClient()
-        # In-memory conversation state (for hackathon; use Redis for production)
-        self.conversations: Dict[str, Dict[str, Any]] = {}
+    # History messages included in the response cache key (the prompt shows 6,
+    # but the last couple decide the reply; more would make every key unique)
+    CACHE_HISTORY_MESSAGES = 2
+    
+    # State fields a turn owns; everything else (extraction) may be written concurrently
+    TURN_FIELDS = ("persona", "scam_type", "turn_count", "phase", "last_response")
+    
+    def __init__(
+        self,
+        state_store: Optional[StateStore] = None,
+        fast_reply: Optional[FastReplyEngine] = None,
+        event_log: Optional[EventLog] = None,
+        intel_index: Optional[IntelIndex] = None
+    ):
+        # Built on first use (an LLM call or the /ready warm-up), so workers that only
+        # detect and extract never load the HTTP client stack
+        self._llm_client: Optional[LLMClient] = None
+        self._warmup: Optional[asyncio.Task] = None
+        # Conversation state backend (memory, redis or sqlite; see STATE_BACKEND)
+        self.state_store = state_store if state_store is not None else create_state_store()
+        # Template replies for formulaic early turns (FAST_REPLY); None always asks the LLM
+        self.fast_reply = fast_reply if fast_reply is not None else create_fast_reply_engine()
+        # One turn at a time per conversation; messages sent mid-turn share the next reply
+        self.turns = TurnCoalescer()
+        # Durable record of turns and extraction results (EVENT_LOG); None keeps them in state only
+        self.event_log = event_log if event_log is not None else create_event_log()
+        # Entities across all conversations, for /intel/search (INTEL_INDEX); None disables it
+        self.intel_index = intel_index if intel_index is not None else create_intel_index()
+        LIVE_SESSIONS.set_function(lambda: len(self.state_store))
+    
+    @property
+    def llm_client(self) -> LLMClient:
+        """The LLM client, created on first access"""
+        if self._llm_client is None:
+            self._llm_client = LLMClient()
+        return self._llm_client
+    
+    @llm_client.setter
+    def llm_client(self, client: LLMClient) -> None:
+        self._llm_client = client
+    
+    def warm_up(self) -> bool:
+        """
+        Start preparing the LLM client in the background (the first call does) and report progress
+        
+        Returns:
+            True once the client can serve a call without loading anything; a failed
+            warm-up is logged and retried on the next call
+        """
+        task = self._warmup
+        if task is not None and task.done() and (task.cancelled() or task.exception() is not None):
+            logger.warning(f"LLM client warm-up failed, retrying: {task.exception() if not task.cancelled() else 'cancelled'}")
+            task = None
+        if task is None:
+            task = self._warmup = asyncio.ensure_future(self.llm_client.warm())
+        return task.done()
+    
+    async def aclose(self) -> None:
+        """Release the LLM client's pooled connections, if it was ever created, and sync the event log"""
+        if self._llm_client is not None:
+            await self._llm_client.aclose()
+        if self.event_log is not None:
+            self.event_log.close()
     
     async def generate_response(
         self,
@@ -40,40 +109,182 @@ class ConversationManager:
             turn_count: Current turn number
             
         Returns:
-            Agent's response as the persona
+            Agent's response as the persona. Messages for the same conversation
+            that arrive while a reply is being generated get one joint reply.
         """
+        async with self.turns.turn(conversation_id, (message, history, turn_count)) as turn:
+            if turn.answered:
+                return turn.reply
+            message, history, turn_count = self._merge_messages(turn.items)
+            response = await self._respond(message, conversation_id, history, persona, scam_type, turn_count)
+            turn.resolve(response)
+            return response
+    
+    async def _respond(
+        self,
+        message: str,
+        conversation_id: str,
+        history: List[Any],
+        persona: Persona,
+        scam_type: str,
+        turn_count: int
+    ) -> str:
+        state, system_prompt, context = self._prepare_turn(
+            conversation_id, history, persona, scam_type, turn_count
+        )
+        
+        # Early formulaic turns are answered from templates; otherwise use the LLM
+        response = self._fast_reply(state, persona, message)
+        if response is None:
+            response = await self.llm_client.generate_response(
+                system_prompt=system_prompt,
+                user_message=message,
+                conversation_history=None,  # Already included in context
+                cache_key=self._cache_key(state, history, message),
+                context=context
+            )
         
-        # Determine conversation phase based on turn count
-        phase = self._determine_phase(turn_count)
+        self._finish_turn(conversation_id, state, message, response)
         
-        # Get or create conversation state
-        state = self._get_conversation_state(conversation_id, persona, scam_type)
-        state["turn_count"] = turn_count
-        state["phase"] = phase
+        return response
+    
+    async def stream_response(
+        self,
+        message: str,
+        conversation_id: str,
+        history: List[Any],
+        persona: Persona,
+        scam_type: str,
+        turn_count: int
+    ) -> AsyncIterator[str]:
+        """
+        Stream agent response chunks as the LLM produces them
         
-        # Generate system prompt based on persona and phase
-        system_prompt = persona.get_system_prompt(scam_type, phase, turn_count)
+        Takes the same arguments as generate_response. Conversation state is
+        updated once the stream completes.
+        """
+        async with self.turns.turn(conversation_id, (message, history, turn_count)) as turn:
+            if turn.answered:
+                yield turn.reply
+                return
+            message, history, turn_count = self._merge_messages(turn.items)
+            parts = []
+            async for chunk in self._stream_turn(message, conversation_id, history, persona, scam_type, turn_count):
+                parts.append(chunk)
+                yield chunk
+            turn.resolve("".join(parts).strip())
+    
+    async def _stream_turn(
+        self,
+        message: str,
+        conversation_id: str,
+        history: List[Any],
+        persona: Persona,
+        scam_type: str,
+        turn_count: int
+    ) -> AsyncIterator[str]:
+        state, system_prompt, context = self._prepare_turn(
+            conversation_id, history, persona, scam_type, turn_count
+        )
         
-        # Add conversation history context
-        if history:
-            history_text = self._format_history(history)
-            system_prompt += f"\n\nCONVERSATION SO FAR:\n{history_text}"
+        response = self._fast_reply(state, persona, message)
+        if response is not None:
+            # Recorded before yielding: a client disconnecting now closes the generator
+            self._finish_turn(conversation_id, state, message, response)
+            yield response
+            return
         
-        # Generate response using LLM
-        response = await self.llm_client.generate_response(
+        parts = []
+        async for chunk in self.llm_client.stream_response(
             system_prompt=system_prompt,
             user_message=message,
-            conversation_history=None  # Already included in system prompt
-        )
-        
-        # Update conversation state
-        state["last_response"] = response
-        self.conversations[conversation_id] = state
+            conversation_history=None,  # Already included in context
+            cache_key=self._cache_key(state, history, message),
+            context=context
+        ):
+            parts.append(chunk)
+            yield chunk
         
-        logger.info(f"Generated response for {conversation_id}, phase: {phase}, turn: {turn_count}")
+        self._finish_turn(conversation_id, state, message, "".join(parts).strip())
+    
+    @staticmethod
+    def _merge_messages(items: List[Tuple[str, List[Any], int]]) -> Tuple[str, List[Any], int]:
+        """(message, history, turn_count) answering a batch of queued messages at once"""
+        _, history, turn_count = items[-1]
+        return "\n".join(message for message, _, _ in items), history, turn_count
+    
+    def _prepare_turn(
+        self,
+        conversation_id: str,
+        history: List[Any],
+        persona: Persona,
+        scam_type: str,
+        turn_count: int
+    ) -> Tuple[Dict[str, Any], str, Optional[str]]:
+        """
+        Update conversation state for a new turn and build the prompt
         
+        Returns:
+            (state, system prompt, context). The system prompt depends only on
+            persona, scam type and phase, so it can be cached provider-side;
+            context carries the conversation so far (None on the first turn).
+        """
+        with STAGE_SECONDS.time(stage="prompt_build"):
+            # Determine conversation phase based on turn count
+            phase = self._determine_phase(turn_count)
+            
+            # Get or create conversation state
+            state = self._get_conversation_state(conversation_id, persona, scam_type)
+            state["turn_count"] = turn_count
+            state["phase"] = phase
+            
+            # Generate system prompt based on persona and phase
+            system_prompt = persona.get_system_prompt(scam_type, phase, turn_count)
+            
+            # Add conversation history context
+            context = None
+            if history:
+                history_text = self._format_history(history)
+                context = f"CONVERSATION SO FAR:\n{history_text}"
+            
+            return state, system_prompt, context
+    
+    def _fast_reply(self, state: Dict[str, Any], persona: Persona, message: str) -> Optional[str]:
+        """Template reply for this turn, or None when the LLM should answer"""
+        if self.fast_reply is None:
+            return None
+        with STAGE_SECONDS.time(stage="fast_reply"):
+            response = self.fast_reply.reply(
+                persona.name, message, state["phase"], state["turn_count"],
+                entities=state.get("extracted_data"), avoid=state.get("last_response")
+            )
+        FAST_REPLIES.inc(outcome="served" if response is not None else "escalated")
         return response
     
+    def _cache_key(self, state: Dict[str, Any], history: List[Any], message: str) -> str:
+        """Response cache key: persona, phase and the messages the prompt shows"""
+        recent = [msg.content for msg in history[-self.CACHE_HISTORY_MESSAGES:]] if history else []
+        return ResponseCache.make_key(state["persona"], state["phase"], recent + [message])
+    
+    def _finish_turn(self, conversation_id: str, state: Dict[str, Any], message: str, response: str) -> None:
+        """Record the agent's reply in conversation state and the event log"""
+        
+        # Update conversation state. The turn's own fields go over the latest
+        # stored state so extraction results saved during the LLM call survive
+        state["last_response"] = response
+        stored = self.state_store.get(conversation_id)
+        if stored is not None:
+            stored.update({key: state[key] for key in self.TURN_FIELDS})
+            state = stored
+        self.state_store.set(conversation_id, state)
+        self._log_event(
+            "turn", conversation_id,
+            message=message, reply=response, persona=state["persona"], scam_type=state["scam_type"],
+            turn_count=state["turn_count"], phase=state["phase"], started_at=state["started_at"]
+        )
+        
+        logger.info(f"Generated response for {conversation_id}, phase: {state['phase']}, turn: {state['turn_count']}")
+    
     def _determine_phase(self, turn_count: int) -> str:
         """Determine conversation phase based on turn count"""
         if turn_count <= 3:
@@ -90,18 +301,20 @@ class ConversationManager:
         scam_type: str
     ) -> Dict[str, Any]:
         """Get or create conversation state"""
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = {
+        state = self.state_store.get(conversation_id)
+        if state is None:
+            state = {
                 "conversation_id": conversation_id,
                 "persona": persona.name,
                 "scam_type": scam_type,
                 "turn_count": 0,
+                "started_at": time.time(),
                 "phase": "trust_building",
                 "extracted_data": {},
                 "last_response": None
             }
         
-        return self.conversations[conversation_id]
+        return state
     
     def _format_history(self, history: List[Any]) -> str:
         """Format conversation history for context"""
@@ -112,11 +325,145 @@ class ConversationManager:
         
         return "\n".join(formatted)
     
+    def extract_intelligence(
+        self,
+        conversation_id: str,
+        messages: List[str],
+        extractor: EntityExtractor
+    ) -> Dict[str, Any]:
+        """
+        Extract intelligence from the conversation, scanning only new messages
+        
+        Entities accumulated on earlier turns live in conversation state, so a
+        turn costs O(new text) instead of O(whole conversation).
+        
+        Args:
+            conversation_id: Unique conversation ID
+            messages: All messages in the conversation so far, oldest first
+            extractor: Entity extractor to run over the new messages
+            
+        Returns:
+            Extraction result for the whole conversation (see EntityExtractor.extract)
+        """
+        state = self.state_store.get(conversation_id)
+        if state is None:
+            # No turn recorded for this conversation (e.g. expired): nothing to accumulate into
+            result = extractor.extract(messages)
+            self._index_entities(conversation_id, result["extracted_data"], None)
+            self._log_event("extraction", conversation_id, first=0, messages=messages,
+                            extracted_data=result["extracted_data"])
+            return result
+        
+        first = extractor.resume_point(messages, state.get("extraction"))
+        result = extractor.extract_incremental(messages, state.get("extraction"))
+        state["extraction"] = result.pop("state")
+        state["extracted_data"] = result["extracted_data"]
+        self.state_store.set(conversation_id, state)
+        self._index_entities(conversation_id, result["extracted_data"], state.get("persona"))
+        # Only the newly scanned messages: the log's extraction events for a conversation
+        # concatenate into the messages it was given, for re-running extractors later
+        self._log_event("extraction", conversation_id, first=first, messages=messages[first:],
+                        extracted_data=result["extracted_data"])
+        
+        return result
+    
+    def _index_entities(self, conversation_id: str, extracted_data: Dict[str, Any], persona: Optional[str]) -> None:
+        """Add this conversation's entities to the cross-conversation index, if enabled"""
+        if self.intel_index is not None:
+            self.intel_index.add_extraction(conversation_id, extracted_data, persona)
+    
+    def _log_event(self, event_type: str, conversation_id: str, **fields: Any) -> None:
+        """Append an event to the event log, if one is configured; a log failure never fails the turn"""
+        if self.event_log is None:
+            return
+        try:
+            self.event_log.append({"type": event_type, "conversation_id": conversation_id, **fields})
+        except OSError as e:
+            logger.error(f"Event log append failed for {conversation_id}: {e}")
+    
+    def restore_from_log(self, max_age_seconds: Optional[float] = None) -> int:
+        """
+        Rebuild conversation state from the event log after a restart (no LLM calls)
+        
+        Each conversation gets its last turn's fields and the entities extracted
+        so far. Its extractor state is not restored: the next turn rescans the
+        history the client sends, which yields the same entities.
+        Logged extraction results are also (re-)added to the intelligence index,
+        including those of conversations too old to restore.
+        
+        Args:
+            max_age_seconds: Skip conversations idle for longer (e.g. the state TTL)
+            
+        Returns:
+            Number of conversations restored; ones already in the state store are left as they are
+        """
+        if self.event_log is None:
+            return 0
+        
+        sessions: Dict[str, Dict[str, Any]] = {}
+        extracted: Dict[str, Dict[str, Any]] = {}
+        last_seen: Dict[str, float] = {}
+        for event in self.event_log.events():
+            conversation_id = event["conversation_id"]
+            last_seen[conversation_id] = event["ts"]
+            if event["type"] == "turn":
+                sessions[conversation_id] = {
+                    "conversation_id": conversation_id,
+                    "persona": event["persona"],
+                    "scam_type": event["scam_type"],
+                    "turn_count": event["turn_count"],
+                    "started_at": event["started_at"],
+                    "phase": event["phase"],
+                    "extracted_data": {},
+                    "last_response": event["reply"]
+                }
+            elif event["type"] == "extraction":
+                extracted[conversation_id] = event["extracted_data"]
+                if self.intel_index is not None:
+                    persona = sessions[conversation_id]["persona"] if conversation_id in sessions else None
+                    self.intel_index.add_extraction(conversation_id, event["extracted_data"], persona, event["ts"])
+        
+        cutoff = time.time() - max_age_seconds if max_age_seconds is not None else None
+        restored = 0
+        # Least recently active first, so an LRU store keeps the most recent ones
+        for conversation_id in sorted(sessions, key=last_seen.__getitem__):
+            if cutoff is not None and last_seen[conversation_id] < cutoff:
+                continue
+            if self.state_store.get(conversation_id) is not None:
+                continue
+            state = sessions[conversation_id]
+            state["extracted_data"] = extracted.get(conversation_id, {})
+            self.state_store.set(conversation_id, state)
+            restored += 1
+        
+        logger.info(f"Restored {restored} conversations from the event log")
+        return restored
+    
+    @staticmethod
+    def logged_conversations(event_log: EventLog) -> Dict[str, Dict[str, Any]]:
+        """
+        Every conversation in the event log as last given to extraction
+        
+        Returns:
+            conversation_id -> {"messages": all messages oldest first, "extracted_data":
+            the entities logged for them}; input for re-running an extractor
+        """
+        conversations: Dict[str, Dict[str, Any]] = {}
+        for event in event_log.events():
+            if event["type"] == "extraction":
+                conversation = conversations.setdefault(event["conversation_id"], {"messages": []})
+                del conversation["messages"][event["first"]:]
+                conversation["messages"].extend(event["messages"])
+                conversation["extracted_data"] = event["extracted_data"]
+        return conversations
+    
     def get_conversation_metrics(self, conversation_id: str) -> Dict[str, Any]:
         """Get metrics for a conversation"""
-        state = self.conversations.get(conversation_id, {})
+        state = self.state_store.get(conversation_id) or {}
+        started_at = state.get("started_at")
         return {
             "turn_count": state.get("turn_count", 0),
+            "engagement_duration_seconds": int(time.time() - started_at) if started_at else 0,
             "phase": state.get("phase", "unknown"),
             "persona_used": state.get("persona", "unknown")
         }
@@ -0,0 +1,183 @@
+"""
+Fast Reply Engine
+Answers formulaic early-conversation turns from per-persona templates so they
+skip the LLM round trip
+"""
+
+import os
+import re
+import random
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from src.detection.matcher import MultiPatternMatcher
+from src.personas.reply_templates import (
+    INTENT_KEYWORDS, ESCALATE_PHRASES, OPENERS, TEMPLATES, DEFAULT_TEMPLATES
+)
+
+logger = logging.getLogger(__name__)
+
+# Slot values taken straight from the incoming message
+AMOUNT_PATTERN = re.compile(r"(?:rs\.?|inr|₹)\s?(\d[\d,]*)|(\d[\d,]*)\s?(?:rs\b|rupees|/-)", re.IGNORECASE)
+UPI_PATTERN = re.compile(r"\b[\w.\-]{2,}@[a-zA-Z]{2,}\b")
+PHONE_PATTERN = re.compile(r"(?<!\d)(?:\+91[\-\s]?)?[6-9]\d{9}(?!\d)")
+LINK_PATTERN = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+
+# slot -> (extracted_data key, entity field) for entities found on earlier turns
+SLOT_ENTITIES = {
+    "upi_id": ("upi_ids", "upi_id"),
+    "phone": ("phone_numbers", "number"),
+    "link": ("urls", "url"),
+}
+
+
+class FastReplyEngine:
+    """
+    Rule-based replies for the trust-building phase
+
+    The incoming message is classified into an intent by keyword; a confident,
+    unambiguous intent gets a persona template with its slots filled from
+    entities in the conversation. Anything else (low confidence, a direct
+    question only the model can answer, a later phase) returns None and the
+    caller asks the LLM.
+    """
+
+    def __init__(
+        self,
+        max_turn: int = 3,
+        min_confidence: float = 0.6,
+        max_chars: int = 300,
+        phases: Tuple[str, ...] = ("trust_building",)
+    ):
+        self.max_turn = max_turn
+        self.min_confidence = min_confidence
+        self.max_chars = max_chars
+        self.phases = phases
+        self.served = 0
+        self.escalated = 0
+
+        self._intent_of: Dict[str, List[str]] = {}
+        for intent, keywords in INTENT_KEYWORDS.items():
+            for keyword in keywords:
+                self._intent_of.setdefault(keyword, []).append(intent)
+        self._matcher = MultiPatternMatcher(list(self._intent_of) + ESCALATE_PHRASES)
+        self._escalate = frozenset(ESCALATE_PHRASES)
+
+    def classify(self, message: str) -> Tuple[Optional[str], float]:
+        """
+        Intent of a scammer message
+
+        Returns:
+            (intent, confidence in [0, 1]); intent is None when nothing matched
+            or the message needs a real answer
+        """
+        text = f" {message.lower()} "
+        found, _ = self._matcher.scan(text)
+        if found & self._escalate:
+            return None, 0.0
+
+        hits: Dict[str, int] = {}
+        for keyword in found:
+            for intent in self._intent_of.get(keyword, ()):
+                hits[intent] = hits.get(intent, 0) + 1
+        if not hits:
+            return None, 0.0
+
+        ranked = sorted(hits.items(), key=lambda item: item[1], reverse=True)
+        intent, best = ranked[0]
+        confidence = min(1.0, 0.5 + 0.2 * best)
+        if len(ranked) > 1 and ranked[1][1] == best:
+            confidence *= 0.6  # two intents equally likely: let the model read it
+        if len(message) > self.max_chars:
+            confidence *= 0.5  # long messages rarely fit a canned reply
+        return intent, round(confidence, 2)
+
+    def slots(self, message: str, entities: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Slot values from the message, falling back to entities from earlier turns"""
+        values: Dict[str, str] = {}
+        amount = AMOUNT_PATTERN.search(message)
+        if amount:
+            values["amount"] = f"Rs {amount.group(1) or amount.group(2)}"
+        for slot, pattern in (("upi_id", UPI_PATTERN), ("phone", PHONE_PATTERN), ("link", LINK_PATTERN)):
+            match = pattern.search(message)
+            if match:
+                values[slot] = match.group()
+
+        for slot, (key, field) in SLOT_ENTITIES.items():
+            found = (entities or {}).get(key) or []
+            if slot not in values and found and found[-1].get(field):
+                values[slot] = str(found[-1][field])
+        return values
+
+    def reply(
+        self,
+        persona_name: str,
+        message: str,
+        phase: str,
+        turn_count: int,
+        entities: Optional[Dict[str, Any]] = None,
+        avoid: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Template reply for this turn, or None to escalate to the LLM
+
+        Args:
+            persona_name: Persona answering
+            message: Incoming scammer message
+            phase: Conversation phase
+            turn_count: Current turn number
+            entities: extracted_data accumulated on earlier turns
+            avoid: Previous reply, not repeated verbatim
+        """
+        if phase not in self.phases or turn_count > self.max_turn:
+            return None
+
+        intent, confidence = self.classify(message)
+        if intent is None or confidence < self.min_confidence:
+            self.escalated += 1
+            return None
+
+        templates = TEMPLATES.get(persona_name, {}).get(intent) or DEFAULT_TEMPLATES.get(intent, [])
+        values = self.slots(message, entities)
+        candidates = []
+        for template in templates:
+            try:
+                text = template.format(**values)
+            except KeyError:
+                continue  # needs a slot we have no value for
+            if text != avoid:
+                candidates.append(text)
+        if not candidates:
+            self.escalated += 1
+            return None
+
+        self.served += 1
+        opener = random.choice(OPENERS.get(persona_name, [""]))
+        text = random.choice(candidates)
+        return f"{opener} {text}" if opener else text
+
+    def stats(self) -> Dict[str, Any]:
+        decided = self.served + self.escalated
+        return {
+            "served": self.served,
+            "escalated": self.escalated,
+            "serve_rate": round(self.served / decided, 4) if decided else 0.0
+        }
+
+
+def create_fast_reply_engine() -> Optional[FastReplyEngine]:
+    """
+    Build the fast reply engine selected by environment variables
+
+    FAST_REPLY: on or off (default)
+    FAST_REPLY_MAX_TURN: last turn eligible for a template reply (default 3)
+    FAST_REPLY_MIN_CONFIDENCE: intent confidence needed to skip the LLM (default 0.6)
+    FAST_REPLY_MAX_CHARS: longer messages are penalised (default 300)
+    """
+    if os.getenv("FAST_REPLY", "off").lower() != "on":
+        return None
+    logger.info("Fast reply engine enabled for early turns")
+    return FastReplyEngine(
+        max_turn=int(os.getenv("FAST_REPLY_MAX_TURN", "3")),
+        min_confidence=float(os.getenv("FAST_REPLY_MIN_CONFIDENCE", "0.6")),
+        max_chars=int(os.getenv("FAST_REPLY_MAX_CHARS", "300"))
+    )
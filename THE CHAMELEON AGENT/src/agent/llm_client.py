@@ -4,132 +4,715 @@ Handles communication with LLM providers (Gemini, Groq)
 """
 
 import os
-from typing import Optional
+import json
+import time
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator, TYPE_CHECKING
 import logging
-import google.generativeai as genai
-from groq import Groq
+from src.agent.response_cache import ResponseCache, create_response_cache
+from src.agent.llm_router import Backend, LLMRouter
+from src.agent.context_cache import ContextCache
+from src.monitoring.metrics import (
+    LLM_SECONDS, LLM_TIMEOUTS, LLM_HEDGED, LLM_FAILOVERS, FALLBACK_REPLIES, LLM_IN_FLIGHT, LLM_QUEUE_DEPTH
+)
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+GROQ_BASE_URL = "https://api.groq.com"
+
+# Responses to a request naming a cached content handle the provider no longer has
+STALE_CONTEXT_STATUSES = (400, 403, 404)
+
+# provider -> (default base URL, API key variable, default model)
+PROVIDERS = {
+    "gemini": (GEMINI_BASE_URL, "GOOGLE_API_KEY", "gemini-2.0-flash-exp"),
+    "groq": (GROQ_BASE_URL, "GROQ_API_KEY", "llama-3.1-70b-versatile"),
+}
+
+
+def load_httpx():
+    """
+    Import httpx on first use: it pulls in httpcore, h11 and trio (~0.25s), a cost
+    that workers which never call an LLM should not pay at startup
+    """
+    return importlib.import_module("httpx")
+
 
 class LLMClient:
     """Client for interacting with LLM providers"""
-    
-    def __init__(self):
-        self.provider = os.getenv("LLM_PROVIDER", "gemini")
+
+    def __init__(
+        self,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+        cache: Optional[ResponseCache] = None
+    ):
         self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.7"))
         self.max_tokens = int(os.getenv("LLM_MAX_TOKENS", "150"))
-        self.timeout = int(os.getenv("LLM_TIMEOUT", "5"))
-        
-        # Initialize providers
-        if self.provider == "gemini":
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-            self.model_name = os.getenv("LLM_MODEL", "gemini-2.0-flash-exp")
-            self.model = genai.GenerativeModel(self.model_name)
-            logger.info(f"Initialized Gemini model: {self.model_name}")
-        
-        elif self.provider == "groq":
-            self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-            self.model_name = os.getenv("LLM_MODEL", "llama-3.1-70b-versatile")
-            logger.info(f"Initialized Groq model: {self.model_name}")
-        
+        self.timeout = float(os.getenv("LLM_TIMEOUT", "5"))
+        self.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+        self.max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+
+        # Initialize providers: LLM_BACKENDS lists several provider:model pairs
+        # to route between; otherwise the single LLM_PROVIDER/LLM_MODEL is used
+        self.router = LLMRouter(
+            self._load_backends(),
+            hedge=os.getenv("LLM_HEDGE", "false").lower() == "true",
+            hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+            max_failures=int(os.getenv("LLM_BACKEND_MAX_FAILURES", "3")),
+            cooldown=float(os.getenv("LLM_BACKEND_COOLDOWN", "30"))
+        )
+
+        # The first configured backend, for logs and callers that expect one provider
+        primary = self.router.backends[0]
+        self.provider = primary.provider
+        self.model_name = primary.model_name
+        self.api_key = primary.api_key
+        self.base_url = primary.base_url
+
+        # One pooled client per LLMClient, created on first use so it binds to
+        # the running event loop. Keep-alive connections are reused across calls.
+        self._transport = transport
+        self._http: Optional["httpx.AsyncClient"] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+        LLM_QUEUE_DEPTH.set_function(lambda: self._waiting)
+        LLM_IN_FLIGHT.set_function(lambda: self._in_flight)
+
+        # Replies for repeated prompts (see LLM_CACHE_* settings); None disables it
+        self.cache = cache if cache is not None else create_response_cache()
+
+        # Static system prompts registered with the provider once and referenced
+        # by handle, so turns only carry the conversation delta (Gemini only)
+        self.context_cache: Optional[ContextCache] = None
+        if os.getenv("LLM_CONTEXT_CACHE", "off").lower() == "on":
+            self.context_cache = ContextCache(
+                ttl_seconds=float(os.getenv("LLM_CONTEXT_CACHE_TTL", "3600")),
+                retry_seconds=float(os.getenv("LLM_CONTEXT_CACHE_RETRY", "600"))
+            )
+
+    @staticmethod
+    def _load_backends() -> List[Backend]:
+        """
+        Build backends from LLM_BACKENDS ("gemini:gemini-2.0-flash,groq:llama-3.1-8b-instant")
+        or, when unset, from LLM_PROVIDER and LLM_MODEL
+        """
+        default_provider = os.getenv("LLM_PROVIDER", "gemini")
+        spec = os.getenv("LLM_BACKENDS", "").strip()
+        if spec:
+            pairs = [(item.split(":", 1) + [None])[:2] for item in spec.split(",") if item.strip()]
         else:
-            raise ValueError(f"Unsupported LLM provider: {self.provider}")
-    
+            pairs = [(default_provider, os.getenv("LLM_MODEL"))]
+
+        backends = []
+        for provider, model_name in pairs:
+            provider = provider.strip().lower()
+            if provider not in PROVIDERS:
+                raise ValueError(f"Unsupported LLM provider: {provider}")
+            default_url, key_variable, default_model = PROVIDERS[provider]
+            # LLM_BASE_URL keeps overriding the LLM_PROVIDER endpoint (proxies, mocks)
+            base_url = os.getenv(f"{provider.upper()}_BASE_URL") or (
+                os.getenv("LLM_BASE_URL") if provider == default_provider else None
+            ) or default_url
+            backend = Backend(
+                provider=provider,
+                model_name=(model_name or "").strip() or default_model,
+                api_key=os.getenv(key_variable),
+                base_url=base_url,
+                window=int(os.getenv("LLM_ROUTER_WINDOW", "100"))
+            )
+            logger.info(f"Initialized LLM backend: {backend.name}")
+            backends.append(backend)
+        return backends
+
+    @property
+    def http(self) -> "httpx.AsyncClient":
+        """Shared, pooled HTTP client for all provider calls"""
+        if self._http is None or self._http.is_closed:
+            httpx = load_httpx()
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._http
+
+    async def warm(self) -> None:
+        """Import httpx off the event loop and open the pooled client ahead of the first call"""
+        await asyncio.to_thread(load_httpx)
+        self.http
+
+    async def aclose(self) -> None:
+        """Close pooled connections (call on application shutdown)"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Hold one of the LLM_MAX_CONCURRENCY call slots, counting queued and running calls"""
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def _record(self, backend: Backend, started: float, outcome: str) -> None:
+        """Feed one attempt's result to the router statistics and the metrics"""
+        elapsed = time.perf_counter() - started
+        if outcome == "ok":
+            self.router.record_success(backend, elapsed)
+        elif outcome == "error":
+            self.router.record_failure(backend)
+        elif outcome == "timeout":
+            self.router.record_failure(backend)
+            self.router.record_cancelled(backend, elapsed)
+            LLM_TIMEOUTS.inc(provider=backend.provider, model=backend.model_name)
+        else:  # cancelled: lost a hedge race
+            self.router.record_cancelled(backend, elapsed)
+        LLM_SECONDS.observe(elapsed, provider=backend.provider, model=backend.model_name, outcome=outcome)
+
     async def generate_response(
         self,
         system_prompt: str,
         user_message: str,
-        conversation_history: Optional[list] = None
+        conversation_history: Optional[list] = None,
+        cache_key: Optional[str] = None,
+        context: Optional[str] = None
     ) -> str:
         """
         Generate response from LLM
-        
+
         Args:
             system_prompt: System instructions for the LLM
             user_message: The user's message
             conversation_history: Optional conversation history
-            
+            cache_key: ResponseCache.make_key for this turn; enables reply reuse
+            context: Per-turn text (e.g. the conversation so far) appended to
+                the system prompt; kept apart so the static system prompt can
+                be served from the provider's context cache
+
         Returns:
             Generated response text
         """
+        use_cache = cache_key is not None and self.cache is not None
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            if self.provider == "gemini":
-                return await self._generate_gemini(system_prompt, user_message, conversation_history)
-            elif self.provider == "groq":
-                return await self._generate_groq(system_prompt, user_message, conversation_history)
-        
+            async with self._slot():
+                # LLM_TIMEOUT bounds the whole round trip, failovers and
+                # transport retries included, not just the socket reads.
+                deadline = asyncio.get_running_loop().time() + self.timeout
+                response = await self._route(
+                    deadline, system_prompt, user_message, conversation_history, context
+                )
+
+            # Fallbacks are returned from the except blocks below and never cached
+            if use_cache and response:
+                self.cache.put(cache_key, response)
+            return response
+
+        except asyncio.TimeoutError:
+            logger.warning(f"LLM call timed out after {self.timeout:g}s ({self.provider}/{self.model_name})")
+            FALLBACK_REPLIES.inc(reason="timeout")
+            return self._get_fallback_response(user_message)
+
         except Exception as e:
             logger.error(f"Error generating LLM response: {str(e)}", exc_info=True)
             # Fallback response
+            FALLBACK_REPLIES.inc(reason="error")
             return self._get_fallback_response(user_message)
-    
+
+    async def _route(
+        self,
+        deadline: float,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """
+        Try backends fastest first until one answers
+
+        An error moves on to the next backend; running out of time does not,
+        since every later attempt would share the same deadline.
+        """
+        backends = self.router.ranked()
+        tried: List[Backend] = []
+        last_error: Optional[Exception] = None
+
+        for backend in backends:
+            if backend in tried:
+                continue
+            if last_error is not None:
+                logger.warning(f"Failing over to {backend.name} after: {last_error!r}")
+                LLM_FAILOVERS.inc(provider=backend.provider, model=backend.model_name)
+            spare = [other for other in backends if other is not backend and other not in tried]
+            try:
+                return await self._hedged(
+                    backend, spare, tried, deadline, system_prompt, user_message, conversation_history, context
+                )
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                last_error = e
+
+        raise last_error
+
+    async def _hedged(
+        self,
+        backend: Backend,
+        spare: List[Backend],
+        tried: List[Backend],
+        deadline: float,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """
+        Call `backend`; if it is still running after its p95 latency, send the
+        same request to the next backend (or the same one again) and keep the
+        first reply. The slower call is cancelled.
+        """
+        def attempt(target: Backend) -> asyncio.Task:
+            tried.append(target)
+            return asyncio.ensure_future(
+                self._attempt(target, deadline, system_prompt, user_message, conversation_history, context)
+            )
+
+        pending = {attempt(backend)}
+        try:
+            delay = self.router.hedge_delay(backend)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    hedge = spare[0] if spare else backend
+                    LLM_HEDGED.inc(provider=hedge.provider, model=hedge.model_name)
+                    pending.add(attempt(hedge))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(
+        self,
+        backend: Backend,
+        deadline: float,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """One provider call, bounded by the request deadline and recorded for routing"""
+        started = time.perf_counter()
+        remaining = max(deadline - asyncio.get_running_loop().time(), 0)
+        try:
+            response = await asyncio.wait_for(
+                self._generate(backend, system_prompt, user_message, conversation_history, context),
+                timeout=remaining
+            )
+        except asyncio.TimeoutError:
+            self._record(backend, started, "timeout")
+            raise
+        except asyncio.CancelledError:
+            self._record(backend, started, "cancelled")
+            raise
+        except Exception:
+            self._record(backend, started, "error")
+            raise
+        self._record(backend, started, "ok")
+        return response
+
+    async def stream_response(
+        self,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        cache_key: Optional[str] = None,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response from LLM as it is generated
+
+        Backends are tried fastest first; a backend that fails before its first
+        chunk is skipped for the next one. Streams are not hedged.
+
+        Args:
+            system_prompt: System instructions for the LLM
+            user_message: The user's message
+            conversation_history: Optional conversation history
+            cache_key: ResponseCache.make_key for this turn; enables reply reuse
+            context: Per-turn text appended to the system prompt (see generate_response)
+
+        Yields:
+            Text chunks in arrival order. If every provider fails before the
+            first chunk, the fallback response is yielded instead. A cached
+            reply is yielded as a single chunk.
+        """
+        use_cache = cache_key is not None and self.cache is not None
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        # The producer holds the slot and the deadline; a slow reader only lets
+        # chunks pile up in the queue, and stopping early cancels the call
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        producer = asyncio.ensure_future(self._produce_stream(
+            queue, cache_key if use_cache else None, system_prompt, user_message, conversation_history, context
+        ))
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+    async def _produce_stream(
+        self,
+        queue: "asyncio.Queue[Optional[str]]",
+        cache_key: Optional[str],
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> None:
+        """
+        Run a streaming call for stream_response, putting its chunks (or the
+        fallback response) on `queue` and None when done
+        """
+        loop = asyncio.get_running_loop()
+        sent_any = False
+        parts = []
+
+        try:
+            async with self._slot():
+                deadline = loop.time() + self.timeout
+                backends = self.router.ranked()
+                for index, backend in enumerate(backends):
+                    if index:
+                        LLM_FAILOVERS.inc(provider=backend.provider, model=backend.model_name)
+                    started = time.perf_counter()
+                    chunks = self._stream(backend, system_prompt, user_message, conversation_history, context)
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(
+                                    chunks.__anext__(), timeout=max(deadline - loop.time(), 0)
+                                )
+                            except StopAsyncIteration:
+                                break
+                            if not sent_any:
+                                chunk = chunk.lstrip()
+                            if chunk:
+                                sent_any = True
+                                parts.append(chunk)
+                                queue.put_nowait(chunk)
+                    except asyncio.TimeoutError:
+                        self._record(backend, started, "timeout")
+                        raise
+                    except Exception as e:
+                        self._record(backend, started, "error")
+                        if sent_any or index == len(backends) - 1:
+                            raise
+                        logger.warning(f"LLM stream from {backend.name} failed, failing over: {e!r}")
+                        continue
+                    finally:
+                        await chunks.aclose()
+                    self._record(backend, started, "ok")
+                    break
+
+            reply = "".join(parts).strip()
+            if cache_key is not None and reply:
+                self.cache.put(cache_key, reply)
+
+        except asyncio.TimeoutError:
+            logger.warning(f"LLM stream timed out after {self.timeout:g}s ({self.provider}/{self.model_name})")
+            if not sent_any:
+                FALLBACK_REPLIES.inc(reason="timeout")
+                queue.put_nowait(self._get_fallback_response(user_message))
+
+        except Exception as e:
+            logger.error(f"Error streaming LLM response: {str(e)}", exc_info=True)
+            if not sent_any:
+                FALLBACK_REPLIES.inc(reason="error")
+                queue.put_nowait(self._get_fallback_response(user_message))
+
+        finally:
+            queue.put_nowait(None)
+
+    async def _generate(
+        self,
+        backend: Backend,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """Dispatch to the backend's provider"""
+        if backend.provider == "gemini":
+            return await self._generate_gemini(backend, system_prompt, user_message, conversation_history, context)
+        return await self._generate_groq(backend, system_prompt, user_message, conversation_history, context)
+
+    def _stream(
+        self,
+        backend: Backend,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Dispatch a streaming call to the backend's provider"""
+        if backend.provider == "gemini":
+            return self._stream_gemini(backend, system_prompt, user_message, conversation_history, context)
+        return self._stream_groq(backend, system_prompt, user_message, conversation_history, context)
+
+    def _gemini_payload(
+        self,
+        system_prompt: str,
+        user_message: str,
+        context: Optional[str] = None,
+        cached_content: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the generateContent request body"""
+
+        # Combine system prompt and user message; with a cached content handle
+        # the system prompt is already on the provider side
+        prompt = [] if cached_content else [system_prompt]
+        if context:
+            prompt.append(context)
+        full_prompt = "\n\n".join(prompt + [f"SCAMMER'S MESSAGE:\n{user_message}\n\nYour response:"])
+
+        payload: Dict[str, Any] = {
+            "contents": [{"role": "user", "parts": [{"text": full_prompt}]}],
+            "generationConfig": {
+                "temperature": self.temperature,
+                "maxOutputTokens": self.max_tokens,
+            },
+        }
+        if cached_content:
+            payload["cachedContent"] = cached_content
+        return payload
+
+    async def _gemini_context(self, backend: Backend, system_prompt: str) -> Optional[str]:
+        """Cached content name holding system_prompt for this backend, if context caching is on"""
+        if self.context_cache is None or backend.provider != "gemini":
+            return None
+
+        async def create(ttl_seconds: float) -> str:
+            response = await self.http.post(
+                f"{backend.base_url}/v1beta/cachedContents",
+                json={
+                    "model": f"models/{backend.model_name}",
+                    "systemInstruction": {"parts": [{"text": system_prompt}]},
+                    "ttl": f"{int(ttl_seconds)}s",
+                },
+                headers={"x-goog-api-key": backend.api_key or ""},
+            )
+            response.raise_for_status()
+            return response.json()["name"]
+
+        key = ContextCache.make_key(backend.name, system_prompt)
+        return await self.context_cache.get_or_create(key, create)
+
     async def _generate_gemini(
         self,
+        backend: Backend,
         system_prompt: str,
         user_message: str,
-        conversation_history: Optional[list] = None
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
     ) -> str:
         """Generate response using Google Gemini"""
-        
-        # Combine system prompt and user message
-        full_prompt = f"{system_prompt}\n\nSCAMMER'S MESSAGE:\n{user_message}\n\nYour response:"
-        
-        # Generate response
-        response = self.model.generate_content(
-            full_prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=self.temperature,
-                max_output_tokens=self.max_tokens,
-            )
+
+        url = f"{backend.base_url}/v1beta/models/{backend.model_name}:generateContent"
+        headers = {"x-goog-api-key": backend.api_key or ""}
+        cached_content = await self._gemini_context(backend, system_prompt)
+
+        response = await self.http.post(
+            url,
+            json=self._gemini_payload(system_prompt, user_message, context, cached_content),
+            headers=headers,
         )
-        
-        return response.text.strip()
-    
-    async def _generate_groq(
+        if cached_content and response.status_code in STALE_CONTEXT_STATUSES:
+            # The handle expired or was evicted early: forget it and resend inline
+            self.context_cache.invalidate(ContextCache.make_key(backend.name, system_prompt))
+            response = await self.http.post(
+                url, json=self._gemini_payload(system_prompt, user_message, context), headers=headers
+            )
+        response.raise_for_status()
+        data = response.json()
+
+        return self._gemini_text(data).strip()
+
+    async def _stream_gemini(
         self,
+        backend: Backend,
         system_prompt: str,
         user_message: str,
-        conversation_history: Optional[list] = None
-    ) -> str:
-        """Generate response using Groq"""
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message}
-        ]
-        
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream response chunks from Google Gemini (server-sent events)"""
+
+        cached_content = await self._gemini_context(backend, system_prompt)
+        async with self.http.stream(
+            "POST",
+            f"{backend.base_url}/v1beta/models/{backend.model_name}:streamGenerateContent",
+            params={"alt": "sse"},
+            json=self._gemini_payload(system_prompt, user_message, context, cached_content),
+            headers={"x-goog-api-key": backend.api_key or ""},
+        ) as response:
+            if cached_content and response.status_code in STALE_CONTEXT_STATUSES:
+                # Fails this attempt; the next call registers the prompt again
+                self.context_cache.invalidate(ContextCache.make_key(backend.name, system_prompt))
+            response.raise_for_status()
+            async for data in self._iter_sse(response):
+                yield self._gemini_text(data)
+
+    @staticmethod
+    def _gemini_text(data: Dict[str, Any]) -> str:
+        candidates = data.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    def _groq_messages(
+        self,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Build the chat messages list"""
+
+        messages: List[Dict[str, Any]] = [{"role": "system", "content": system_prompt}]
+        if context:
+            if self.context_cache is not None:
+                # Keep the system message byte-identical across turns so the
+                # provider's automatic prefix caching can reuse it
+                messages.append({"role": "system", "content": context})
+            else:
+                messages[0]["content"] = f"{system_prompt}\n\n{context}"
+        messages.append({"role": "user", "content": user_message})
+
         # Add conversation history if available
         if conversation_history:
             # Insert history before the latest message
             for msg in conversation_history[-4:]:  # Last 4 messages for context
                 messages.insert(-1, msg)
-        
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
+
+        return messages
+
+    async def _generate_groq(
+        self,
+        backend: Backend,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """Generate response using Groq"""
+
+        response = await self.http.post(
+            f"{backend.base_url}/openai/v1/chat/completions",
+            json={
+                "model": backend.model_name,
+                "messages": self._groq_messages(system_prompt, user_message, conversation_history, context),
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+            },
+            headers={"Authorization": f"Bearer {backend.api_key or ''}"},
         )
-        
-        return response.choices[0].message.content.strip()
-    
+        response.raise_for_status()
+        data = response.json()
+
+        return data["choices"][0]["message"]["content"].strip()
+
+    async def _stream_groq(
+        self,
+        backend: Backend,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[list] = None,
+        context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream response chunks from Groq (OpenAI-style server-sent events)"""
+
+        async with self.http.stream(
+            "POST",
+            f"{backend.base_url}/openai/v1/chat/completions",
+            json={
+                "model": backend.model_name,
+                "messages": self._groq_messages(system_prompt, user_message, conversation_history, context),
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+                "stream": True,
+            },
+            headers={"Authorization": f"Bearer {backend.api_key or ''}"},
+        ) as response:
+            response.raise_for_status()
+            async for data in self._iter_sse(response):
+                delta = data["choices"][0].get("delta", {})
+                yield delta.get("content") or ""
+
+    @staticmethod
+    async def _iter_sse(response: "httpx.Response") -> AsyncIterator[Dict[str, Any]]:
+        """Decode the JSON payloads of a server-sent event stream"""
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            yield json.loads(payload)
+
     def _get_fallback_response(self, user_message: str) -> str:
         """Generate fallback response if LLM fails"""
         message_lower = user_message.lower()
-        
+
         # Simple rule-based fallback responses
         if any(word in message_lower for word in ["bank", "account", "kyc", "blocked"]):
             return "Oh no! My account is blocked? I'm very worried. What should I do? Can you help me?"
-        
+
         elif any(word in message_lower for word in ["won", "prize", "lottery", "congratulations"]):
             return "Really?! I won something? That's amazing! How do I claim it? What do I need to do?"
-        
+
         elif any(word in message_lower for word in ["job", "work", "earn", "income"]):
             return "This sounds interesting! Can you tell me more about this opportunity? How much can I earn?"
-        
+
         elif any(word in message_lower for word in ["computer", "virus", "tech", "microsoft"]):
             return "Oh dear, is something wrong with my computer? I'm not very good with technology. What should I do?"
-        
+
         else:
             return "I see. Can you explain more? I want to make sure I understand correctly."
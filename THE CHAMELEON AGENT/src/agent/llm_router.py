@@ -0,0 +1,151 @@
+"""
+LLM Router
+Ranks LLM backends (provider + model) by rolling latency and error rate so
+each call goes to the fastest healthy one, with failover and hedging data
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+
+class Backend:
+    """One provider/model pair and its rolling health statistics"""
+
+    def __init__(
+        self,
+        provider: str,
+        model_name: str,
+        api_key: Optional[str],
+        base_url: str,
+        window: int = 100
+    ):
+        self.provider = provider
+        self.model_name = model_name
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+
+        # Latencies of successful calls (plus lower bounds from calls that were
+        # cancelled: a hedge loser or a timeout was at least that slow)
+        self.latencies: deque = deque(maxlen=window)
+        # True/False per finished call, for the error rate
+        self.outcomes: deque = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}/{self.model_name}"
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Rolling latency quantile in seconds (None before the first sample)"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def expected_latency(self) -> float:
+        """
+        Mean latency divided by the success rate: the expected time to a
+        usable reply counting failed attempts. Unmeasured backends score 0 so
+        each one gets tried early and starts collecting samples.
+        """
+        if not self.latencies:
+            return 0.0
+        mean = sum(self.latencies) / len(self.latencies)
+        return mean / max(1.0 - self.error_rate(), 0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+        return {
+            "backend": self.name,
+            "healthy": self.healthy(time.monotonic()),
+            "samples": len(self.outcomes),
+            "error_rate": round(self.error_rate(), 4),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+
+class LLMRouter:
+    """
+    Picks backends in order of expected latency
+
+    A backend that fails `max_failures` times in a row is benched for
+    `cooldown` seconds (it stays available as a last resort), then gets one
+    trial call: success restores it, another failure benches it again.
+    """
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        max_failures: int = 3,
+        cooldown: float = 30.0
+    ):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = backends
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def ranked(self) -> List[Backend]:
+        """Healthy backends fastest first, then benched ones (config order breaks ties)"""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(
+                self.backends,
+                key=lambda backend: (not backend.healthy(now), backend.expected_latency())
+            )
+
+    def hedge_delay(self, backend: Backend) -> Optional[float]:
+        """
+        Seconds to wait for `backend` before sending a hedged duplicate: its
+        rolling p95, so only the slowest ~5% of calls are doubled. None when
+        hedging is off or there are too few samples to know the p95.
+        """
+        if not self.hedge or len(backend.latencies) < self.hedge_min_samples:
+            return None
+        return backend.latency_quantile(0.95)
+
+    def record_success(self, backend: Backend, latency: float) -> None:
+        with self._lock:
+            backend.latencies.append(latency)
+            backend.outcomes.append(True)
+            backend.consecutive_failures = 0
+            backend.cooldown_until = 0.0
+
+    def record_failure(self, backend: Backend) -> None:
+        with self._lock:
+            backend.outcomes.append(False)
+            backend.consecutive_failures += 1
+            if backend.consecutive_failures >= self.max_failures:
+                backend.cooldown_until = time.monotonic() + self.cooldown
+                # One more failure after the cooldown benches it again
+                backend.consecutive_failures = self.max_failures - 1
+
+    def record_cancelled(self, backend: Backend, elapsed: float) -> None:
+        """A call abandoned after `elapsed` seconds (hedge loser or timeout)"""
+        with self._lock:
+            latency = backend.latency_quantile(0.5)
+            # Only a lower bound on the real latency: worth keeping when it is
+            # slower than usual, noise otherwise
+            if latency is None or elapsed > latency:
+                backend.latencies.append(elapsed)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [backend.stats() for backend in self.ranked()]
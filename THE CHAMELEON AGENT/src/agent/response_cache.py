@@ -0,0 +1,124 @@
+"""
+LLM Response Cache
+Reuses persona replies for repeated scam openers instead of paying for a new LLM call
+"""
+
+import os
+import re
+import random
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional
+import logging
+from src.storage.state_store import StateStore, MemoryStateStore, RedisStateStore, SQLiteStateStore
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w@]+")
+
+
+class ResponseCache:
+    """
+    LLM reply cache keyed on persona, conversation phase and recent history
+
+    Each key collects up to `variants` distinct replies. Until it has them all
+    a lookup misses, so the LLM is asked again and the new reply is added; once
+    full, lookups pick one at random so scammers don't see identical text.
+
+    Entries live in a StateStore: the memory backend gives LRU + TTL + size
+    cap, sqlite/redis make the cache persistent and shared across workers.
+    """
+
+    def __init__(self, store: StateStore, variants: int = 3):
+        self.store = store
+        self.variants = max(variants, 1)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(persona: str, phase: str, messages: List[str]) -> str:
+        """
+        Build a cache key
+
+        Args:
+            persona: Persona name
+            phase: Conversation phase
+            messages: Recent messages, oldest first, ending with the new one
+
+        Returns:
+            Hex digest; messages differing only in case, punctuation or
+            spacing share a key
+        """
+        normalized = [_NON_WORD.sub(" ", message.lower()).strip() for message in messages]
+        raw = "\x1f".join([persona, phase] + normalized)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached reply, or None if the key still needs (more) LLM replies"""
+        entry = self.store.get(key)
+        replies = entry["replies"] if entry else []
+        with self._lock:
+            if len(replies) >= self.variants:
+                self.hits += 1
+                return random.choice(replies)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, reply: str) -> None:
+        """Record an LLM reply for key (ignored once the key has all its variants)"""
+        entry = self.store.get(key) or {"replies": []}
+        if reply in entry["replies"] or len(entry["replies"]) >= self.variants:
+            return
+        entry["replies"].append(reply)
+        self.store.set(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since startup"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.store),
+            "variants": self.variants
+        }
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """
+    Build the response cache selected by environment variables
+
+    LLM_CACHE_BACKEND: memory (default), sqlite, redis or off
+    LLM_CACHE_TTL_SECONDS: drop entries unused for this long (default 86400)
+    LLM_CACHE_MAX_ENTRIES: cap for the memory backend (default 10000)
+    LLM_CACHE_VARIANTS: distinct replies served per key (default 3)
+    LLM_CACHE_SQLITE_PATH: database file for the sqlite backend
+    REDIS_URL: connection URL for the redis backend
+    """
+    backend = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+
+    if backend == "off":
+        return None
+    if backend == "memory":
+        store: StateStore = MemoryStateStore(
+            max_sessions=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+            ttl_seconds=ttl_seconds
+        )
+    elif backend == "sqlite":
+        store = SQLiteStateStore(
+            path=os.getenv("LLM_CACHE_SQLITE_PATH", "chameleon_llm_cache.db"),
+            ttl_seconds=ttl_seconds
+        )
+    elif backend == "redis":
+        store = RedisStateStore(
+            url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            prefix="chameleon:llm-cache:",
+            ttl_seconds=ttl_seconds
+        )
+    else:
+        raise ValueError(f"Unsupported LLM cache backend: {backend}")
+
+    logger.info(f"Using {backend} LLM response cache")
+    return ResponseCache(store, variants=int(os.getenv("LLM_CACHE_VARIANTS", "3")))
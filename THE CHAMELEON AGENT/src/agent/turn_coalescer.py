@@ -0,0 +1,99 @@
+"""
+Turn Coalescer
+Serializes turns per conversation and merges messages that arrive mid-turn
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from src.monitoring.metrics import COALESCED_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+
+class Turn:
+    """One caller's view of a conversation turn inside TurnCoalescer.turn()"""
+    
+    def __init__(self, items: List[Any], reply: Optional[str] = None):
+        # Messages this caller must answer (its own plus any queued behind the
+        # previous turn); empty when another caller's turn already answered it
+        self.items = items
+        self.reply = reply
+    
+    @property
+    def answered(self) -> bool:
+        return not self.items
+    
+    def resolve(self, reply: str) -> None:
+        self.reply = reply
+
+
+class _Session:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending: List[Tuple[Any, asyncio.Future]] = []
+        self.users = 0
+
+
+class TurnCoalescer:
+    """
+    Per-conversation turn queue
+    
+    Only one turn per conversation runs at a time, so conversation state is
+    read and written back without interleaving. Messages arriving while a turn
+    runs queue up; the first of them to get the conversation next answers all
+    of them with a single reply (one LLM call) and the others receive that
+    reply as-is. State is per process: with several workers, route a
+    conversation to one worker to coalesce across them.
+    """
+    
+    def __init__(self):
+        self._sessions: Dict[str, _Session] = {}
+    
+    @asynccontextmanager
+    async def turn(self, conversation_id: str, item: Any) -> AsyncIterator[Turn]:
+        """
+        Wait for the conversation and yield this caller's Turn
+        
+        Unless turn.answered, the caller must reply to every entry of
+        turn.items and pass the reply to turn.resolve(). If it raises instead,
+        the other queued messages are left for the next caller.
+        
+        Args:
+            conversation_id: Conversation the message belongs to
+            item: The caller's message (any value; handed back in turn.items)
+        """
+        session = self._sessions.get(conversation_id)
+        if session is None:
+            session = self._sessions[conversation_id] = _Session()
+        waiter = asyncio.get_running_loop().create_future()
+        session.pending.append((item, waiter))
+        session.users += 1
+        try:
+            async with session.lock:
+                if waiter.done():
+                    COALESCED_MESSAGES.inc()
+                    yield Turn([], waiter.result())
+                    return
+                
+                batch, session.pending = session.pending, []
+                if len(batch) > 1:
+                    logger.info(f"Coalescing {len(batch)} messages for {conversation_id} into one reply")
+                turn = Turn([queued for queued, _ in batch])
+                try:
+                    yield turn
+                finally:
+                    if turn.reply is None:
+                        session.pending[:0] = [entry for entry in batch if entry[1] is not waiter]
+                    else:
+                        for _, other in batch:
+                            if not other.done():
+                                other.set_result(turn.reply)
+        finally:
+            session.users -= 1
+            if not session.users:
+                del self._sessions[conversation_id]
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
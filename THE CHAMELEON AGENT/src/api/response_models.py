@@ -66,3 +66,22 @@ class HoneypotResponse(BaseModel):
     extracted_intelligence: Dict[str, Any] = Field(default={}, description="Extracted intelligence")
     engagement_metrics: EngagementMetrics = Field(..., description="Engagement metrics")
     metadata: Dict[str, Any] = Field(default={}, description="Additional metadata")
+
+
+class BatchResult(BaseModel):
+    """Detection and extraction result for one message of a batch"""
+    scam_detected: bool
+    scam_type: Optional[str] = None
+    confidence: float
+    signals_detected: List[str] = []
+    extracted_intelligence: Dict[str, Any] = {}
+    extraction_count: int = 0
+    campaign_id: Optional[str] = None
+    agent_response: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Batch scoring response, results in request order"""
+    results: List[BatchResult] = Field(..., description="One result per input message, in order")
+    total: int = Field(..., description="Number of messages scored")
+    scams_detected: int = Field(..., description="Number of messages flagged as scams")
@@ -0,0 +1,139 @@
+"""
+Batch Scoring
+Runs scam detection and entity extraction over many messages at once
+"""
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+from src.detection.scam_detector import ScamDetector
+from src.extraction.entity_extractor import EntityExtractor
+
+logger = logging.getLogger(__name__)
+
+# One detector/extractor per process: the compiled patterns are built once,
+# not per message or per chunk
+_detector: Optional[ScamDetector] = None
+_extractor: Optional[EntityExtractor] = None
+
+
+def init_worker() -> None:
+    """Build the pipeline in a pool process and silence its per-message INFO logs"""
+    logging.getLogger("src.extraction").setLevel(logging.WARNING)
+    _get_pipeline()
+
+
+def _get_pipeline():
+    global _detector, _extractor
+    if _detector is None:
+        _detector = ScamDetector()
+        _extractor = EntityExtractor()
+    return _detector, _extractor
+
+
+def score_message(message: str) -> Dict[str, Any]:
+    """
+    Detect scam intent and extract intelligence from a single message
+    
+    Returns:
+        Dict with scam_detected, scam_type, confidence, signals_detected,
+        extracted_intelligence and extraction_count
+    """
+    detector, extractor = _get_pipeline()
+    analysis = detector.analyze(message)
+    extraction = extractor.extract([message])
+    return {
+        "scam_detected": analysis["is_scam"],
+        "scam_type": analysis["scam_type"],
+        "confidence": analysis["confidence"],
+        "signals_detected": analysis["signals_detected"],
+        "extracted_intelligence": extraction["extracted_data"],
+        "extraction_count": extraction["extraction_count"]
+    }
+
+
+def score_chunk(messages: List[str]) -> List[Dict[str, Any]]:
+    """Score a chunk of messages in order (the unit of work sent to a pool process)"""
+    return [score_message(message) for message in messages]
+
+
+class BatchScorer:
+    """
+    Scores lists of messages across a process pool
+    
+    Regex matching holds the GIL, so threads cannot spread it over cores.
+    Messages are cut into chunks to amortize inter-process overhead; batches
+    smaller than one chunk are scored in-process. No LLM is involved.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.workers = workers or int(os.getenv("BATCH_WORKERS", "0")) or os.cpu_count() or 1
+        self.chunk_size = chunk_size or int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Worker processes, started on first use"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+            logger.info(f"Started batch scoring pool with {self.workers} workers")
+        return self._pool
+    
+    def close(self) -> None:
+        """Stop worker processes (call on application shutdown)"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+    
+    def _chunks(self, messages: List[str]) -> List[List[str]]:
+        return [messages[i:i + self.chunk_size] for i in range(0, len(messages), self.chunk_size)]
+    
+    def _use_pool(self, messages: List[str]) -> bool:
+        return self.workers > 1 and len(messages) > self.chunk_size
+    
+    def score(self, messages: List[str]) -> List[Dict[str, Any]]:
+        """
+        Score messages, returning one result per message in input order
+        
+        Args:
+            messages: Messages to analyze
+            
+        Returns:
+            List of score_message results
+        """
+        if not self._use_pool(messages):
+            return score_chunk(messages)
+        chunk_results = self.pool.map(score_chunk, self._chunks(messages))
+        return [result for results in chunk_results for result in results]
+    
+    async def score_async(self, messages: List[str]) -> List[Dict[str, Any]]:
+        """Score messages without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        if not self._use_pool(messages):
+            # Small batch: one chunk in the default thread pool beats a process round trip
+            return await loop.run_in_executor(None, score_chunk, messages)
+        
+        chunk_results = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, score_chunk, chunk) for chunk in self._chunks(messages)
+        ))
+        return [result for results in chunk_results for result in results]
+
+
+def score_messages(messages: List[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score messages with a temporary process pool
+    
+    Args:
+        messages: Messages to analyze
+        workers: Number of processes (default: BATCH_WORKERS or CPU count)
+        
+    Returns:
+        One result per message, in input order
+    """
+    scorer = BatchScorer(workers=workers)
+    try:
+        return scorer.score(messages)
+    finally:
+        scorer.close()
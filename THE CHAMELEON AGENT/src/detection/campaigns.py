@@ -0,0 +1,258 @@
+"""
+Campaign Clustering
+Streaming near-duplicate clustering of scam messages (MinHash signatures, LSH buckets)
+"""
+
+import os
+import re
+import time
+import zlib
+import random
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+import logging
+from src.monitoring.metrics import CAMPAIGNS, CAMPAIGN_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+# MinHash hash family h(x) = (a*x + b) mod 2**64 over 32-bit shingle hashes. The
+# functions are packed into one integer, one per 128-bit lane (a*x + b < 2**97 never
+# carries into the next lane), so hashing a shingle with all of them is one multiply.
+LANE_BITS = 128
+
+# Variable parts of a template (links, UPI IDs, amounts, phone numbers) become placeholders
+URL = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+\.(?:com|in|net|org|tk|xyz|top|info|co)\b\S*", re.IGNORECASE)
+UPI_OR_EMAIL = re.compile(r"\S+@\S+")
+NUMBER = re.compile(r"\d[\d,.\s-]*\d|\d")
+WORD = re.compile(r"[a-z<>#]+")
+
+
+class Campaign:
+    """One cluster of near-duplicate messages"""
+
+    __slots__ = ("campaign_id", "signature", "bands", "size", "first_seen", "last_seen", "scam_types", "example")
+
+    def __init__(self, campaign_id: str, signature: array, example: str, now: float):
+        self.campaign_id = campaign_id
+        # Signature of the first message; later messages must be this similar to join
+        self.signature = signature
+        # LSH bucket keys pointing at this campaign (removed on eviction)
+        self.bands = array("q")
+        self.size = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.scam_types: Dict[str, int] = {}
+        self.example = example
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "campaign_id": self.campaign_id,
+            "messages": self.size,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "scam_types": dict(self.scam_types),
+            "example": self.example,
+        }
+
+
+class CampaignClusterer:
+    """
+    Assigns each incoming message to a campaign of near-duplicates in one pass
+
+    A message is normalized (links, UPI IDs and numbers become placeholders),
+    cut into word shingles and reduced to a MinHash signature of
+    `bands * rows` values. The signature's bands are looked up in the LSH bucket
+    table: a campaign sharing a band whose signature agrees with the message on
+    at least `threshold` of its values (the estimated Jaccard similarity) gets
+    the message; otherwise it starts a new campaign. No message is compared with
+    another directly, so assignment costs the same however many were seen.
+
+    Memory is bounded: at most `max_campaigns` campaigns are kept, the least
+    recently active one being dropped with its buckets, and each campaign
+    registers the bands of at most `bands_per_campaign` member signatures.
+    """
+
+    def __init__(
+        self,
+        bands: int = 16,
+        rows: int = 3,
+        shingle_size: int = 2,
+        threshold: float = 0.4,
+        max_campaigns: int = 10_000,
+        bands_per_campaign: int = 8,
+        seed: int = 1
+    ):
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.max_campaigns = max_campaigns
+        self.bands_per_campaign = bands_per_campaign
+        generator = random.Random(seed)
+        self._multipliers = 0
+        self._increments = 0
+        for lane in range(bands * rows):
+            self._multipliers |= (generator.getrandbits(64) | 1) << (lane * LANE_BITS)
+            self._increments |= generator.getrandbits(64) << (lane * LANE_BITS)
+        self._packed_bytes = bands * rows * LANE_BITS // 8
+
+        self._lock = threading.Lock()
+        # Least recently active first
+        self._campaigns: "OrderedDict[str, Campaign]" = OrderedDict()
+        # LSH bucket key -> campaign ID
+        self._buckets: Dict[int, str] = {}
+        self.messages = 0
+        self.created = 0
+        self.evicted = 0
+        CAMPAIGNS.set_function(lambda: len(self._campaigns))
+
+    def shingles(self, message: str) -> List[int]:
+        """CRC32 hashes of the word shingles of the normalized message"""
+        text = URL.sub(" <url> ", message)
+        text = UPI_OR_EMAIL.sub(" <upi> ", text)
+        text = NUMBER.sub(" # ", text.lower())
+        words = WORD.findall(text)
+        size = min(self.shingle_size, len(words))
+        return list({
+            zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+            for i in range(len(words) - size + 1)
+        }) if words else []
+
+    def signature(self, shingles: List[int]) -> array:
+        """MinHash signature: per hash function, the smallest hash over the shingles"""
+        multipliers, increments, size = self._multipliers, self._increments, self._packed_bytes
+        # Low 64 bits of each lane, i.e. every other "Q" of the little-endian bytes
+        hashes = [
+            memoryview((multipliers * x + increments).to_bytes(size, "little")).cast("Q")[::2]
+            for x in shingles
+        ]
+        return array("Q", map(min, zip(*hashes)))
+
+    def _band_keys(self, signature: array) -> List[int]:
+        rows = self.rows
+        return [hash((band, *signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(first: array, second: array) -> float:
+        """Estimated Jaccard similarity of the messages behind two signatures"""
+        return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+    def assign(self, message: str, scam_type: Optional[str] = None) -> Optional[str]:
+        """
+        Campaign ID for a message, creating a campaign if it matches none
+
+        Args:
+            message: Incoming scammer message
+            scam_type: Detected scam type, counted in the campaign's stats
+
+        Returns:
+            The campaign ID, or None for a message without words
+        """
+        shingles = self.shingles(message)
+        if not shingles:
+            return None
+        signature = self.signature(shingles)
+        keys = self._band_keys(signature)
+        now = time.time()
+
+        with self._lock:
+            self.messages += 1
+            # Campaigns sharing a band, most shared bands first
+            hits: Dict[str, int] = {}
+            for key in keys:
+                campaign_id = self._buckets.get(key)
+                if campaign_id is not None:
+                    hits[campaign_id] = hits.get(campaign_id, 0) + 1
+            campaign = None
+            outcome = "joined"
+            for campaign_id in sorted(hits, key=hits.__getitem__, reverse=True):
+                candidate = self._campaigns[campaign_id]
+                if self.similarity(signature, candidate.signature) >= self.threshold:
+                    campaign = candidate
+                    break
+
+            if campaign is None:
+                campaign_id = "cmp-" + hashlib.blake2b(signature.tobytes(), digest_size=6).hexdigest()
+                campaign = self._campaigns.get(campaign_id)
+                if campaign is None:
+                    campaign = self._campaigns[campaign_id] = Campaign(campaign_id, signature, message[:200], now)
+                    self.created += 1
+                    outcome = "new"
+                    self._evict()
+
+            if len(campaign.bands) < self.bands * self.bands_per_campaign:
+                for key in keys:
+                    if self._buckets.get(key) != campaign.campaign_id:
+                        self._buckets[key] = campaign.campaign_id
+                        campaign.bands.append(key)
+
+            campaign.size += 1
+            campaign.last_seen = now
+            if scam_type:
+                campaign.scam_types[scam_type] = campaign.scam_types.get(scam_type, 0) + 1
+            self._campaigns.move_to_end(campaign.campaign_id)
+        CAMPAIGN_MESSAGES.inc(outcome=outcome)
+        return campaign.campaign_id
+
+    def _evict(self) -> None:
+        """Drop the least recently active campaigns beyond max_campaigns (caller holds the lock)"""
+        while len(self._campaigns) > self.max_campaigns:
+            campaign_id, campaign = self._campaigns.popitem(last=False)
+            for key in campaign.bands:
+                if self._buckets.get(key) == campaign_id:
+                    del self._buckets[key]
+            self.evicted += 1
+
+    def campaign(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            campaign = self._campaigns.get(campaign_id)
+            return campaign.to_dict() if campaign is not None else None
+
+    def top(self, limit: int = 20, active_within: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Largest campaigns, optionally only those with a message in the last `active_within` seconds
+
+        Returns:
+            Campaign stats (see Campaign.to_dict), most messages first
+        """
+        cutoff = time.time() - active_within if active_within is not None else None
+        with self._lock:
+            campaigns = [
+                campaign for campaign in self._campaigns.values()
+                if cutoff is None or campaign.last_seen >= cutoff
+            ]
+            campaigns.sort(key=lambda campaign: campaign.size, reverse=True)
+            return [campaign.to_dict() for campaign in campaigns[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "campaigns": len(self._campaigns),
+                "messages": self.messages,
+                "created": self.created,
+                "evicted": self.evicted,
+                "buckets": len(self._buckets),
+            }
+
+    def __len__(self) -> int:
+        return len(self._campaigns)
+
+
+def create_campaign_clusterer() -> Optional[CampaignClusterer]:
+    """
+    Build the campaign clusterer selected by environment variables (None when disabled)
+
+    CAMPAIGNS: on (default) or off
+    CAMPAIGN_MAX: campaigns kept in memory, least recently active dropped first (default 10000)
+    CAMPAIGN_THRESHOLD: estimated Jaccard similarity needed to join a campaign (default 0.4)
+    """
+    if os.getenv("CAMPAIGNS", "on").lower() != "on":
+        return None
+
+    return CampaignClusterer(
+        threshold=float(os.getenv("CAMPAIGN_THRESHOLD", "0.4")),
+        max_campaigns=int(os.getenv("CAMPAIGN_MAX", "10000"))
+    )
@@ -3,9 +3,9 @@ Scam Detection Engine
 Analyzes messages to detect scam intent and classify scam type
 """
 
-import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set
 import logging
+from src.detection.matcher import MultiPatternMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -112,6 +112,31 @@ class ScamDetector:
             r"(download|install) (this|the) (app|application|software)",
             r"call (us|this number|back)"
         ]
+        
+        self._matcher = self._build_matcher()
+    
+    def _build_matcher(self) -> MultiPatternMatcher:
+        """Compile every keyword and pattern into one matcher (done once per detector)"""
+        keywords = [kw for patterns in self.scam_patterns.values() for kw in patterns["keywords"]]
+        
+        # Patterns are registered as "<group>:<index>", where a group is a scam
+        # type or a signal. Signal lists stay separate patterns: one big
+        # alternation would lose the literal prefix each regex is prefiltered on.
+        groups = {scam_type: patterns["patterns"] for scam_type, patterns in self.scam_patterns.items()}
+        groups.update({
+            "urgency": self.urgency_patterns,
+            "authority_claim": self.authority_patterns,
+            "action_request": self.action_patterns,
+        })
+        
+        named_patterns = {}
+        self._pattern_names: Dict[str, List[str]] = {}
+        for group, patterns in groups.items():
+            names = [f"{group}:{i}" for i in range(len(patterns))]
+            named_patterns.update(zip(names, patterns))
+            self._pattern_names[group] = names
+        
+        return MultiPatternMatcher(keywords, named_patterns)
     
     def analyze(self, message: str, history: List[Any] = None) -> Dict[str, Any]:
         """
@@ -126,10 +151,13 @@ class ScamDetector:
         """
         message_lower = message.lower()
         
+        # Single pass over the message for every keyword and pattern
+        keywords_found, patterns_found = self._matcher.scan(message_lower)
+        
         # Calculate scores for each scam type
         scam_scores = {}
         for scam_type, patterns in self.scam_patterns.items():
-            score = self._calculate_scam_score(message_lower, patterns)
+            score = self._calculate_scam_score(scam_type, patterns, keywords_found, patterns_found)
             scam_scores[scam_type] = score
         
         # Get the highest scoring scam type
@@ -140,17 +168,17 @@ class ScamDetector:
         signals = []
         
         # Check for urgency
-        if any(re.search(pattern, message_lower) for pattern in self.urgency_patterns):
+        if self._signal_found("urgency", patterns_found):
             signals.append("urgency")
             max_score += 0.1
         
         # Check for authority claims
-        if any(re.search(pattern, message_lower) for pattern in self.authority_patterns):
+        if self._signal_found("authority_claim", patterns_found):
             signals.append("authority_claim")
             max_score += 0.15
         
         # Check for action requests
-        if any(re.search(pattern, message_lower) for pattern in self.action_patterns):
+        if self._signal_found("action_request", patterns_found):
             signals.append("action_request")
             max_score += 0.15
         
@@ -171,16 +199,26 @@ class ScamDetector:
         logger.debug(f"Scam analysis result: {result}")
         return result
     
-    def _calculate_scam_score(self, message: str, patterns: Dict[str, List[str]]) -> float:
-        """Calculate scam score for a specific scam type"""
+    def _signal_found(self, signal: str, patterns_found: Set[str]) -> bool:
+        """True if any pattern of the signal matched"""
+        return any(name in patterns_found for name in self._pattern_names[signal])
+    
+    def _calculate_scam_score(
+        self,
+        scam_type: str,
+        patterns: Dict[str, List[str]],
+        keywords_found: Set[str],
+        patterns_found: Set[str]
+    ) -> float:
+        """Calculate scam score for a specific scam type from the matcher hits"""
         score = 0.0
         
         # Keyword matching (each keyword adds 0.1, max 0.5)
-        keyword_matches = sum(1 for keyword in patterns["keywords"] if keyword in message)
+        keyword_matches = sum(1 for keyword in patterns["keywords"] if keyword in keywords_found)
         score += min(keyword_matches * 0.1, 0.5)
         
         # Pattern matching (each pattern adds 0.2, max 0.6)
-        pattern_matches = sum(1 for pattern in patterns["patterns"] if re.search(pattern, message))
+        pattern_matches = sum(1 for name in self._pattern_names[scam_type] if name in patterns_found)
         score += min(pattern_matches * 0.2, 0.6)
         
         return score
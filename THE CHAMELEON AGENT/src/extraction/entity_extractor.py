@@ -4,25 +4,165 @@ Extracts intelligence from conversations (bank accounts, UPI IDs, URLs, phone nu
 """
 
 import re
-from typing import Dict, List, Any
+import hashlib
+from bisect import bisect_left
+from itertools import groupby
+from operator import attrgetter
+from typing import Dict, List, Any, Iterable, NamedTuple, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Entity type -> field that identifies an entity (used for dedup across turns)
+ENTITY_KEYS = {
+    "bank_accounts": "account_number",
+    "upi_ids": "upi_id",
+    "phone_numbers": "number",
+    "urls": "url",
+    "names": "name",
+}
+
+
+class EntityMatch(NamedTuple):
+    """One entity occurrence found by the scanner"""
+    kind: str     # "account", "ifsc", "upi", "phone", "url" or "name"
+    value: str
+    message: int  # Index of the message it was found in
+    start: int    # Character offsets within that message
+    end: int
+
+
+def match_distance(match: EntityMatch, other: EntityMatch) -> Tuple[int, int, int]:
+    """
+    How far apart two matches are, for picking the closest one: messages
+    between them first, then characters between them within a message.
+    The last item breaks ties in favour of `other` coming after `match`.
+    """
+    if other.message != match.message:
+        return abs(other.message - match.message), 0, int(other.message < match.message)
+    if other.start >= match.end:
+        return 0, other.start - match.end, 0
+    if other.end <= match.start:
+        return 0, match.start - other.end, 1
+    return 0, 0, 0
+
+
+class OffsetIndex:
+    """Matches of one kind sorted by (message, start), for nearest-match lookups by bisection"""
+    
+    def __init__(self, matches: Iterable[EntityMatch] = ()):
+        self._keys: List[Tuple[int, int]] = []
+        self._matches: List[EntityMatch] = []
+        for match in matches:
+            self.add(match)
+    
+    def __len__(self) -> int:
+        return len(self._matches)
+    
+    def add(self, match: EntityMatch) -> None:
+        """Insert a match (an append when matches arrive in scan order)"""
+        key = (match.message, match.start)
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+            self._matches.append(match)
+        else:
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._matches.insert(position, match)
+    
+    def following(self, message: int, offset: int) -> Optional[EntityMatch]:
+        """First match in `message` starting at or after `offset`"""
+        position = bisect_left(self._keys, (message, offset))
+        if position < len(self._keys) and self._keys[position][0] == message:
+            return self._matches[position]
+        return None
+    
+    def preceding(self, message: int, offset: int) -> Optional[EntityMatch]:
+        """Last match in `message` starting before `offset`"""
+        position = bisect_left(self._keys, (message, offset))
+        if position and self._keys[position - 1][0] == message:
+            return self._matches[position - 1]
+        return None
+    
+    def nearest(self, match: EntityMatch) -> Optional[EntityMatch]:
+        """Closest match to `match` anywhere in the conversation (see match_distance)"""
+        position = bisect_left(self._keys, (match.message, match.start))
+        candidates = self._matches[max(position - 1, 0):position + 1]
+        return min(candidates, key=lambda candidate: match_distance(match, candidate), default=None)
+    
+    def pair(self, anchors: List[EntityMatch], max_distance: Optional[int] = None) -> List[Optional[EntityMatch]]:
+        """
+        Pair each anchor with a match from its own stretch of the message
+        
+        Lists of accounts read either "account, details" or "details, account",
+        so each anchor looks only as far as its neighbour on one side. That side
+        is after the anchor, unless the first anchor has something before it
+        and the last has nothing after it. A lone anchor takes the closer side.
+        
+        Args:
+            anchors: Matches from one message, in order (e.g. its account numbers)
+            max_distance: Ignore matches more than this many characters away
+            
+        Returns:
+            The paired match (or None) for each anchor
+        """
+        after, before = [], []
+        for i, anchor in enumerate(anchors):
+            candidate = self.following(anchor.message, anchor.end)
+            if candidate is not None and (
+                (i + 1 < len(anchors) and candidate.start >= anchors[i + 1].start)
+                or (max_distance is not None and candidate.start - anchor.end > max_distance)
+            ):
+                candidate = None
+            after.append(candidate)
+            
+            candidate = self.preceding(anchor.message, anchor.start)
+            if candidate is not None and (
+                (i and candidate.start < anchors[i - 1].end)
+                or candidate.end > anchor.start
+                or (max_distance is not None and anchor.start - candidate.end > max_distance)
+            ):
+                candidate = None
+            before.append(candidate)
+        
+        if len(anchors) == 1:
+            found = [c for c in (after[0], before[0]) if c is not None]
+            return [min(found, key=lambda c: match_distance(anchors[0], c), default=None)]
+        if before[0] is not None and after[-1] is None:
+            return before
+        return after
+
+
+# Token-level patterns. The scanner splits each message into whitespace-separated
+# tokens once and only runs a pattern on the tokens that can hold that entity.
+UPI_ID = re.compile(r'\b[\w.\-]+@\w+\b')
+URL = re.compile(
+    r'https?://\S+|www\.\S+|(?<![a-z0-9-])[a-z0-9-]+\.(?:com|in|org|net|co\.in|info|xyz|tk|ml|ga|cf|gq)\S*',
+    re.IGNORECASE
+)
+# IFSC code (4 letters + 0 + 6 alphanumeric) or a 9-18 digit bank account number
+CODE_OR_ACCOUNT = re.compile(r'\b(?:(?P<ifsc>(?i:[a-z]{4}0[a-z0-9]{6}))|(?P<account>\d{9,18}))\b')
+
+# Indian mobile number (starts with 6-9, 10 digits)
+PHONE_NUMBER = re.compile(r'[6-9]\d{9}')
+
+# Punctuation around a token that is not part of the entity
+TRIM = ".,;:!?()[]{}<>\"'+"
+
+# Words announcing a name ("Name: Ramesh Kumar", "beneficiary is ...")
+NAME_CUES = {"name", "beneficiary"}
+# A cue joined to the first word of the name ("Name:Ramesh", "Beneficiary-Ramesh", "AccountHolder:Ramesh")
+GLUED_NAME_CUE = re.compile(r'(name|beneficiary|holder|accountholder)[:\-]+(?=[A-Za-z])', re.IGNORECASE)
+MAX_NAME_WORDS = 3
+MAX_CUED_NAME_WORDS = 4
+
+NOT_NAMES = {'dear sir', 'dear madam', 'hello sir', 'thank you'}
+
 
 class EntityExtractor:
     """Extracts and validates entities from scam conversations"""
     
     def __init__(self):
-        # Indian bank account patterns
-        self.bank_account_pattern = re.compile(r'\b\d{9,18}\b')
-        
-        # IFSC code pattern (4 letters + 0 + 6 alphanumeric)
-        self.ifsc_pattern = re.compile(r'\b[A-Z]{4}0[A-Z0-9]{6}\b', re.IGNORECASE)
-        
-        # UPI ID pattern
-        self.upi_pattern = re.compile(r'\b[\w\.\-]+@[\w]+\b')
-        
         # Known UPI handles for validation
         self.known_upi_handles = [
             'paytm', 'ybl', 'oksbi', 'axl', 'icici', 'hdfcbank', 'ibl',
@@ -30,20 +170,163 @@ class EntityExtractor:
             'boi', 'cnrb', 'unionbank', 'indianbank', 'sc', 'federal'
         ]
         
-        # Indian mobile number pattern (starts with 6-9, 10 digits)
-        self.phone_pattern = re.compile(r'\b[6-9]\d{9}\b')
+        # Holder names are looked for this many characters around an account number
+        self.holder_window = 50
+    
+    def scan(self, messages: List[str], first: int = 0) -> List[EntityMatch]:
+        """
+        Find every entity occurrence in one pass over each message
         
-        # URL patterns
-        self.url_pattern = re.compile(
-            r'https?://[^\s]+|www\.[^\s]+|[a-zA-Z0-9-]+\.(com|in|org|net|co\.in|info|xyz|tk|ml|ga|cf|gq)[^\s]*',
-            re.IGNORECASE
-        )
+        Messages are tokenized in place (never joined), so offsets are relative
+        to the message they were found in and no match spans two messages.
         
-        # Name extraction patterns
-        self.name_patterns = [
-            re.compile(r'(?:name|account holder|beneficiary)[\s:]+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})', re.IGNORECASE),
-            re.compile(r'\b([A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b')
-        ]
+        Args:
+            messages: Messages to scan, oldest first
+            first: Index of messages[0] in the conversation
+            
+        Returns:
+            Matches in the order they appear
+        """
+        matches = []
+        for index, text in enumerate(messages, first):
+            self._scan_message(text, index, matches)
+        return matches
+    
+    def _scan_message(self, text: str, index: int, matches: List[EntityMatch]) -> None:
+        """Tokenize one message and append its entity matches"""
+        # Consecutive capitalized words (a name candidate), as (word, start) pairs
+        run: List[tuple] = []
+        run_cued = False
+        cued = False
+        previous = ""
+        # Offsets are only looked up for tokens that yield something
+        located = 0
+        
+        for token in text.split():
+            # Offsets are looked up for the whole token, then moved past a glued cue
+            whole, glued = token, 0
+            cue = GLUED_NAME_CUE.match(token)
+            if cue and (cue.group(1).lower() != "holder" or previous == "account"):
+                if run:
+                    self._flush_name(run, run_cued, index, matches)
+                cued = True
+                glued = cue.end()
+                token = token[glued:]
+            
+            if token.isalpha() and token.islower():
+                # Plain lowercase word: never an entity, at most a name cue
+                if run:
+                    self._flush_name(run, run_cued, index, matches)
+                if token in NAME_CUES or (token == "holder" and previous == "account"):
+                    cued = True
+                elif token != "is":
+                    cued = False
+                previous = token
+                continue
+            
+            if '@' in token and '://' not in token:
+                if run:
+                    self._flush_name(run, run_cued, index, matches)
+                cued = False
+                upis = list(UPI_ID.finditer(token))
+                # Numbers glued on with punctuation ("abc@ybl,9876543210") are entities too
+                codes = [
+                    code for code in CODE_OR_ACCOUNT.finditer(token)
+                    if not any(upi.start() < code.end() and code.start() < upi.end() for upi in upis)
+                ]
+                if upis or codes:
+                    start = self._locate(text, whole, located) + glued
+                    located = start + len(token)
+                    found = len(matches)
+                    for match in upis:
+                        upi = match.group()
+                        matches.append(EntityMatch("upi", upi, index, start + match.start(), start + match.end()))
+                        # Phone-number UPI IDs (9876543210@paytm) also give away the number
+                        local = upi.split('@')[0]
+                        if PHONE_NUMBER.fullmatch(local):
+                            matches.append(EntityMatch("phone", local, index, start + match.start(),
+                                                       start + match.start() + len(local)))
+                    self._add_codes(codes, start, index, matches)
+                    matches[found:] = sorted(matches[found:], key=attrgetter("start"))
+                continue
+            
+            if '.' in token or '/' in token:
+                match = URL.search(token)
+                if match:
+                    if run:
+                        self._flush_name(run, run_cued, index, matches)
+                    cued = False
+                    start = self._locate(text, whole, located) + glued
+                    located = start + len(token)
+                    matches.append(EntityMatch("url", match.group(), index, start + match.start(), located))
+                    continue
+            
+            core = token.strip(TRIM)
+            if core.istitle() and core.isalpha() and len(core) > 1 and core.isascii():
+                lowered = core.lower()
+                if lowered in NAME_CUES or (lowered == "holder" and previous == "account"):
+                    if run:
+                        self._flush_name(run, run_cued, index, matches)
+                    cued = True
+                else:
+                    # A capitalized word continues the run unless punctuation separates them
+                    if run and token[0] != core[0]:
+                        self._flush_name(run, run_cued, index, matches)
+                    if not run:
+                        run_cued = cued
+                    start = self._locate(text, whole, located) + glued
+                    located = start + len(token)
+                    run.append((core, start + token.find(core)))
+                    if token[-1] != core[-1]:
+                        self._flush_name(run, run_cued, index, matches)
+                    cued = False
+            else:
+                lowered = core.lower()
+                if run:
+                    self._flush_name(run, run_cued, index, matches)
+                if lowered in NAME_CUES:
+                    cued = True
+                else:
+                    cued = cued and lowered == "is"
+                if not core.isalpha():
+                    codes = list(CODE_OR_ACCOUNT.finditer(token))
+                    if codes:
+                        start = self._locate(text, whole, located) + glued
+                        located = start + len(token)
+                        self._add_codes(codes, start, index, matches)
+            previous = lowered
+        
+        if run:
+            self._flush_name(run, run_cued, index, matches)
+    
+    def _add_codes(self, codes: List[re.Match], start: int, index: int, matches: List[EntityMatch]) -> None:
+        """Append the IFSC code and account number matches of a token found at offset start"""
+        for match in codes:
+            kind = match.lastgroup
+            value = match.group()
+            matches.append(EntityMatch(kind, value, index, start + match.start(), start + match.end()))
+            # A mobile number is also a candidate account number
+            if kind == "account" and PHONE_NUMBER.fullmatch(value):
+                matches.append(EntityMatch("phone", value, index, start + match.start(), start + match.end()))
+    
+    def _locate(self, text: str, token: str, start: int) -> int:
+        """Offset of the first whitespace-delimited occurrence of token at or after start"""
+        position = text.find(token, start)
+        while (position > 0 and not text[position - 1].isspace()) or \
+                (position + len(token) < len(text) and not text[position + len(token)].isspace()):
+            position = text.find(token, position + 1)
+        return position
+    
+    def _flush_name(self, run: List[tuple], cued: bool, index: int, matches: List[EntityMatch]) -> None:
+        """Turn a run of capitalized words into name matches (2+ words each) and clear it"""
+        size = MAX_CUED_NAME_WORDS if cued else MAX_NAME_WORDS
+        while len(run) >= 2:
+            words, run[:] = run[:size], run[size:]
+            last_word, last_start = words[-1]
+            name = " ".join(word for word, _ in words)
+            matches.append(EntityMatch("name", name, index, words[0][1], last_start + len(last_word)))
+            size = MAX_NAME_WORDS
+        run.clear()
     
     def extract(self, messages: List[str]) -> Dict[str, Any]:
         """
@@ -55,221 +338,260 @@ class EntityExtractor:
         Returns:
             Dictionary with extracted entities and metadata
         """
-        # Combine all messages
-        full_text = " ".join(messages)
-        
-        # Extract each entity type
-        bank_accounts = self._extract_bank_accounts(full_text)
-        upi_ids = self._extract_upi_ids(full_text)
-        phone_numbers = self._extract_phone_numbers(full_text)
-        urls = self._extract_urls(full_text)
-        names = self._extract_names(full_text)
+        matches = self.scan(messages)
+        entities = self._build_entities(matches)
+        self._link_ifsc_codes(
+            entities["bank_accounts"],
+            [match for match in matches if match.kind == "account"],
+            OffsetIndex(match for match in matches if match.kind == "ifsc")
+        )
         
         # Build extracted data structure
-        extracted_data = {}
-        
-        if bank_accounts:
-            extracted_data["bank_accounts"] = bank_accounts
-        
-        if upi_ids:
-            extracted_data["upi_ids"] = upi_ids
-        
-        if phone_numbers:
-            extracted_data["phone_numbers"] = phone_numbers
-        
-        if urls:
-            extracted_data["urls"] = urls
-        
-        if names:
-            extracted_data["names"] = names
+        extracted_data = {entity_type: found for entity_type, found in entities.items() if found}
         
         # Calculate total extraction count
-        extraction_count = (
-            len(bank_accounts) + len(upi_ids) + 
-            len(phone_numbers) + len(urls) + len(names)
-        )
+        extraction_count = sum(len(found) for found in entities.values())
         
-        logger.info(f"Extracted {extraction_count} entities: {len(bank_accounts)} bank accounts, "
-                   f"{len(upi_ids)} UPI IDs, {len(phone_numbers)} phones, "
-                   f"{len(urls)} URLs, {len(names)} names")
+        logger.info(f"Extracted {extraction_count} entities: {len(entities['bank_accounts'])} bank accounts, "
+                   f"{len(entities['upi_ids'])} UPI IDs, {len(entities['phone_numbers'])} phones, "
+                   f"{len(entities['urls'])} URLs, {len(entities['names'])} names")
         
         return {
             "extracted_data": extracted_data,
             "extraction_count": extraction_count
         }
     
-    def _extract_bank_accounts(self, text: str) -> List[Dict[str, Any]]:
-        """Extract bank account numbers with IFSC codes"""
-        accounts = []
-        seen_accounts = set()
+    @staticmethod
+    def fingerprint(messages: List[str]) -> str:
+        """Digest of the messages' content and order"""
+        digest = hashlib.blake2b(digest_size=16)
+        for text in messages:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\x1e")
+        return digest.hexdigest()
+    
+    @classmethod
+    def resume_point(cls, messages: List[str], accumulated: Optional[Dict[str, Any]]) -> int:
+        """
+        Index of the first message extract_incremental will scan for this state
         
-        # Find all potential account numbers
-        account_matches = self.bank_account_pattern.findall(text)
+        Only when the messages scanned so far are still the start of `messages`.
+        Otherwise the client rewrote the conversation, or sends a window of it
+        (or none, or two coalesced requests sent different histories): start
+        over, as the messages given are all there is to go on. So does state
+        from before positions and fingerprints were recorded.
+        """
+        if not accumulated or "fingerprint" not in accumulated:
+            return 0
+        scanned = accumulated.get("scanned", 0)
+        if scanned > len(messages) or cls.fingerprint(messages[:scanned]) != accumulated["fingerprint"]:
+            return 0
+        return scanned
+    
+    def extract_incremental(
+        self,
+        messages: List[str],
+        accumulated: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract intelligence scanning only messages not seen on earlier turns
         
-        # Find all IFSC codes
-        ifsc_matches = self.ifsc_pattern.findall(text)
+        Entities found so far are kept in `accumulated` (JSON-serializable, meant
+        to live in conversation state) and merged with what the new messages
+        contain: duplicates collapse into one entry that keeps the highest
+        confidence and any fields either side had.
         
-        for account in account_matches:
-            # Skip if already seen or too short/long
-            if account in seen_accounts or len(account) < 9 or len(account) > 18:
-                continue
-            
-            seen_accounts.add(account)
-            
-            # Try to find associated IFSC code
-            ifsc_code = ifsc_matches[0] if ifsc_matches else None
-            
-            # Try to find account holder name
-            holder_name = self._find_nearby_name(text, account)
-            
-            # Calculate confidence
-            confidence = 0.6  # Base confidence
-            if ifsc_code:
-                confidence += 0.3  # IFSC code present
-            if holder_name:
-                confidence += 0.1  # Name present
-            
-            account_data = {
-                "account_number": account,
-                "confidence": round(min(confidence, 1.0), 2)
-            }
+        Args:
+            messages: All messages in the conversation so far, oldest first
+            accumulated: The "state" returned for this conversation last turn
             
-            if ifsc_code:
-                account_data["ifsc_code"] = ifsc_code.upper()
+        Returns:
+            Same as extract, plus "state" to pass back on the next turn
+        """
+        if self.resume_point(messages, accumulated) == 0:
+            accumulated = {"scanned": 0, "entities": {}, "positions": {"account": [], "ifsc": []}}
+        
+        new_matches = self.scan(messages[accumulated["scanned"]:], first=accumulated["scanned"])
+        entities = accumulated["entities"]
+        positions = accumulated["positions"]
+        
+        if new_matches:
+            new_entities = self._build_entities(new_matches)
+            for entity_type, found in new_entities.items():
+                if found:
+                    merged = entities.setdefault(entity_type, [])
+                    self._merge_entities(merged, found, ENTITY_KEYS[entity_type])
             
-            if holder_name:
-                account_data["account_holder"] = holder_name
+            # Accounts and IFSC codes are remembered with their offsets ([value, message, start, end])
+            # so a code arriving turns after an account number can still be linked to it
+            for match in new_matches:
+                if match.kind in positions:
+                    positions[match.kind].append(list(match[1:]))
             
-            accounts.append(account_data)
+            if positions["ifsc"] and entities.get("bank_accounts"):
+                self._link_ifsc_codes(
+                    entities["bank_accounts"],
+                    [EntityMatch("account", *entry) for entry in positions["account"]],
+                    OffsetIndex(EntityMatch("ifsc", *entry) for entry in positions["ifsc"])
+                )
         
-        return accounts
-    
-    def _extract_upi_ids(self, text: str) -> List[Dict[str, Any]]:
-        """Extract UPI IDs"""
-        upi_ids = []
-        seen_upis = set()
+        new_messages = len(messages) - accumulated["scanned"]
+        accumulated["scanned"] = len(messages)
+        accumulated["fingerprint"] = self.fingerprint(messages)
+        extraction_count = sum(len(found) for found in entities.values())
         
-        matches = self.upi_pattern.findall(text)
+        logger.debug(f"Incremental extraction scanned {new_messages} new messages, "
+                     f"{extraction_count} entities accumulated")
         
-        for upi in matches:
-            # Skip emails and already seen
-            if upi in seen_upis or '@gmail' in upi.lower() or '@yahoo' in upi.lower():
+        return {
+            "extracted_data": {entity_type: found for entity_type, found in entities.items() if found},
+            "extraction_count": extraction_count,
+            "state": accumulated
+        }
+    
+    def _merge_entities(self, merged: List[Dict[str, Any]], found: List[Dict[str, Any]], key: str) -> None:
+        """Add newly found entities to merged, combining duplicates by key"""
+        index = {entity[key]: entity for entity in merged}
+        for entity in found:
+            existing = index.get(entity[key])
+            if existing is None:
+                merged.append(entity)
+                index[entity[key]] = entity
                 continue
-            
-            seen_upis.add(upi)
-            
-            # Extract handle
-            handle = upi.split('@')[1].lower() if '@' in upi else ''
-            
-            # Calculate confidence based on known handles
-            confidence = 0.95 if handle in self.known_upi_handles else 0.7
-            
-            upi_ids.append({
-                "upi_id": upi,
-                "confidence": confidence
-            })
-        
-        return upi_ids
+            for field, value in entity.items():
+                existing.setdefault(field, value)
+            existing["confidence"] = max(existing["confidence"], entity["confidence"])
     
-    def _extract_phone_numbers(self, text: str) -> List[Dict[str, Any]]:
-        """Extract Indian phone numbers"""
-        phones = []
-        seen_phones = set()
+    def _account_confidence(self, account: Dict[str, Any]) -> float:
+        """Confidence of a bank account from the details attached to it"""
+        confidence = 0.6  # Base confidence
+        if account.get("ifsc_code"):
+            confidence += 0.3  # IFSC code present
+        if account.get("account_holder"):
+            confidence += 0.1  # Name present
+        return round(min(confidence, 1.0), 2)
+    
+    def _link_ifsc_codes(
+        self,
+        accounts: List[Dict[str, Any]],
+        occurrences: List[EntityMatch],
+        ifsc_index: OffsetIndex
+    ) -> None:
+        """
+        Attach to each account the IFSC code closest to any mention of it
         
-        matches = self.phone_pattern.findall(text)
+        Within a message accounts and codes are paired row by row (OffsetIndex.pair);
+        an account in a message without codes takes the code from the nearest
+        message that has one.
         
-        for phone in matches:
-            if phone in seen_phones:
-                continue
-            
-            seen_phones.add(phone)
-            
-            phones.append({
-                "number": phone,
-                "confidence": 0.7  # Medium confidence (could be fake)
-            })
-        
-        return phones
+        Args:
+            accounts: Account records to update in place
+            occurrences: Every "account" match of the conversation
+            ifsc_index: Every "ifsc" match of the conversation
+        """
+        if not ifsc_index:
+            return
+        
+        closest: Dict[str, Tuple[Tuple[int, int, int], EntityMatch]] = {}
+        for message, group in groupby(occurrences, key=attrgetter("message")):
+            group = list(group)
+            if ifsc_index.following(message, 0) is None:
+                # No code in this message: borrow the one from the nearest message
+                linked = [ifsc_index.nearest(occurrence) for occurrence in group]
+            else:
+                linked = ifsc_index.pair(group)
+            for occurrence, ifsc in zip(group, linked):
+                if ifsc is None:
+                    continue
+                distance = match_distance(occurrence, ifsc)
+                if occurrence.value not in closest or distance < closest[occurrence.value][0]:
+                    closest[occurrence.value] = (distance, ifsc)
+        
+        for account in accounts:
+            if account["account_number"] in closest:
+                account["ifsc_code"] = closest[account["account_number"]][1].value.upper()
+                account["confidence"] = self._account_confidence(account)
     
-    def _extract_urls(self, text: str) -> List[Dict[str, Any]]:
-        """Extract URLs and phishing links"""
-        urls = []
-        seen_urls = set()
+    def _build_entities(self, matches: List[EntityMatch]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Turn scanner matches into entity records, one per distinct value
         
-        matches = self.url_pattern.findall(text)
+        Accounts get a holder name paired with one of their mentions in the
+        same message (OffsetIndex.pair); IFSC codes are linked separately (_link_ifsc_codes).
         
-        for url in matches:
-            if isinstance(url, tuple):
-                url = url[0] if url[0] else url[1]
+        Args:
+            matches: Output of scan
             
-            if url in seen_urls:
+        Returns:
+            Entity type -> records, in order of first appearance
+        """
+        entities = {entity_type: [] for entity_type in ENTITY_KEYS}
+        seen = set()
+        names = OffsetIndex(match for match in matches if match.kind == "name" and self._is_name(match.value))
+        holders: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        if names:
+            accounts = [match for match in matches if match.kind == "account"]
+            for _, group in groupby(accounts, key=attrgetter("message")):
+                group = list(group)
+                for account, holder in zip(group, names.pair(group, max_distance=self.holder_window)):
+                    if holder is None:
+                        continue
+                    distance = match_distance(account, holder)
+                    if account.value not in holders or distance < holders[account.value][0]:
+                        holders[account.value] = (distance, holder.value)
+        
+        for match in matches:
+            if (match.kind, match.value) in seen:
                 continue
             
-            seen_urls.add(url)
-            
-            # Extract domain
-            domain = self._extract_domain(url)
-            
-            # Check for suspicious indicators
-            is_suspicious = self._is_suspicious_url(url, domain)
-            
-            confidence = 0.9 if is_suspicious else 0.8
+            if match.kind == "account":
+                account_data = {"account_number": match.value, "confidence": 0.0}
+                if match.value in holders:
+                    account_data["account_holder"] = holders[match.value][1]
+                account_data["confidence"] = self._account_confidence(account_data)
+                entities["bank_accounts"].append(account_data)
             
-            url_data = {
-                "url": url,
-                "confidence": confidence
-            }
+            elif match.kind == "upi":
+                # Skip emails
+                lowered = match.value.lower()
+                if '@gmail' in lowered or '@yahoo' in lowered:
+                    continue
+                # Calculate confidence based on known handles
+                handle = lowered.split('@')[1]
+                confidence = 0.95 if handle in self.known_upi_handles else 0.7
+                entities["upi_ids"].append({"upi_id": match.value, "confidence": confidence})
             
-            if domain:
-                url_data["domain"] = domain
+            elif match.kind == "phone":
+                entities["phone_numbers"].append({
+                    "number": match.value,
+                    "confidence": 0.7  # Medium confidence (could be fake)
+                })
             
-            urls.append(url_data)
-        
-        return urls
-    
-    def _extract_names(self, text: str) -> List[Dict[str, Any]]:
-        """Extract names from text"""
-        names = []
-        seen_names = set()
-        
-        for pattern in self.name_patterns:
-            matches = pattern.findall(text)
-            for match in matches:
-                name = match if isinstance(match, str) else match[0]
-                name = name.strip()
+            elif match.kind == "url":
+                url_data = {"url": match.value, "confidence": 0.0}
                 
-                # Skip if already seen or too short
-                if name in seen_names or len(name) < 4:
-                    continue
-                
-                # Skip common words
-                if name.lower() in ['dear sir', 'dear madam', 'hello sir', 'thank you']:
+                # Extract domain and check for suspicious indicators
+                domain = self._extract_domain(match.value)
+                if domain:
+                    url_data["domain"] = domain
+                url_data["confidence"] = 0.9 if self._is_suspicious_url(match.value, domain) else 0.8
+                entities["urls"].append(url_data)
+            
+            elif match.kind == "name":
+                if not self._is_name(match.value):
                     continue
-                
-                seen_names.add(name)
-                
-                names.append({
-                    "name": name,
+                entities["names"].append({
+                    "name": match.value,
                     "confidence": 0.6  # Low confidence (easily faked)
                 })
+            
+            seen.add((match.kind, match.value))
         
-        return names
+        return entities
     
-    def _find_nearby_name(self, text: str, account: str) -> str:
-        """Find name near account number"""
-        # Look for name within 50 characters before or after account number
-        account_pos = text.find(account)
-        if account_pos == -1:
-            return None
-        
-        context = text[max(0, account_pos - 50):account_pos + 50]
-        
-        for pattern in self.name_patterns:
-            match = pattern.search(context)
-            if match:
-                return match.group(1) if isinstance(match.group(1), str) else match.group(0)
-        
-        return None
+    def _is_name(self, name: str) -> bool:
+        """Whether a capitalized phrase is plausibly a person's name"""
+        return len(name) >= 4 and name.lower() not in NOT_NAMES
     
     def _extract_domain(self, url: str) -> str:
         """Extract domain from URL"""
@@ -0,0 +1,461 @@
+"""
+Reply Templates
+Per-persona early-conversation replies for the rule-based fast path
+"""
+
+from typing import Dict, List
+
+# Keywords that identify what the scammer is pushing for. A message matching
+# several intents equally well is ambiguous and goes to the LLM.
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "account_threat": ["kyc", "blocked", "suspend", "freeze", "frozen", "deactivat", "expire", "verify your account", "pan card", "aadhaar"],
+    "prize": [" won ", "winner", "lottery", "prize", "congratulations", "lucky draw", "reward", "cashback", "kbc"],
+    "job_offer": ["job", "work from home", "part time", "part-time", " earn", "salary", "hiring", "vacancy", "income"],
+    "tech_problem": ["virus", "malware", "hacked", "computer", "laptop", "microsoft", "windows", "remote", "anydesk", "teamviewer"],
+    "payment_request": ["pay", "fee", "charges", "transfer", "deposit", "send money", "processing", "registration"],
+    "otp_request": ["otp", "one time password", "verification code", " pin ", "cvv"],
+    "link_click": ["click", "link", "http", "www.", "download", "install", " app "],
+    "romance": ["dear", "darling", "beautiful", "lonely", "love", "miss you", "meet you"],
+    "greeting": ["hello", "hi ", "good morning", "good evening", "namaste", "how are you"],
+}
+
+# Questions whose honest answer needs the model (or a decision we should not
+# template): their presence sends the turn to the LLM regardless of intent.
+ESCALATE_PHRASES: List[str] = [
+    "your name", "your age", "date of birth", "your address", "which bank", "your bank",
+    "who is this", "are you a bot", "are you real", "why are you", "are you sure", "prove",
+    "video call", "photo", "police", "court", "arrest",
+]
+
+# Short interjections mixed into replies so repeated templates don't read identically
+OPENERS: Dict[str, List[str]] = {
+    "Ramesh Kumar": ["Arre beta!", "Hai Ram!", "Oh ho!", "Beta, one minute.", ""],
+    "Priya Sharma": ["Oh wow!", "Okay okay.", "Really?", "Thank you for messaging.", ""],
+    "Amit Patel": ["Hmm.", "Okay.", "Understood.", "Wait a moment.", ""],
+    "Sneha Reddy": ["Oh my god!", "Wow!", "Arey!", "Really?", ""],
+    "Rajesh Verma": ["Hey!", "Oh.", "Haha.", "Hmm.", ""],
+}
+
+# persona name -> intent -> templates. {amount}, {upi_id}, {phone} and {link}
+# are filled from entities seen in the conversation; templates whose slots
+# cannot be filled are skipped.
+TEMPLATES: Dict[str, Dict[str, List[str]]] = {
+    "Ramesh Kumar": {
+        "account_threat": [
+            "My account will be blocked? My pension comes in that account only. What should I do?",
+            "I worked 30 years in a bank and never had this problem. Please tell me slowly what to do.",
+            "KYC is pending? My son did all this online work. Can you guide me step by step?",
+            "Please don't block it, all my savings are there. Which office are you calling from?",
+            "Blocked today itself? Beta, the branch is closed now. Can it be done from home?",
+            "I updated my Aadhaar last year only. Why is it asking again? Please explain.",
+            "Theek hai, I will do it. But what documents do you need from me?",
+            "My wife also has a joint account with me. Will that also be blocked?",
+        ],
+        "prize": [
+            "I won something? I don't remember entering any contest. What do I have to do?",
+            "At my age, winning a prize! My wife will not believe it. How do I get it?",
+            "Really I am the winner? Please explain properly, I am not good with these things.",
+            "God is kind! I was just praying for some help with medicine bills. How do I claim?",
+            "Prize money will come in my pension account? Or you will send a cheque?",
+            "Is this from the KBC show? I watch it every week! What is the process?",
+            "My grandson says nothing is free these days. But you sound genuine. What next?",
+        ],
+        "job_offer": [
+            "A job at my age? I am retired, but some extra money will help. What is the work?",
+            "Is this work possible from home? I only know basic computer. Please explain.",
+            "I have time the whole day after my morning walk. How many hours is the work?",
+            "Will payment come every week or every month? My pension is not enough these days.",
+            "I was a bank clerk for 30 years, I am good with numbers. Is that useful for this?",
+            "My eyes are weak, can I do this work on the phone or only on computer?",
+        ],
+        "tech_problem": [
+            "Virus in my computer? I only use it for email and news. What should I press?",
+            "My grandson set up this computer. Should I switch it off? Please tell me what to do.",
+            "Oh no, is my bank data safe? I do net banking on this computer only.",
+            "The computer was slow yesterday also! So this is why. How do we fix it?",
+            "You want me to install something? I don't know how to download, please guide slowly.",
+            "Hai Ram, my photos of the grandchildren are also on it. Will they get deleted?",
+        ],
+        "payment_request": [
+            "I have to pay {amount}? How do I send it, I don't use these apps much.",
+            "Pay to {upi_id}? Let me find my glasses. Is there some other way to pay?",
+            "I have to pay something? I only know how to do cheque. Is there another method?",
+            "How much exactly should I send, and to which account? Please write it clearly.",
+            "{amount} is a lot for me, beta. Can I pay half now and half after pension comes?",
+            "My son handles Paytm for me. Can I give you his number, or you tell me bank account?",
+            "I tried to send but it is showing some error. Do you have another account number?",
+        ],
+        "otp_request": [
+            "OTP? My phone has so many messages, which one is it? Please wait, I am searching.",
+            "The message came but the numbers are very small. Shall I call you on {phone} and read it out?",
+            "Which OTP beta? There are three messages from the bank. Please tell me which one.",
+            "The message says don't share with anyone. But you are from the bank only, no?",
+            "My phone is charging in the other room. Give me five minutes, I am walking slowly.",
+            "I got a code but then my screen went off. Can you send it again?",
+        ],
+        "link_click": [
+            "I clicked but nothing is opening. My internet is very slow today. Can you send it again?",
+            "The link {link} is not opening on my phone. Is there some other way?",
+            "Which button do I press after opening the link? Please guide me slowly.",
+            "It is showing some blue page with English words. What should I do now?",
+            "My phone is old, it says app not supported. Can I do it on computer instead?",
+            "I pressed the link, it is asking for card number. Is that correct?",
+        ],
+        "greeting": [
+            "Yes, hello? Who is speaking? My hearing is not so good, please speak clearly.",
+            "Hello beta, yes this is Ramesh. What is it regarding?",
+            "Namaste! I was just having my tea. Tell me, what is the matter?",
+            "Hello? Is this from the bank? They said someone will contact me.",
+            "Yes yes, I am here. Sorry, I was finding my glasses. Who is this?",
+            "Good morning ji. Is this about my pension?",
+        ],
+    },
+    "Priya Sharma": {
+        "job_offer": [
+            "This is exactly what I was looking for! What will my daily work be?",
+            "I just finished my graduation and really need this. How do I start?",
+            "Work from home would be perfect for me! How much can I earn in the first month?",
+            "Is this a full-time or part-time role? I can start immediately!",
+            "Really?! I have been applying for months. Do I need any experience?",
+            "Will I get an offer letter? My parents will want to see something official.",
+            "I can work evenings and weekends too! Is there a training period?",
+            "Is the payment daily or weekly? I want to start helping at home soon.",
+        ],
+        "payment_request": [
+            "There is a registration fee of {amount}? Is it refundable after I join?",
+            "Should I send it to {upi_id}? Can you share the company details first so I can tell my parents?",
+            "I have to pay first? My savings are limited. Can it be deducted from my salary?",
+            "Okay, how do I pay? Which account or UPI should I use?",
+            "{amount} is okay I think, but my UPI limit got over today. Is bank transfer fine?",
+            "My friend also wants to join! Should we both pay to the same account?",
+            "I tried paying but it failed twice. Do you have another UPI ID?",
+        ],
+        "prize": [
+            "I won? I applied to so many things, which one was this? How do I claim it?",
+            "That is amazing! What details do you need from me?",
+            "Oh my god, really?! This is my lucky week! What do I do next?",
+            "I never win anything! Is it cash or a voucher?",
+            "Wow, can I use this money for my course fees? How soon will it come?",
+            "Should I send my details on WhatsApp or here itself?",
+        ],
+        "account_threat": [
+            "My account will be blocked? I need it for my salary once I get a job! What should I do?",
+            "KYC update? I am not sure how to do it. Can you help me?",
+            "Oh no, I just opened this account last year! Why is it getting blocked?",
+            "Is it because I did not use it much? Please help me, I have my scholarship money there.",
+            "What documents do you need? I have my Aadhaar and PAN ready.",
+            "Can I do the KYC on the phone itself? I am not at home right now.",
+        ],
+        "tech_problem": [
+            "My laptop has a virus? I have all my assignments on it! What do I do?",
+            "It was hanging a lot yesterday, so maybe you are right. How do I fix it?",
+            "Do I need to install some app? Please tell me the steps, I will do it now.",
+            "Is my phone also affected? I use the same WiFi for both.",
+            "I can't lose my resume files! Can you help me remove it quickly?",
+            "Which software should I download? My brother usually does these things.",
+        ],
+        "otp_request": [
+            "I got an OTP, but it says do not share with anyone. Is it safe to share with you?",
+            "Which OTP do you need? I got two messages just now.",
+            "Wait, the OTP expired before I could read it. Can you send a new one?",
+            "The message is from some unknown number. Is that the right one?",
+            "I got it! But why is it asking for an OTP for a job registration?",
+            "One second, my phone is on low battery, let me plug it in first.",
+        ],
+        "link_click": [
+            "The link {link} is showing an error. Can you send the company website instead?",
+            "I opened the link, it is asking for many details. What should I fill?",
+            "The page is not loading on my college WiFi. Can you send it on email?",
+            "It is asking me to download an app. Is that safe? What is the app name?",
+            "I filled the form but the submit button is not working. What should I do?",
+            "The link looks different from the company name. Is this the official one?",
+        ],
+        "greeting": [
+            "Hello! Yes, this is Priya. Is this about the job application?",
+            "Hi! How can I help you?",
+            "Hi! Sorry, I was in class. Who is this?",
+            "Hello! Are you from the placement team?",
+            "Hey, yes this is Priya speaking. What is this regarding?",
+            "Good evening! Did I apply for something with your company?",
+        ],
+    },
+    "Amit Patel": {
+        "account_threat": [
+            "My account is under review? I have always been compliant. What exactly is the issue?",
+            "What kind of verification is pending? I want to resolve this properly.",
+            "Is there a reference number for this case? I want to keep a record for compliance.",
+            "Which branch or department is handling this? I would like the officer's name.",
+            "I updated my KYC in March. Could you confirm which document is missing?",
+            "Is there a written notice for this? Please share it so I can review it.",
+            "What is the deadline exactly, and what happens if it is not completed?",
+        ],
+        "payment_request": [
+            "A payment of {amount}? Please share the official account details and a receipt.",
+            "Should the payment go to {upi_id}? I need the beneficiary name for my records.",
+            "Before I pay anything, can you send the details in writing? Which account should I use?",
+            "I can only pay to a registered company account. Please share the IFSC and account number.",
+            "What is this {amount} for exactly? I need an invoice with the GST number.",
+            "My UPI has a daily limit for new payees. Is there a bank account I can use instead?",
+            "Will I receive an official receipt once the payment is made?",
+        ],
+        "tech_problem": [
+            "There is a security issue on my system? Which ticket number is this under?",
+            "I work in IT, but this sounds serious. What exactly did your system detect?",
+            "Which software do you want me to install? I need to verify it with our IT policy.",
+            "Can you share the logs or the alert ID? I want to check it myself.",
+            "Is this related to the Windows update from last week? Please explain the details.",
+            "Which of my devices is affected? I have a laptop and a desktop on the same network.",
+        ],
+        "otp_request": [
+            "I received a code, but the message says not to share it. What exactly is it for?",
+            "Which OTP is required and what is it authorizing? I want to be sure.",
+            "The message does not mention your company. Can you explain why it came from the bank?",
+            "Could you confirm the last four digits of the account this OTP is for?",
+            "I received two codes. Which transaction reference does yours match?",
+            "The code has expired. Please tell me the exact steps before sending another one.",
+        ],
+        "link_click": [
+            "Is {link} the official portal? My browser is flagging it. Can you give me another link?",
+            "The page is asking for a lot of data. Which fields are mandatory?",
+            "The certificate on this page looks invalid. Is there an alternate domain?",
+            "Our office network blocks unknown links. Can you send the details by email instead?",
+            "Which company owns this website? I would like to check the registration.",
+            "The page timed out. Could you share the link again?",
+        ],
+        "prize": [
+            "I won something? Which organization is running this? I want to check the terms.",
+            "Could you share the reference number for this prize and the official notice?",
+            "How was I selected? I don't recall registering for any contest.",
+            "What are the tax implications? I will need a proper document for my records.",
+            "Which department is handling the claim, and who is the officer in charge?",
+            "Is there a written confirmation I can review before proceeding?",
+        ],
+        "job_offer": [
+            "What is the company name and role? I would like to understand the contract terms.",
+            "Could you share the job description and the company registration number?",
+            "What is the compensation structure, and how are payments made?",
+            "Is this a contract or a full-time position? I would like the offer in writing.",
+            "Who would I be reporting to? Please share their name and designation.",
+            "How did you get my profile? I want to understand the hiring process.",
+        ],
+        "greeting": [
+            "Hello, this is Amit. Who am I speaking with, and what is this regarding?",
+            "Good afternoon. May I know your name and organization?",
+            "Hello. I am in a meeting right now, but go ahead briefly. What is this about?",
+            "Yes, this is Amit Patel. Which company are you calling from?",
+            "Hello. Is this an official communication? Please introduce yourself.",
+            "Good evening. How did you get this number?",
+        ],
+    },
+    "Sneha Reddy": {
+        "prize": [
+            "I actually won? I never win anything! What do I have to do to get it?",
+            "This is so exciting! My husband will be so surprised. How do I claim it?",
+            "Really, a prize for me? Please tell me the next steps quickly!",
+            "I can't believe it! Is it cash or a gift? What details do you need?",
+            "Oh my god, is it the car or the cash prize? Tell me fast!",
+            "Can I collect it today itself? I am so excited!",
+            "I will tell my sister also, she will be so jealous! How do I get it?",
+            "Is it from that shopping festival? I bought so many things there!",
+        ],
+        "payment_request": [
+            "I have to pay {amount} first? That's okay if I get the prize. How do I send it?",
+            "Should I pay to {upi_id}? Let me check my balance. Is there another UPI if this fails?",
+            "A small fee is fine! Which account or UPI should I pay to?",
+            "{amount} only? Okay okay, but my GPay is showing some error. Any other account?",
+            "I don't have that much right now. Can I pay after the prize comes?",
+            "My husband has the bank app. Can you give me the account number, I will ask him?",
+            "Is the processing fee refundable? I will pay, just tell me where.",
+        ],
+        "otp_request": [
+            "An OTP just came! But it is in English and Telugu, which number should I tell?",
+            "Wait, I got a message. Is that the code you need to release the prize?",
+            "I got two codes! Which one do you want?",
+            "The OTP came but my phone hung. Can you send it again?",
+            "It says do not share with anyone. But this is for my prize, no?",
+            "One minute, my son took my phone to play games. Let me get it back!",
+        ],
+        "link_click": [
+            "The link {link} is taking very long to load. Can you send it on WhatsApp?",
+            "I clicked the link! It's asking for my details. What should I fill?",
+            "It's asking for card details! Is that for the prize delivery?",
+            "The page opened but it is all in English. Which button do I press?",
+            "My phone says the site is not safe. Should I still open it?",
+            "I filled everything but it says try again later. What now?",
+        ],
+        "account_threat": [
+            "My account has a problem? My husband handles the bank things. What should I do?",
+            "Blocked?! But my salary comes there! Please help me, what should I do?",
+            "KYC? I did it when I opened the account. Do I have to do it again?",
+            "Oh no, today itself? Tell me quickly what to send!",
+            "Will my prize money also get stuck if the account is blocked?",
+            "Which documents do you need? I have Aadhaar on my phone.",
+        ],
+        "job_offer": [
+            "A job from home? That would be perfect with my kids! What is the work?",
+            "Really? How much can I earn in a month?",
+            "I used to work before marriage. Can I start again with this?",
+            "Is it only on the phone? I don't have a laptop.",
+            "Wow! Do I need to go anywhere for training?",
+            "What timings? I can work when the kids are at school.",
+        ],
+        "tech_problem": [
+            "My phone has a virus? That's why it's so slow! What should I do?",
+            "Oh my god, my photos are all there! Please help me fix it!",
+            "Should I download some app? Tell me the name, I will do it now.",
+            "My son installed many games, maybe that's why. How to remove the virus?",
+            "Will my WhatsApp also get hacked? Please tell me quickly!",
+            "I don't know much about computers. Can you guide me step by step?",
+        ],
+        "greeting": [
+            "Hello! Yes, this is Sneha. Who is calling?",
+            "Hi! Is this about the lucky draw? I entered so many!",
+            "Hello? Sorry, the kids are making noise. Who is this?",
+            "Yes, Sneha speaking! What is it about?",
+            "Hi! Is this from the shopping app?",
+            "Hello hello! Tell me, what happened?",
+        ],
+    },
+    "Rajesh Verma": {
+        "romance": [
+            "That is so sweet of you to say. Tell me more about yourself?",
+            "It's nice to talk to someone who understands. Where are you from?",
+            "I've been feeling lonely lately, talking to you helps. What do you do?",
+            "You always know what to say. What made you message me?",
+            "I was hoping you would text today. How was your day?",
+            "It has been a long time since someone spoke to me like this. Tell me about your family?",
+            "I'd love to know more about you. What do you like to do on weekends?",
+        ],
+        "payment_request": [
+            "You need {amount}? I want to help you. How should I send it?",
+            "I can help, but my bank app is acting up. Is there another UPI besides {upi_id}?",
+            "Of course I'll help you. Tell me where to send the money?",
+            "I want to help, but my salary comes next week. Can you wait a few days?",
+            "My UPI limit is over for today. Can you give me a bank account number?",
+            "I tried sending but it failed. Does it need to be in your name exactly?",
+        ],
+        "greeting": [
+            "Hey! Nice to hear from you. How has your day been?",
+            "Hi there! I was just thinking about you. How are you?",
+            "Hello! It's been a quiet evening, glad you messaged.",
+            "Hey, good morning! Did you sleep well?",
+            "Hi! I was hoping to hear from you today.",
+            "Hello! Sorry for the late reply, work was busy. How are you?",
+        ],
+        "link_click": [
+            "The link {link} isn't opening on my phone. Can you share your number instead?",
+            "I tried the link but it asks me to log in. Can you just tell me what it says?",
+            "The page is blank on my side. Shall I try from the laptop later?",
+            "It's asking for my card details. Why does it need that?",
+            "My phone blocked the link as unsafe. Can you send it another way?",
+            "I clicked it but nothing happened. Can you send it again?",
+        ],
+        "otp_request": [
+            "I got some code on my phone. Why do you need it?",
+            "A code came from the bank. Is that the one you mean?",
+            "The OTP expired while I was reading your message. Can you send it again?",
+            "It says never share this code. Are you sure it's needed?",
+            "I got two messages with numbers. Which one should I tell you?",
+            "Let me find my phone, it's in the other room. One minute.",
+        ],
+        "account_threat": [
+            "My account will be blocked? I just used it yesterday. What's wrong?",
+            "That's worrying. What do I need to do to keep it active?",
+            "KYC again? I updated it a few months ago. Which document is missing?",
+            "Can I do it online, or do I need to visit the branch?",
+            "Is it the savings account or the salary account? I have both.",
+            "Okay, tell me what you need. I don't want any trouble with the bank.",
+        ],
+        "prize": [
+            "I won? That's a nice surprise! What's the prize?",
+            "Really? I don't usually get lucky. How do I claim it?",
+            "Haha, is this real? What do I need to do?",
+            "That would be a great help right now. What are the next steps?",
+            "Which contest was this? I don't remember entering one.",
+            "Is it cash or something else? Tell me more.",
+        ],
+        "job_offer": [
+            "Extra income would be nice. What kind of work is it?",
+            "I have a job already, but I can do something part time. How many hours?",
+            "What's the pay like, and how do they pay?",
+            "Is it online work? I'm free in the evenings.",
+            "Sounds interesting. What do I need to get started?",
+            "Who is the company? I'd like to look them up.",
+        ],
+        "tech_problem": [
+            "A virus? My laptop has been slow lately. What should I do?",
+            "Is my data safe? I do all my banking on this laptop.",
+            "What do I need to install? I'm not great with these things.",
+            "Should I turn off the WiFi? Tell me the steps.",
+            "I did get some strange pop-ups yesterday. How do we fix it?",
+            "Which device is affected, phone or laptop?",
+        ],
+    },
+}
+
+# Used for personas or intents without their own templates
+DEFAULT_TEMPLATES: Dict[str, List[str]] = {
+    "account_threat": [
+        "My account will be blocked? I'm very worried. What should I do?",
+        "Oh no, what is the problem with my account? Please help me fix it.",
+        "Which documents do you need to update it?",
+        "Can this be done online, or do I need to go to the branch?",
+        "Why is it getting blocked? I have not done anything wrong.",
+    ],
+    "prize": [
+        "Really? I won something? How do I claim it?",
+        "That's amazing! What do I need to do next?",
+        "Which contest was this? I don't remember entering.",
+        "Is it cash or a gift? What details do you need?",
+        "Wow! How soon will I get it?",
+    ],
+    "job_offer": [
+        "This sounds interesting! What exactly is the work?",
+        "How much can I earn, and how do I start?",
+        "Is it part time or full time?",
+        "Do I need any experience for this?",
+        "Which company is this? Can you share the details?",
+    ],
+    "tech_problem": [
+        "Is something wrong with my computer? I'm not good with technology. What should I do?",
+        "Is my data safe? What should I do first?",
+        "Which app do I need to install?",
+        "Should I switch it off? Please guide me.",
+        "It was running slow, so maybe that is why. How do we fix it?",
+    ],
+    "payment_request": [
+        "How much do I need to pay, and to which account?",
+        "I have to pay {amount}? Where should I send it?",
+        "My UPI is not working right now. Is there a bank account I can use?",
+        "Can I pay later? I don't have the full amount now.",
+        "The payment failed. Do you have another account?",
+    ],
+    "otp_request": [
+        "Which OTP do you need? I got a few messages.",
+        "The OTP expired. Can you send it again?",
+        "It says don't share it with anyone. Why do you need it?",
+        "One minute, let me find my phone.",
+        "I got two codes. Which one should I tell you?",
+    ],
+    "link_click": [
+        "The link is not opening. Can you send it again?",
+        "It is asking for a lot of details. What should I fill?",
+        "My phone says the page is not safe. Is there another link?",
+        "The page is loading very slowly. Can you send it another way?",
+        "Which button do I press after opening it?",
+    ],
+    "romance": [
+        "That's kind of you. Tell me more about yourself?",
+        "Where are you from? I'd like to know more about you.",
+        "That's sweet of you to say. What do you do?",
+        "It's nice talking to you. How was your day?",
+        "Why did you decide to message me?",
+    ],
+    "greeting": [
+        "Hello? Who is this?",
+        "Hi, who am I speaking with?",
+        "Hello! What is this regarding?",
+        "Yes, hello? How did you get my number?",
+        "Hi there. How can I help you?",
+    ],
+}
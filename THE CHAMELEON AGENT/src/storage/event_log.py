@@ -0,0 +1,203 @@
+"""
+Conversation Event Log
+Append-only, segment-rotated log of conversation events for crash recovery and replay
+"""
+
+import os
+import json
+import mmap
+import time
+import zlib
+import heapq
+import struct
+import threading
+from typing import Dict, Any, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Record header: payload length and CRC32 of the payload (little-endian uint32 each)
+HEADER = struct.Struct("<II")
+SEGMENT_SUFFIX = ".log"
+
+
+class EventLog:
+    """
+    Append-only log of JSON events, split into segment files
+
+    A record is a length/CRC32 header followed by the JSON payload, written with a
+    single os.write. A crash can only leave a torn record at the end of a segment;
+    readers stop there. Each process appends to its own segments, named
+    <creation time ns>-<pid>.log, opening a new one on its first append and whenever
+    the current one would grow past `segment_bytes`. Every event gets a "ts" that
+    never decreases within a segment, so segments merge into one timeline.
+
+    Appended records are in the OS page cache at once and survive a process crash.
+    fsync (which also survives losing the machine) is batched: a background thread
+    syncs at most every `fsync_interval` seconds when something was written, off
+    the caller's thread. An interval of 0 syncs on every append instead.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, fsync_interval: float = 0.05):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._size = 0
+        self._last_ts = 0.0
+        self._dirty = False
+        # Rotated-out segments waiting for their final fsync and close
+        self._retired: List[int] = []
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        self.appended = 0
+        self.fsyncs = 0
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Write one event (a JSON-serializable dict); its "ts" is set here"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # First append, or the first in a forked worker: never write to the parent's segment
+                self._start()
+            ts = self._last_ts = max(time.time(), self._last_ts)
+            payload = json.dumps({"ts": ts, **event}, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            record = HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+            if self._fd is None or (self._size and self._size + len(record) > self.segment_bytes):
+                self._rotate()
+
+            view = memoryview(record)
+            while view:
+                view = view[os.write(self._fd, view):]
+            self._size += len(record)
+            self.appended += 1
+
+            if self.fsync_interval > 0:
+                self._dirty = True
+            else:
+                os.fsync(self._fd)
+                self.fsyncs += 1
+
+    def flush(self) -> None:
+        """fsync everything appended so far"""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            fd, dirty = self._fd, self._dirty
+            retired, self._retired = self._retired, []
+            self._dirty = False
+        for old in retired:
+            os.fsync(old)
+            os.close(old)
+        if dirty and fd is not None:
+            os.fsync(fd)
+            self.fsyncs += 1
+
+    def close(self) -> None:
+        """Sync and close the current segment; a later append starts a new one"""
+        if self._flusher is not None and self._pid == os.getpid():
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        with self._lock:
+            if self._fd is not None and self._pid == os.getpid():
+                os.close(self._fd)
+            self._fd = None
+            self._pid = None
+
+    def _start(self) -> None:
+        """Reset per-process state (caller holds the lock)"""
+        self._pid = os.getpid()
+        self._fd = None
+        self._retired = []
+        self._dirty = False
+        if self.fsync_interval > 0:
+            self._stop = threading.Event()
+            self._flusher = threading.Thread(target=self._flush_loop, name="event-log-fsync", daemon=True)
+            self._flusher.start()
+
+    def _rotate(self) -> None:
+        """Switch appends to a new segment (caller holds the lock)"""
+        if self._fd is not None:
+            if self.fsync_interval > 0:
+                self._retired.append(self._fd)
+            else:
+                os.close(self._fd)
+        path = os.path.join(self.directory, f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}")
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+        self._size = 0
+
+    def _flush_loop(self) -> None:
+        stop = self._stop
+        while not stop.wait(self.fsync_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"Event log fsync failed: {e}")
+
+    def segments(self) -> List[str]:
+        """Segment paths, oldest first"""
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, name) for name in names]
+
+    @staticmethod
+    def read_segment(path: str) -> Iterator[Dict[str, Any]]:
+        """Events of one segment through a read-only memory map, stopping at a torn or corrupt record"""
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as data:
+                offset = 0
+                while offset + HEADER.size <= size:
+                    length, crc = HEADER.unpack_from(data, offset)
+                    end = offset + HEADER.size + length
+                    if end > size:
+                        logger.warning(f"Torn record at {path}:{offset}, ignoring the rest of the segment")
+                        return
+                    payload = data[offset + HEADER.size:end]
+                    if zlib.crc32(payload) != crc:
+                        logger.warning(f"Corrupt record at {path}:{offset}, ignoring the rest of the segment")
+                        return
+                    yield json.loads(payload)
+                    offset = end
+                if offset != size:
+                    logger.warning(f"Torn record at {path}:{offset}, ignoring the rest of the segment")
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """Every event in the log in timestamp order, merged across segments and processes"""
+        return heapq.merge(*(self.read_segment(path) for path in self.segments()), key=lambda event: event["ts"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "segments": len(self.segments()),
+            "appended": self.appended,
+            "fsyncs": self.fsyncs,
+        }
+
+
+def create_event_log() -> Optional[EventLog]:
+    """
+    Build the event log selected by environment variables (None when disabled)
+
+    EVENT_LOG: off (default) or on
+    EVENT_LOG_DIR: directory holding the segments (default chameleon_events)
+    EVENT_LOG_SEGMENT_MB: size at which a new segment is started (default 64)
+    EVENT_LOG_FSYNC_MS: fsync batching interval (default 50; 0 syncs every append)
+    """
+    if os.getenv("EVENT_LOG", "off").lower() != "on":
+        return None
+
+    event_log = EventLog(
+        directory=os.getenv("EVENT_LOG_DIR", "chameleon_events"),
+        segment_bytes=int(float(os.getenv("EVENT_LOG_SEGMENT_MB", "64")) * 1024 * 1024),
+        fsync_interval=float(os.getenv("EVENT_LOG_FSYNC_MS", "50")) / 1000
+    )
+    logger.info(f"Appending conversation events to {event_log.directory}")
+    return event_log
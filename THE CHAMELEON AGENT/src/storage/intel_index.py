@@ -0,0 +1,326 @@
+"""
+Intelligence Index
+Cross-conversation inverted index of extracted UPI IDs, bank accounts, phone numbers and URLs
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows: single worker only
+    fcntl = None
+
+KINDS = ("upi", "account", "phone", "url")
+
+# extracted_data entity type -> (index kind, field holding the value)
+EXTRACTED_KINDS = {
+    "upi_ids": ("upi", "upi_id"),
+    "bank_accounts": ("account", "account_number"),
+    "phone_numbers": ("phone", "number"),
+    "urls": ("url", "url"),
+}
+
+NON_DIGITS = re.compile(r"\D")
+URL_PREFIX = re.compile(r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?")
+
+
+def normalize(kind: str, value: str) -> Optional[str]:
+    """
+    Canonical form of an entity value, so spellings of the same entity share a key
+
+    UPI IDs and URLs are lowercased (URLs also lose scheme, "www." and trailing
+    slashes), accounts keep their digits and phone numbers their last 10 digits.
+    Returns None for values with nothing left to index.
+    """
+    value = value.strip()
+    if kind == "upi":
+        value = value.lower()
+    elif kind == "account":
+        value = NON_DIGITS.sub("", value)
+    elif kind == "phone":
+        value = NON_DIGITS.sub("", value)[-10:]
+    elif kind == "url":
+        value = URL_PREFIX.sub("", value.lower()).rstrip("/")
+    else:
+        raise ValueError(f"Unknown entity kind: {kind}")
+    return value or None
+
+
+class IntelIndex:
+    """
+    Inverted index from normalized entities to the conversations they appeared in
+
+    A lookup is one dict probe. Storage stays compact as sightings pile up:
+    conversation IDs and persona names are interned to small integers, each
+    entity's conversations are an array('I') posting list in first-seen order, and
+    first/last-seen times are array('d') columns indexed by entity number.
+    Updates are incremental and idempotent: re-adding an entity a conversation
+    already has only moves its last-seen time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # "kind:value" -> entity number, and the columns indexed by it
+        self._keys: Dict[str, int] = {}
+        self._postings: List[array] = []
+        self._first_seen = array("d")
+        self._last_seen = array("d")
+        # Conversation number -> ID, persona number and entity numbers (for deduplication)
+        self._conversations: Dict[str, int] = {}
+        self._conversation_ids: List[str] = []
+        self._conversation_personas = array("H")
+        self._conversation_entities: List[array] = []
+        # Persona number -> name; 0 is "unknown"
+        self._personas: Dict[str, int] = {"unknown": 0}
+        self._persona_names: List[str] = ["unknown"]
+
+    def add(
+        self,
+        conversation_id: str,
+        entities: Iterable[Tuple[str, str]],
+        persona: Optional[str] = None,
+        ts: Optional[float] = None
+    ) -> None:
+        """
+        Record entities seen in a conversation
+
+        Args:
+            conversation_id: Conversation the entities were extracted from
+            entities: (kind, value) pairs, kind being one of KINDS
+            persona: Persona engaging the conversation, if known
+            ts: Time of the sighting (default now); replays pass the original time
+        """
+        keys = []
+        for kind, value in entities:
+            normalized = normalize(kind, value)
+            if normalized is not None:
+                keys.append(f"{kind}:{normalized}")
+        if not keys:
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            conversation = self._conversation_number(conversation_id, persona)
+            seen = self._conversation_entities[conversation]
+            for key in keys:
+                number = self._keys.get(key)
+                if number is None:
+                    number = self._keys[sys.intern(key)] = len(self._postings)
+                    self._postings.append(array("I"))
+                    self._first_seen.append(ts)
+                    self._last_seen.append(ts)
+                else:
+                    self._first_seen[number] = min(self._first_seen[number], ts)
+                    self._last_seen[number] = max(self._last_seen[number], ts)
+                if number not in seen:
+                    seen.append(number)
+                    self._postings[number].append(conversation)
+
+    def add_extraction(
+        self,
+        conversation_id: str,
+        extracted_data: Dict[str, List[Dict[str, Any]]],
+        persona: Optional[str] = None,
+        ts: Optional[float] = None
+    ) -> None:
+        """Record the entities of an EntityExtractor result ("extracted_data")"""
+        self.add(conversation_id, self.entities(extracted_data), persona, ts)
+
+    @staticmethod
+    def entities(extracted_data: Dict[str, List[Dict[str, Any]]]) -> Iterator[Tuple[str, str]]:
+        """(kind, value) pairs of the indexed entity types in an extraction result"""
+        for entity_type, (kind, field) in EXTRACTED_KINDS.items():
+            for entity in extracted_data.get(entity_type, ()):
+                if entity.get(field):
+                    yield kind, str(entity[field])
+
+    def _conversation_number(self, conversation_id: str, persona: Optional[str]) -> int:
+        """Intern a conversation (caller holds the lock)"""
+        number = self._conversations.get(conversation_id)
+        persona_number = 0
+        if persona:
+            persona_number = self._personas.get(persona)
+            if persona_number is None:
+                persona_number = self._personas[sys.intern(persona)] = len(self._persona_names)
+                self._persona_names.append(persona)
+        if number is None:
+            number = self._conversations[sys.intern(conversation_id)] = len(self._conversation_ids)
+            self._conversation_ids.append(conversation_id)
+            self._conversation_personas.append(persona_number)
+            self._conversation_entities.append(array("I"))
+        elif persona_number and not self._conversation_personas[number]:
+            self._conversation_personas[number] = persona_number
+        return number
+
+    def lookup(self, kind: str, value: str, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """
+        Everything known about one entity
+
+        Args:
+            kind: One of KINDS
+            value: Entity value in any spelling normalize() accepts
+            limit: Most recent conversation IDs to include
+
+        Returns:
+            None if never seen, else conversation count, first/last-seen times,
+            conversations per persona and the `limit` latest conversation IDs
+        """
+        normalized = normalize(kind, value)
+        if normalized is None:
+            return None
+        with self._lock:
+            number = self._keys.get(f"{kind}:{normalized}")
+            if number is None:
+                return None
+            postings = self._postings[number]
+            personas: Dict[str, int] = {}
+            for conversation in postings:
+                name = self._persona_names[self._conversation_personas[conversation]]
+                personas[name] = personas.get(name, 0) + 1
+            return {
+                "kind": kind,
+                "value": normalized,
+                "conversations": len(postings),
+                "first_seen": self._first_seen[number],
+                "last_seen": self._last_seen[number],
+                "personas": personas,
+                "conversation_ids": [self._conversation_ids[c] for c in postings[-limit:]] if limit > 0 else []
+            }
+
+    def search(self, value: str, kind: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Lookups of `value` as `kind`, or as every kind when kind is None (one probe each)"""
+        results = []
+        for candidate in ((kind,) if kind else KINDS):
+            result = self.lookup(candidate, value, limit)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entities": len(self._postings),
+                "conversations": len(self._conversation_ids),
+                "postings": sum(len(postings) for postings in self._postings),
+            }
+
+    def merge(self, other: "IntelIndex") -> None:
+        """Add everything another index has seen (merging the same index again changes nothing)"""
+        with other._lock:
+            entities = [
+                (key, other._first_seen[number], other._last_seen[number], [
+                    (other._conversation_ids[c], other._persona_names[other._conversation_personas[c]])
+                    for c in other._postings[number]
+                ])
+                for key, number in other._keys.items()
+            ]
+        with self._lock:
+            for key, first_seen, last_seen, conversations in entities:
+                number = self._keys.get(key)
+                if number is None:
+                    number = self._keys[sys.intern(key)] = len(self._postings)
+                    self._postings.append(array("I"))
+                    self._first_seen.append(first_seen)
+                    self._last_seen.append(last_seen)
+                else:
+                    self._first_seen[number] = min(self._first_seen[number], first_seen)
+                    self._last_seen[number] = max(self._last_seen[number], last_seen)
+                for conversation_id, persona in conversations:
+                    conversation = self._conversation_number(conversation_id, persona if persona != "unknown" else None)
+                    seen = self._conversation_entities[conversation]
+                    if number not in seen:
+                        seen.append(number)
+                        self._postings[number].append(conversation)
+
+    def save(self, path: str) -> None:
+        """
+        Merge the index into the JSON file at `path`
+
+        Each worker process saves its own part on shutdown, so the file is read,
+        merged and rewritten (atomically) under an exclusive lock rather than
+        overwritten by whichever worker exits last.
+        """
+        with locked(f"{path}.lock"):
+            merged = IntelIndex.load(path) if os.path.exists(path) else IntelIndex()
+            merged.merge(self)
+            merged._write(path)
+
+    def _write(self, path: str) -> None:
+        """Write the index to a JSON file (atomically: a temporary file is renamed over it)"""
+        with self._lock:
+            data = {
+                "conversations": self._conversation_ids,
+                "conversation_personas": self._conversation_personas.tolist(),
+                "personas": self._persona_names,
+                "entities": [
+                    [key, self._first_seen[number], self._last_seen[number], self._postings[number].tolist()]
+                    for key, number in self._keys.items()
+                ],
+            }
+            temporary = f"{path}.tmp{os.getpid()}"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IntelIndex":
+        """Read an index written by save()"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls()
+        index._persona_names = data["personas"]
+        index._personas = {sys.intern(name): number for number, name in enumerate(index._persona_names)}
+        index._conversation_ids = data["conversations"]
+        index._conversations = {sys.intern(cid): number for number, cid in enumerate(index._conversation_ids)}
+        index._conversation_personas = array("H", data["conversation_personas"])
+        index._conversation_entities = [array("I") for _ in index._conversation_ids]
+        for number, (key, first_seen, last_seen, postings) in enumerate(data["entities"]):
+            index._keys[sys.intern(key)] = number
+            index._first_seen.append(first_seen)
+            index._last_seen.append(last_seen)
+            index._postings.append(array("I", postings))
+            for conversation in postings:
+                index._conversation_entities[conversation].append(number)
+        return index
+
+
+@contextmanager
+def locked(path: str):
+    """Exclusive lock on a file across processes (no-op where fcntl is unavailable)"""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def create_intel_index() -> Optional[IntelIndex]:
+    """
+    Build the intelligence index selected by environment variables (None when disabled)
+
+    INTEL_INDEX: on (default) or off
+    INTEL_INDEX_PATH: JSON file loaded at startup; every worker merges its part into it on shutdown
+        (default: memory only)
+    """
+    if os.getenv("INTEL_INDEX", "on").lower() != "on":
+        return None
+
+    path = os.getenv("INTEL_INDEX_PATH")
+    if path and os.path.exists(path):
+        index = IntelIndex.load(path)
+        logger.info(f"Loaded intelligence index from {path}: {index.stats()}")
+        return index
+    return IntelIndex()
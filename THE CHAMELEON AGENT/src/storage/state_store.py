@@ -0,0 +1,244 @@
+"""
+Conversation State Store
+Pluggable key-value storage for per-conversation state with TTL eviction
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore(ABC):
+    """
+    Interface for conversation state backends.
+
+    Values are JSON-serializable dicts. A session expires after `ttl_seconds`
+    without being read or written. Callers must `set` a state after mutating it;
+    only the in-memory backend hands out live references.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the state for key, or None if missing/expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store state for key and refresh its TTL"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove state for key if present"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of live sessions"""
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class MemoryStateStore(StateStore):
+    """Process-local LRU store with sliding TTL and a max-sessions cap"""
+
+    def __init__(self, max_sessions: int = 100_000, ttl_seconds: float = 86_400):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, value); ordered from least to most recently used.
+        # Because every access refreshes the TTL, the front is also the first to expire.
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._data[key]
+                return None
+            self._data[key] = (now + self.ttl_seconds, entry[1])
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(time.monotonic())
+            return len(self._data)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired sessions, then least recently used ones over the cap"""
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now and len(self._data) <= self.max_sessions:
+                break
+            del self._data[key]
+
+
+class RedisStateStore(StateStore):
+    """
+    Redis-backed store shared by every worker and node.
+
+    Works with any client exposing the redis-py `getex`/`set`/`delete`/`scan_iter`
+    calls, so tests can pass a local fake instead of a server.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "chameleon:state:",
+        ttl_seconds: float = 86_400,
+        count_ttl_seconds: float = 10.0
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("STATE_BACKEND=redis requires the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = int(ttl_seconds)
+        self.count_ttl_seconds = count_ttl_seconds
+        self._count: Optional[Tuple[float, int]] = None  # (monotonic time, SCAN result) behind len()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.getex(self.prefix + key, ex=self.ttl_seconds)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def __len__(self) -> int:
+        # The live-sessions gauge calls this on every /metrics scrape. Counting is a SCAN over all
+        # keys, and a per-process counter would miss other workers' sessions and expired keys, so
+        # the last count is served until count_ttl_seconds have passed.
+        now = time.monotonic()
+        if self._count is None or now - self._count[0] >= self.count_ttl_seconds:
+            self._count = (now, sum(1 for _ in self.client.scan_iter(match=self.prefix + "*", count=1000)))
+        return self._count[1]
+
+
+class SQLiteStateStore(StateStore):
+    """
+    File-backed store that survives restarts and can be shared by the workers
+    of one machine. Connections are opened per thread and per process.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str = "chameleon_state.db", ttl_seconds: float = 86_400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value FROM sessions WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE sessions SET expires_at = ? WHERE key = ?", (now + self.ttl_seconds, key)
+        )
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl_seconds)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return row[0]
+
+
+def create_state_store(prefix: str = "chameleon:state:") -> StateStore:
+    """
+    Build the state store selected by environment variables
+
+    STATE_BACKEND: memory (default), redis or sqlite
+    STATE_TTL_SECONDS: inactivity before a session is dropped (default 86400)
+    STATE_MAX_SESSIONS: cap for the memory backend (default 100000)
+    REDIS_URL: connection URL for the redis backend
+    STATE_SQLITE_PATH: database file for the sqlite backend
+    """
+    backend = os.getenv("STATE_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("STATE_TTL_SECONDS", "86400"))
+
+    if backend == "memory":
+        store: StateStore = MemoryStateStore(
+            max_sessions=int(os.getenv("STATE_MAX_SESSIONS", "100000")),
+            ttl_seconds=ttl_seconds
+        )
+    elif backend == "redis":
+        store = RedisStateStore(
+            url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            prefix=prefix,
+            ttl_seconds=ttl_seconds
+        )
+    elif backend == "sqlite":
+        store = SQLiteStateStore(
+            path=os.getenv("STATE_SQLITE_PATH", "chameleon_state.db"),
+            ttl_seconds=ttl_seconds
+        )
+    else:
+        raise ValueError(f"Unsupported state backend: {backend}")
+
+    logger.info(f"Using {backend} conversation state store")
+    return store
@@ -0,0 +1,81 @@
+"""
+Shared fixtures for the LLM client tests (local mock Gemini, no network)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+
+def gemini_reply(text):
+    """Gemini generateContent response body carrying one text part"""
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def make_mock_provider(reply=" Beta, which button? ", latency=0, calls=None):
+    """Local Gemini-compatible mock that answers after a fixed delay
+
+    Args:
+        reply: Reply text, or a function of the number of calls so far
+        latency: Seconds to wait before answering
+        calls: Optional list every request is appended to
+    """
+    import httpx
+
+    count = 0
+
+    async def handler(request):
+        nonlocal count
+        count += 1
+        if calls is not None:
+            calls.append(request)
+        await asyncio.sleep(latency)
+        text = reply(count) if callable(reply) else reply
+        return httpx.Response(200, json=gemini_reply(text))
+    return httpx.MockTransport(handler)
+
+
+def make_streaming_provider(chunks, delay):
+    """Local Gemini-compatible mock that streams SSE chunks with a delay between them"""
+    import httpx
+
+    async def body():
+        for text in chunks:
+            await asyncio.sleep(delay)
+            yield f"data: {json.dumps(gemini_reply(text))}\r\n\r\n".encode()
+
+    async def handler(request):
+        assert request.url.path.endswith(":streamGenerateContent")
+        return httpx.Response(200, content=body(), headers={"content-type": "text/event-stream"})
+    return httpx.MockTransport(handler)
+
+
+def run_with_client(client, work):
+    """Run work() on a fresh event loop, then close the client's connections
+
+    Args:
+        client: LLMClient under test
+        work: Coroutine function taking no arguments
+
+    Returns:
+        Whatever work() returned
+    """
+    async def run():
+        try:
+            return await work()
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def gemini_env(monkeypatch):
+    """A single Gemini backend with a test key, and no reply or context cache unless a test enables one"""
+    monkeypatch.setenv("LLM_PROVIDER", "gemini")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_TIMEOUT", "2")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "64")
+    monkeypatch.setenv("LLM_CACHE_BACKEND", "off")
+    monkeypatch.delenv("LLM_BACKENDS", raising=False)
+    monkeypatch.delenv("LLM_CONTEXT_CACHE", raising=False)
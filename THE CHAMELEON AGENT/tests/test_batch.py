@@ -0,0 +1,83 @@
+"""
+Test Batch Scoring
+"""
+
+import asyncio
+
+import pytest
+
+from src.batch.batch_scorer import BatchScorer, score_message
+from tests.mock_scenarios import MOCK_SCENARIOS
+
+
+MESSAGES = [turn["message"] for s in MOCK_SCENARIOS for turn in s["conversation"] if turn["role"] == "scammer"]
+
+
+def test_score_message():
+    """Test detection and extraction of a single message"""
+    result = score_message("Your account is blocked. Pay to 9876543210@paytm immediately")
+    
+    assert result["scam_detected"] == True
+    assert result["scam_type"] == "financial"
+    assert "urgency" in result["signals_detected"]
+    assert result["extracted_intelligence"]["upi_ids"][0]["upi_id"] == "9876543210@paytm"
+    assert result["extraction_count"] >= 1
+
+
+def test_pool_results_in_order():
+    """Test that results from the process pool match in-process scoring, in input order"""
+    scorer = BatchScorer(workers=2, chunk_size=3)
+    try:
+        results = scorer.score(MESSAGES)
+    finally:
+        scorer.close()
+    
+    assert results == [score_message(message) for message in MESSAGES]
+
+
+def test_score_async_small_batch_in_process():
+    """Test that a batch smaller than one chunk does not start the pool"""
+    scorer = BatchScorer(workers=2, chunk_size=100)
+    results = asyncio.run(scorer.score_async(MESSAGES[:2]))
+    
+    assert len(results) == 2
+    assert scorer._pool is None
+
+
+def test_batch_endpoint_skips_llm(monkeypatch):
+    """Test /honeypot/batch returns ordered results without calling the LLM"""
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("fastapi")
+    monkeypatch.setenv("HONEYPOT_API_KEY", "test-api-key")
+    monkeypatch.setenv("BATCH_WORKERS", "2")
+    monkeypatch.setenv("BATCH_CHUNK_SIZE", "4")
+    monkeypatch.setenv("BATCH_MAX_MESSAGES", "50")
+    
+    import importlib
+    import main
+    main = importlib.reload(main)
+    
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("LLM must not be called in batch mode")
+    main.conversation_manager.llm_client.generate_response = no_llm
+    
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            headers = {"X-API-Key": "test-api-key"}
+            ok = await api.post("/honeypot/batch", json={"messages": MESSAGES}, headers=headers)
+            too_big = await api.post("/honeypot/batch", json={"messages": ["hi"] * 51}, headers=headers)
+            return ok, too_big
+    
+    try:
+        ok, too_big = asyncio.run(run())
+    finally:
+        main.batch_scorer.close()
+    
+    assert ok.status_code == 200
+    body = ok.json()
+    assert body["total"] == len(MESSAGES)
+    assert [r["scam_type"] for r in body["results"]] == [score_message(m)["scam_type"] for m in MESSAGES]
+    assert all(r["agent_response"] is None for r in body["results"])
+    assert all((r["campaign_id"] is not None) == r["scam_detected"] for r in body["results"])
+    assert too_big.status_code == 413
@@ -0,0 +1,119 @@
+"""
+Test Campaign Clustering (MinHash/LSH assignment, stats and eviction)
+"""
+
+import asyncio
+import random
+
+import pytest
+from src.detection.campaigns import CampaignClusterer
+
+TEMPLATES = [
+    "Dear customer your {bank} account will be blocked today. Update KYC immediately at {url} or call {phone}",
+    "Congratulations! You have won Rs {amount} in KBC lucky draw. To claim pay processing fee to {upi}",
+    "Your electricity connection will be disconnected tonight at 9.30 pm as last month bill was not paid. Call {phone}",
+]
+
+
+def variant(template, rng):
+    """A template filled with fresh links, numbers and UPI IDs, with one word dropped now and then"""
+    message = template.format(
+        bank=rng.choice(["SBI", "HDFC", "ICICI"]),
+        url=f"http://kyc-{rng.randint(1, 99)}.tk",
+        phone=f"9{rng.randint(100000000, 999999999)}",
+        amount=rng.randint(1000, 900000),
+        upi=f"claim{rng.randint(1, 99)}@ybl"
+    )
+    words = message.split()
+    if rng.random() < 0.5:
+        del words[rng.randrange(len(words))]
+    message = " ".join(words)
+    return message.upper() if rng.random() < 0.3 else message
+
+
+def test_variants_share_a_campaign_and_templates_do_not():
+    """Test that variants of a template get one campaign ID and each template its own"""
+    clusterer = CampaignClusterer()
+    rng = random.Random(7)
+    ids = {i: set() for i in range(len(TEMPLATES))}
+    for _ in range(200):
+        for i, template in enumerate(TEMPLATES):
+            ids[i].add(clusterer.assign(variant(template, rng), "upi_fraud"))
+
+    assert all(len(campaign_ids) == 1 for campaign_ids in ids.values())
+    assert len(set.union(*ids.values())) == len(TEMPLATES)
+    assert clusterer.assign("!!! ???") is None
+
+
+def test_top_reports_campaign_stats():
+    """Test that top() lists campaigns by size with scam types and recency filtering"""
+    clusterer = CampaignClusterer()
+    rng = random.Random(1)
+    for _ in range(5):
+        clusterer.assign(variant(TEMPLATES[0], rng), "upi_fraud")
+    clusterer.assign(variant(TEMPLATES[0], rng), "phishing")
+    clusterer.assign(variant(TEMPLATES[1], rng), "lottery_scam")
+
+    largest, other = clusterer.top()
+
+    assert largest["messages"] == 6
+    assert largest["scam_types"] == {"upi_fraud": 5, "phishing": 1}
+    assert other["messages"] == 1
+    assert clusterer.campaign(largest["campaign_id"]) == largest
+    assert clusterer.top(limit=1) == [largest]
+    assert clusterer.top(active_within=-1) == []
+    assert clusterer.stats()["messages"] == 7
+
+
+def test_memory_is_bounded():
+    """Test that the least recently active campaigns and their buckets are evicted"""
+    clusterer = CampaignClusterer(max_campaigns=3)
+    messages = [f"message number {word} about {word} things" for word in
+                ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"]]
+    first = clusterer.assign(messages[0])
+    for message in messages[1:]:
+        clusterer.assign(message)
+        clusterer.assign(messages[0])  # keep the first campaign active
+
+    stats = clusterer.stats()
+    assert len(clusterer) == 3
+    assert stats["evicted"] == 3
+    assert stats["buckets"] <= 3 * clusterer.bands * clusterer.bands_per_campaign
+    assert clusterer.campaign(first)["messages"] == 6
+
+
+def test_honeypot_reports_campaign(monkeypatch):
+    """Test that /honeypot puts the campaign ID in metadata and /campaigns lists the campaign"""
+    pytest.importorskip("fastapi")
+    httpx = pytest.importorskip("httpx")
+    monkeypatch.setenv("HONEYPOT_API_KEY", "test-api-key")
+
+    import importlib
+    import main
+    main = importlib.reload(main)
+    main.conversation_manager.fast_reply = None
+
+    async def llm(system_prompt, user_message, conversation_history=None, cache_key=None, context=None):
+        return "Which app should I use, beta?"
+    main.conversation_manager.llm_client.generate_response = llm
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        headers = {"X-API-Key": "test-api-key"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            responses = [
+                await api.post("/honeypot", headers=headers, json={
+                    "message": f"Your KYC expired, pay {amount} rupees to verify{amount}@paytm",
+                    "conversation_id": f"kyc_{amount}"
+                })
+                for amount in (10, 25, 99)
+            ]
+            campaigns = await api.get("/campaigns", params={"limit": 5}, headers=headers)
+            return responses, campaigns
+
+    responses, campaigns = asyncio.run(run())
+
+    campaign_ids = {response.json()["metadata"]["campaign_id"] for response in responses}
+    assert len(campaign_ids) == 1 and None not in campaign_ids
+    [campaign] = campaigns.json()["campaigns"]
+    assert campaign["campaign_id"] in campaign_ids and campaign["messages"] == 3
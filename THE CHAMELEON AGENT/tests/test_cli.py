@@ -0,0 +1,84 @@
+"""
+Test Offline Scoring CLI
+"""
+
+import csv
+import json
+
+import pytest
+
+import cli
+from src.batch.batch_scorer import score_message
+from tests.mock_scenarios import MOCK_SCENARIOS
+
+
+MESSAGES = [turn["message"] for s in MOCK_SCENARIOS for turn in s["conversation"]]
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def jsonl_input(tmp_path):
+    path = tmp_path / "messages.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i, message in enumerate(MESSAGES):
+            f.write(json.dumps({"id": i, "message": message}) + "\n")
+        f.write("not json\n")
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scores_jsonl_in_order(jsonl_input, tmp_path, workers):
+    """Test that every record is scored, in input order, with byte offsets"""
+    output = tmp_path / "out.jsonl"
+    cli.main([str(jsonl_input), "-o", str(output), "--id-field", "id",
+              "--workers", str(workers), "--chunk-size", "4"])
+    
+    results = read_results(output)
+    assert [r.get("id") for r in results[:-1]] == list(range(len(MESSAGES)))
+    assert [r["scam_type"] for r in results[:-1]] == [score_message(m)["scam_type"] for m in MESSAGES]
+    assert "error" in results[-1]
+    assert results[-1]["next_offset"] == jsonl_input.stat().st_size
+    
+    with open(jsonl_input, "rb") as f:
+        f.seek(results[3]["offset"])
+        assert json.loads(f.readline())["id"] == 3
+
+
+def test_resume_continues_after_last_result(jsonl_input, tmp_path):
+    """Test that --resume picks up after a crash, dropping a half-written line"""
+    full = tmp_path / "full.jsonl"
+    cli.main([str(jsonl_input), "-o", str(full), "--workers", "1"])
+    
+    partial = tmp_path / "partial.jsonl"
+    lines = full.read_text(encoding="utf-8").splitlines(keepends=True)
+    partial.write_text("".join(lines[:5]) + lines[5][:20], encoding="utf-8")
+    
+    cli.main([str(jsonl_input), "-o", str(partial), "--workers", "1", "--resume"])
+    
+    assert read_results(partial) == read_results(full)
+
+
+def test_scores_csv_with_multiline_fields(tmp_path):
+    """Test CSV input where a quoted message spans several lines"""
+    path = tmp_path / "messages.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["report_id", "text"])
+        writer.writerow(["a", "Your account is blocked.\nCall 9876543210 now"])
+        writer.writerow(["b", "hello"])
+    
+    output = tmp_path / "out.jsonl"
+    cli.main([str(path), "-o", str(output), "--field", "text", "--id-field", "report_id", "--workers", "1"])
+    results = read_results(output)
+    
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert results[0]["extracted_intelligence"]["phone_numbers"][0]["number"] == "9876543210"
+    
+    resumed = tmp_path / "resumed.jsonl"
+    cli.main([str(path), "-o", str(resumed), "--field", "text", "--id-field", "report_id",
+              "--workers", "1", "--start-offset", str(results[0]["next_offset"])])
+    assert [r["id"] for r in read_results(resumed)] == ["b"]
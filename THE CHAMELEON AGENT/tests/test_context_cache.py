@@ -0,0 +1,127 @@
+"""
+Test Provider Context Caching (runs against a local mock Gemini)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from src.agent.llm_client import LLMClient
+from src.agent.context_cache import ContextCache
+from src.personas.persona_manager import PersonaManager
+from tests.conftest import gemini_reply, run_with_client
+
+
+SCAMMER_MESSAGE = "Your KYC will expire today. Share the OTP to continue."
+CONTEXT = "CONVERSATION SO FAR:\nSCAMMER: Hello sir, this is SBI.\nYOU: Yes beta?"
+
+
+def make_caching_provider(create_status=200):
+    """Mock Gemini that supports cachedContents and records generateContent bodies"""
+    created, generated = [], []
+
+    async def handler(request):
+        body = json.loads(request.content)
+        if request.url.path.endswith("/cachedContents"):
+            created.append(body)
+            if create_status != 200:
+                return httpx.Response(create_status, json={"error": {"message": "content too small"}})
+            return httpx.Response(200, json={"name": f"cachedContents/c{len(created)}"})
+        if body.get("cachedContent") and body["cachedContent"] != f"cachedContents/c{len(created)}":
+            return httpx.Response(404, json={"error": {"message": "cached content not found"}})
+        generated.append((len(request.content), body))
+        return httpx.Response(200, json=gemini_reply("Which OTP beta?"))
+    return httpx.MockTransport(handler), created, generated
+
+
+def system_prompt():
+    persona = PersonaManager().select_persona("bank_fraud")
+    return persona.get_system_prompt("bank_fraud", "extraction", 5)
+
+
+def run_turns(client, turns):
+    async def converse():
+        return [
+            await client.generate_response(system_prompt(), SCAMMER_MESSAGE, context=CONTEXT)
+            for _ in range(turns)
+        ]
+    return run_with_client(client, converse)
+
+
+def test_cached_context_shrinks_payload(gemini_env, monkeypatch):
+    """Test that the persona prompt is registered once and turns send only the delta"""
+    transport, _, inline = make_caching_provider()
+    run_turns(LLMClient(transport=transport), 1)
+    inline_size, inline_body = inline[0]
+
+    monkeypatch.setenv("LLM_CONTEXT_CACHE", "on")
+    transport, created, cached = make_caching_provider()
+    replies = run_turns(LLMClient(transport=transport), 3)
+
+    assert replies == ["Which OTP beta?"] * 3
+    assert len(created) == 1
+    assert created[0]["systemInstruction"]["parts"][0]["text"] == system_prompt()
+    for size, body in cached:
+        text = body["contents"][0]["parts"][0]["text"]
+        assert body["cachedContent"] == "cachedContents/c1"
+        assert system_prompt() not in text
+        assert CONTEXT in text and SCAMMER_MESSAGE in text
+        assert size < inline_size / 2
+    assert system_prompt() in inline_body["contents"][0]["parts"][0]["text"]
+
+
+def test_expired_handle_is_recreated(gemini_env, monkeypatch):
+    """Test that a handle past its TTL is replaced, and a stale one falls back inline"""
+    monkeypatch.setenv("LLM_CONTEXT_CACHE", "on")
+    transport, created, generated = make_caching_provider()
+    client = LLMClient(transport=transport)
+
+    async def converse():
+        await client.generate_response(system_prompt(), SCAMMER_MESSAGE)
+        key = next(iter(client.context_cache._handles))
+        name, _ = client.context_cache._handles[key]
+        client.context_cache._handles[key] = (name, 0.0)  # local TTL ran out
+        await client.generate_response(system_prompt(), SCAMMER_MESSAGE)
+        client.context_cache._handles[key] = ("cachedContents/evicted", float("inf"))
+        return await client.generate_response(system_prompt(), SCAMMER_MESSAGE)
+
+    reply = run_with_client(client, converse)
+
+    assert len(created) == 2
+    assert [body.get("cachedContent") for _, body in generated] == [
+        "cachedContents/c1", "cachedContents/c2", None
+    ]
+    assert reply == "Which OTP beta?"
+
+
+def test_refused_cache_sends_prompt_inline(gemini_env, monkeypatch):
+    """Test that a provider refusal is remembered and the prompt is sent inline"""
+    monkeypatch.setenv("LLM_CONTEXT_CACHE", "on")
+    transport, created, generated = make_caching_provider(create_status=400)
+
+    replies = run_turns(LLMClient(transport=transport), 3)
+
+    assert replies == ["Which OTP beta?"] * 3
+    assert len(created) == 1
+    assert all("cachedContent" not in body for _, body in generated)
+
+
+def test_concurrent_turns_share_one_creation():
+    """Test that simultaneous misses for one prompt create a single handle"""
+    cache = ContextCache(ttl_seconds=3600)
+    calls = []
+
+    async def create(ttl_seconds):
+        calls.append(ttl_seconds)
+        await asyncio.sleep(0.05)
+        return "cachedContents/shared"
+
+    async def run():
+        key = ContextCache.make_key("gemini/m", "PROMPT")
+        return await asyncio.gather(*[cache.get_or_create(key, create) for _ in range(10)])
+
+    assert asyncio.run(run()) == ["cachedContents/shared"] * 10
+    assert calls == [3600]
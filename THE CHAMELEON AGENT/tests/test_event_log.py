@@ -0,0 +1,148 @@
+"""
+Test Conversation Event Log (append, rotation, torn records, replay and re-extraction)
+"""
+
+import asyncio
+import json
+import os
+
+import reextract
+from src.agent.conversation_manager import ConversationManager
+from src.extraction.entity_extractor import EntityExtractor
+from src.personas.persona_manager import PersonaManager
+from src.storage.event_log import EventLog, HEADER
+from src.storage.state_store import MemoryStateStore
+
+
+def test_events_survive_rotation_in_order(tmp_path):
+    """Test that events read back in order across rotated segments"""
+    log = EventLog(str(tmp_path), segment_bytes=512)
+    for i in range(50):
+        log.append({"type": "turn", "conversation_id": f"c{i % 3}", "n": i})
+    log.close()
+
+    events = list(log.events())
+
+    assert len(log.segments()) > 1
+    assert [event["n"] for event in events] == list(range(50))
+    assert all(a["ts"] <= b["ts"] for a, b in zip(events, events[1:]))
+
+
+def test_reader_stops_at_torn_or_corrupt_record(tmp_path):
+    """Test that a crash mid-write loses only the torn record"""
+    log = EventLog(str(tmp_path))
+    for i in range(5):
+        log.append({"n": i})
+    log.close()
+    path = log.segments()[0]
+
+    with open(path, "rb+") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    assert [event["n"] for event in EventLog.read_segment(path)] == [0, 1, 2, 3]
+
+    # Flip a payload byte of the fourth record
+    with open(path, "rb+") as f:
+        data = f.read()
+        offset = 0
+        for _ in range(3):
+            offset += HEADER.size + HEADER.unpack_from(data, offset)[0]
+        f.seek(offset + HEADER.size + 1)
+        f.write(b"X")
+    assert [event["n"] for event in EventLog.read_segment(path)] == [0, 1, 2]
+
+
+def test_fsync_is_batched(tmp_path):
+    """Test that a burst of appends costs a few fsyncs, not one each"""
+    batched = EventLog(str(tmp_path / "batched"), fsync_interval=0.05)
+    for i in range(200):
+        batched.append({"n": i})
+    batched.close()
+
+    every = EventLog(str(tmp_path / "every"), fsync_interval=0)
+    for i in range(20):
+        every.append({"n": i})
+    every.close()
+
+    assert 1 <= batched.fsyncs < 20
+    assert every.fsyncs == 20
+
+
+def make_manager(directory):
+    manager = ConversationManager(state_store=MemoryStateStore(), event_log=EventLog(directory))
+    manager.fast_reply = None
+
+    async def llm(system_prompt, user_message, conversation_history=None, cache_key=None, context=None):
+        return f"reply to {user_message}"
+    manager.llm_client.generate_response = llm
+    return manager
+
+
+def play(manager, conversation_id, messages):
+    """Drive turns the way /honeypot does: reply, then extract over the whole conversation"""
+    persona = PersonaManager().select_persona("upi_fraud")
+    extractor = EntityExtractor()
+    transcript = []
+    for turn, message in enumerate(messages, 1):
+        reply = asyncio.run(manager.generate_response(
+            message=message, conversation_id=conversation_id, history=[],
+            persona=persona, scam_type="upi_fraud", turn_count=turn
+        ))
+        transcript += [message, reply]
+        manager.extract_intelligence(conversation_id, transcript, extractor)
+    return transcript
+
+
+def test_restart_restores_state_from_log(tmp_path):
+    """Test that a new process rebuilds turns and entities from the log, without the LLM"""
+    manager = make_manager(str(tmp_path))
+    transcript = play(manager, "conv_1", [
+        "Your account is blocked", "Pay 500 to refund@ybl", "Or call 9876543210"
+    ])
+    before = manager.state_store.get("conv_1")
+    manager.event_log.close()
+
+    restarted = ConversationManager(state_store=MemoryStateStore(), event_log=EventLog(str(tmp_path)))
+
+    assert restarted.restore_from_log() == 1
+    state = restarted.state_store.get("conv_1")
+    for key in ("persona", "scam_type", "turn_count", "phase", "last_response", "started_at", "extracted_data"):
+        assert state[key] == before[key]
+    assert restarted.restore_from_log() == 0  # already present
+    assert ConversationManager.logged_conversations(restarted.event_log)["conv_1"]["messages"] == transcript
+
+
+def test_restore_skips_idle_conversations(tmp_path):
+    """Test that conversations idle past max_age_seconds are not restored"""
+    manager = make_manager(str(tmp_path))
+    play(manager, "conv_old", ["Your KYC expired"])
+    manager.event_log.close()
+
+    restarted = ConversationManager(state_store=MemoryStateStore(), event_log=EventLog(str(tmp_path)))
+
+    assert restarted.restore_from_log(max_age_seconds=-1) == 0
+    assert restarted.state_store.get("conv_old") is None
+
+
+def test_reextract_reports_entity_changes(tmp_path, monkeypatch):
+    """Test that re-extraction runs over logged conversations and diffs against logged entities"""
+    manager = make_manager(str(tmp_path / "events"))
+    play(manager, "conv_1", ["Send 2000 to refund@ybl now"])
+    manager.event_log.close()
+
+    # A newer extractor version that finds one more phone number
+    original = EntityExtractor.extract
+
+    def extract(self, messages):
+        result = original(self, messages)
+        result["extracted_data"].setdefault("phone_numbers", []).append({"number": "9999999999"})
+        return result
+    monkeypatch.setattr(EntityExtractor, "extract", extract)
+
+    output = tmp_path / "out.jsonl"
+    counts = reextract.run(reextract.parse_args([str(tmp_path / "events"), "-o", str(output)]))
+
+    [line] = output.read_text(encoding="utf-8").splitlines()
+    result = json.loads(line)
+    assert counts == {"conversations": 1, "changed": 1}
+    assert result["extracted_data"]["upi_ids"][0]["upi_id"] == "refund@ybl"
+    assert result["changes"] == {"phone_numbers": {"added": ["9999999999"], "removed": []}}
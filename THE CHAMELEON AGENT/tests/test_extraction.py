@@ -107,3 +107,240 @@ def test_invalid_phone_numbers_rejected(extractor):
     # Should not extract invalid phone number
     assert "phone_numbers" not in result["extracted_data"] or \
            len(result["extracted_data"]["phone_numbers"]) == 0
+
+
+def test_incremental_matches_full_extraction(extractor):
+    """Test that turn-by-turn extraction accumulates the same entities as a full scan"""
+    from tests.mock_scenarios import MOCK_SCENARIOS
+    
+    for scenario in MOCK_SCENARIOS:
+        messages = [turn["message"] for turn in scenario["conversation"]]
+        state = None
+        for i in range(1, len(messages) + 1):
+            result = extractor.extract_incremental(messages[:i], state)
+            state = result["state"]
+        
+        full = extractor.extract(messages)["extracted_data"]
+        for entity_type, key in (("upi_ids", "upi_id"), ("phone_numbers", "number"),
+                                 ("bank_accounts", "account_number")):
+            assert [e[key] for e in result["extracted_data"].get(entity_type, [])] == \
+                   [e[key] for e in full.get(entity_type, [])]
+        for expected, account in zip(full.get("bank_accounts", []), result["extracted_data"].get("bank_accounts", [])):
+            assert account.get("ifsc_code") == expected.get("ifsc_code")
+
+
+def test_incremental_scans_only_new_messages(extractor):
+    """Test that earlier turns are not re-scanned"""
+    scanned = []
+    original = extractor.scan
+    extractor.scan = lambda messages, first=0: scanned.append((list(messages), first)) or original(messages, first)
+    
+    messages = ["Pay to scammer@paytm", "Okay, how much?"]
+    state = extractor.extract_incremental(messages)["state"]
+    messages += ["Send 5000 to backup@ybl", "Done?"]
+    result = extractor.extract_incremental(messages, state)
+    
+    assert scanned == [(["Pay to scammer@paytm", "Okay, how much?"], 0), (["Send 5000 to backup@ybl", "Done?"], 2)]
+    assert [u["upi_id"] for u in result["extracted_data"]["upi_ids"]] == ["scammer@paytm", "backup@ybl"]
+
+
+def test_incremental_merges_late_ifsc_and_duplicates(extractor):
+    """Test that an IFSC arriving on a later turn upgrades an earlier account"""
+    messages = ["Transfer to account 12345678901"]
+    result = extractor.extract_incremental(messages)
+    assert result["extracted_data"]["bank_accounts"][0]["confidence"] == 0.6
+    
+    messages += ["Account 12345678901 again, IFSC SBIN0001234"]
+    result = extractor.extract_incremental(messages, result["state"])
+    accounts = result["extracted_data"]["bank_accounts"]
+    
+    assert len(accounts) == 1
+    assert accounts[0]["ifsc_code"] == "SBIN0001234"
+    assert accounts[0]["confidence"] == 0.9
+    assert result["extraction_count"] == 1
+
+
+def test_incremental_restarts_on_shorter_history(extractor):
+    """Test that a rewritten (shorter) history is scanned from scratch"""
+    state = extractor.extract_incremental(["a@paytm", "b@paytm", "c@paytm"])["state"]
+    result = extractor.extract_incremental(["d@paytm"], state)
+    
+    assert [u["upi_id"] for u in result["extracted_data"]["upi_ids"]] == ["d@paytm"]
+
+
+def test_incremental_rescans_same_length_history_with_new_content(extractor):
+    """Test that a history of the same length but different messages is not skipped"""
+    state = extractor.extract_incremental(["Pay to first@ybl", "Which app?"])["state"]
+    result = extractor.extract_incremental(["Use backup@paytm instead", "Which app?"], state)
+    
+    assert [u["upi_id"] for u in result["extracted_data"]["upi_ids"]] == ["backup@paytm"]
+
+
+def test_incremental_rescans_a_sliding_window(extractor):
+    """Test that each message of a fixed-size window is scanned once it slides in"""
+    conversation = ["Hello sir", "Yes?", "Pay to first@ybl", "Okay", "Or call 9876543210", "Wait"]
+    state = None
+    for end in range(2, len(conversation) + 1):
+        result = extractor.extract_incremental(conversation[max(0, end - 3):end], state)
+        state = result["state"]
+        if end == 3:
+            assert [u["upi_id"] for u in result["extracted_data"]["upi_ids"]] == ["first@ybl"]
+    
+    assert [p["number"] for p in result["extracted_data"]["phone_numbers"]] == ["9876543210"]
+
+
+def test_honeypot_extracts_each_turn_without_client_history(monkeypatch):
+    """Test that turns sent with an empty history still have their entities extracted and stored"""
+    pytest.importorskip("fastapi")
+    httpx = pytest.importorskip("httpx")
+    import asyncio
+    import importlib
+    import main
+    monkeypatch.setenv("HONEYPOT_API_KEY", "test-api-key")
+    main = importlib.reload(main)
+    main.conversation_manager.fast_reply = None
+    
+    async def llm(system_prompt, user_message, conversation_history=None, cache_key=None, context=None):
+        return "Which app should I use, beta?"
+    main.conversation_manager.llm_client.generate_response = llm
+    
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            return [
+                await api.post("/honeypot", headers={"X-API-Key": "test-api-key"}, json={
+                    "message": message, "conversation_id": "no_history", "history": []
+                })
+                for message in ("Your KYC expired, pay to first@ybl", "KYC failed, pay to backup@paytm now")
+            ]
+    
+    first, second = asyncio.run(run())
+    
+    upi_ids = [u["upi_id"] for u in second.json()["extracted_intelligence"]["upi_ids"]]
+    assert upi_ids == ["backup@paytm"]
+    stored = main.conversation_manager.state_store.get("no_history")["extracted_data"]
+    assert [u["upi_id"] for u in stored["upi_ids"]] == ["backup@paytm"]
+
+
+def test_scan_reports_positions(extractor):
+    """Test that the single-pass scanner tags each match with its message and offsets"""
+    messages = ["Hi", "Pay 9876543210@paytm or visit www.pay-now.tk today"]
+    matches = extractor.scan(messages)
+    
+    assert [(m.kind, m.value, m.message) for m in matches] == [
+        ("upi", "9876543210@paytm", 1),
+        ("phone", "9876543210", 1),
+        ("url", "www.pay-now.tk", 1),
+    ]
+    for match in matches:
+        assert messages[match.message][match.start:match.end] == match.value
+
+
+def test_holder_name_taken_from_same_message(extractor):
+    """Test that the account holder is the nearest name next to the account number"""
+    messages = [
+        "Thank You for calling Priya Sharma",
+        "Account 12345678901 belongs to Ramesh Kumar, IFSC SBIN0001234",
+    ]
+    account = extractor.extract(messages)["extracted_data"]["bank_accounts"][0]
+    
+    assert account["account_holder"] == "Ramesh Kumar"
+    assert account["confidence"] == 1.0
+
+
+def test_digits_inside_upi_and_urls_are_not_accounts(extractor):
+    """Test that numbers embedded in a UPI ID or link are not reported as bank accounts"""
+    messages = ["Pay 123456789012@ybl via https://pay.example.com/r/998877665544"]
+    result = extractor.extract(messages)["extracted_data"]
+    
+    assert "bank_accounts" not in result
+    assert result["urls"][0]["url"] == "https://pay.example.com/r/998877665544"
+
+
+def test_numbers_glued_to_a_upi_id_are_extracted(extractor):
+    """Test that a number joined to a UPI ID by punctuation is still found, as before the token scanner"""
+    result = extractor.extract(["pay to abc@ybl,9876543210 or HDFC0001234/xyz@paytm"])["extracted_data"]
+    
+    assert [u["upi_id"] for u in result["upi_ids"]] == ["abc@ybl", "xyz@paytm"]
+    assert result["phone_numbers"][0]["number"] == "9876543210"
+    assert result["bank_accounts"][0]["account_number"] == "9876543210"
+    assert result["bank_accounts"][0]["ifsc_code"] == "HDFC0001234"
+
+
+@pytest.mark.parametrize("message", [
+    "Name:Ramesh Kumar A/c 12345678901 IFSC:SBIN0001234",
+    "Beneficiary-Ramesh Kumar, a/c 12345678901",
+    "AccountHolder:Ramesh Kumar 12345678901",
+    "Account Holder:Ramesh Kumar 12345678901",
+])
+def test_names_glued_to_a_cue_are_extracted(extractor, message):
+    """Test that a name joined to its cue word by ':' or '-' is found and becomes the account holder"""
+    result = extractor.extract([message])["extracted_data"]
+    
+    assert [n["name"] for n in result["names"]] == ["Ramesh Kumar"]
+    assert result["bank_accounts"][0]["account_holder"] == "Ramesh Kumar"
+    for match in extractor.scan([message]):
+        assert message[match.start:match.end] == match.value
+
+
+def test_each_account_gets_its_own_ifsc_and_holder(extractor):
+    """Test that several accounts in one message are linked to the details next to them"""
+    messages = [
+        "Account 11122233344 IFSC SBIN0001234 holder Ramesh Kumar. "
+        "Second account 55566677788 IFSC HDFC0005678 holder Suresh Patel."
+    ]
+    accounts = extractor.extract(messages)["extracted_data"]["bank_accounts"]
+    
+    assert [(a["account_number"], a["ifsc_code"], a["account_holder"]) for a in accounts] == [
+        ("11122233344", "SBIN0001234", "Ramesh Kumar"),
+        ("55566677788", "HDFC0005678", "Suresh Patel"),
+    ]
+
+
+def test_ifsc_prefers_same_message_then_nearest_message(extractor):
+    """Test that an IFSC in the account's own message beats one from another message"""
+    messages = [
+        "IFSC SBIN0001234 is for the old account",
+        "Send to 11122233344",
+        "Or 55566677788 at IFSC HDFC0005678",
+    ]
+    accounts = extractor.extract(messages)["extracted_data"]["bank_accounts"]
+    
+    # A tie between the messages before and after goes to the later one
+    assert {a["account_number"]: a["ifsc_code"] for a in accounts} == {
+        "11122233344": "HDFC0005678",
+        "55566677788": "HDFC0005678",
+    }
+    
+    messages[2] = "Or 55566677788"
+    accounts = extractor.extract(messages)["extracted_data"]["bank_accounts"]
+    assert {a["ifsc_code"] for a in accounts} == {"SBIN0001234"}
+
+
+def test_holder_name_not_taken_from_another_message(extractor):
+    """Test that a name in a different message is never the account holder"""
+    messages = ["Ramesh Kumar here", "12345678901"]
+    account = extractor.extract(messages)["extracted_data"]["bank_accounts"][0]
+    
+    assert "account_holder" not in account
+
+
+def test_incremental_relinks_accounts_as_codes_arrive(extractor):
+    """Test that turn-by-turn linking ends up the same as linking the whole conversation"""
+    messages = [
+        "First pay 11122233344",
+        "IFSC SBIN0001234",
+        "Now 55566677788 with IFSC HDFC0005678",
+        "Also 11122233344 IFSC ICIC0009999",
+    ]
+    state = None
+    for i in range(1, len(messages) + 1):
+        result = extractor.extract_incremental(messages[:i], state)
+        state = result["state"]
+    
+    full = extractor.extract(messages)["extracted_data"]["bank_accounts"]
+    assert result["extracted_data"]["bank_accounts"] == full
+    assert {a["account_number"]: a["ifsc_code"] for a in full} == {
+        "11122233344": "ICIC0009999",
+        "55566677788": "HDFC0005678",
+    }
@@ -0,0 +1,148 @@
+"""
+Test Fast Reply Engine (rule-based replies for early turns)
+"""
+
+import asyncio
+
+import pytest
+from src.agent.fast_reply import FastReplyEngine, create_fast_reply_engine
+from src.personas.reply_templates import INTENT_KEYWORDS, OPENERS, TEMPLATES
+
+
+def test_classifies_formulaic_messages():
+    """Test that scripted scammer lines map to their intent with high confidence"""
+    engine = FastReplyEngine()
+
+    assert engine.classify("Pay the registration fee of Rs 500 now")[0] == "payment_request"
+    assert engine.classify("Congratulations! You are the lucky draw winner")[0] == "prize"
+    intent, confidence = engine.classify("Your KYC has expired, account will be blocked")
+    assert intent == "account_threat" and confidence >= engine.min_confidence
+
+
+def test_direct_questions_escalate():
+    """Test that questions needing a real answer go to the LLM"""
+    engine = FastReplyEngine()
+
+    assert engine.classify("What is your name and which bank do you use?") == (None, 0.0)
+    assert engine.classify("Random words with no scam signal") == (None, 0.0)
+    assert engine.reply("Ramesh Kumar", "Are you a bot? Pay the fee", "trust_building", 1) is None
+    assert engine.stats()["escalated"] == 1
+
+
+def test_only_early_phase_is_served():
+    """Test that later turns and phases always use the LLM"""
+    engine = FastReplyEngine(max_turn=3)
+    message = "Pay the registration fee of Rs 500 now"
+
+    assert engine.reply("Priya Sharma", message, "trust_building", 2) is not None
+    assert engine.reply("Priya Sharma", message, "trust_building", 4) is None
+    assert engine.reply("Priya Sharma", message, "extraction", 2) is None
+
+
+def test_slots_come_from_message_and_earlier_entities():
+    """Test that slots use the message first, then entities from earlier turns"""
+    engine = FastReplyEngine()
+    entities = {"upi_ids": [{"upi_id": "old@ybl"}], "urls": [{"url": "http://kyc-update.in"}]}
+
+    values = engine.slots("Send Rs 1,499 to refund.desk@paytm", entities)
+
+    assert values["amount"] == "Rs 1,499"
+    assert values["upi_id"] == "refund.desk@paytm"
+    assert values["link"] == "http://kyc-update.in"
+    assert "phone" not in values
+
+
+def test_reply_is_a_filled_persona_template():
+    """Test that replies come from the persona's templates with no unfilled slots"""
+    engine = FastReplyEngine()
+
+    for _ in range(20):
+        reply = engine.reply("Amit Patel", "Pay Rs 2000 to verify.desk@ybl", "trust_building", 1)
+        assert "{" not in reply
+        openers = [o for o in OPENERS["Amit Patel"] if o]
+        body = next((reply[len(o) + 1:] for o in openers if reply.startswith(o + " ")), reply)
+        filled = [t.format(amount="Rs 2000", upi_id="verify.desk@ybl") for t in TEMPLATES["Amit Patel"]["payment_request"]]
+        assert body in filled
+
+
+def test_every_persona_has_a_template_bank_for_every_intent():
+    """Test that each persona has several templates per intent, and {phone} is the scammer's number"""
+    for persona, banks in TEMPLATES.items():
+        for intent in INTENT_KEYWORDS:
+            if intent == "romance" and persona != "Rajesh Verma":
+                continue
+            templates = banks.get(intent, [])
+            assert len(set(templates)) >= 6, (persona, intent)
+            assert not any("call me on {phone}" in template for template in templates)
+
+
+def test_create_fast_reply_engine_from_env(monkeypatch):
+    """Test that the engine is off unless FAST_REPLY=on"""
+    monkeypatch.delenv("FAST_REPLY", raising=False)
+    assert create_fast_reply_engine() is None
+
+    monkeypatch.setenv("FAST_REPLY", "on")
+    monkeypatch.setenv("FAST_REPLY_MAX_TURN", "2")
+    engine = create_fast_reply_engine()
+    assert isinstance(engine, FastReplyEngine) and engine.max_turn == 2
+
+
+def test_conversation_manager_skips_llm_for_early_turns():
+    """Test that turn 1 is answered from templates and an extraction turn calls the LLM"""
+    pytest.importorskip("httpx")
+    from src.agent.conversation_manager import ConversationManager
+    from src.personas.persona_manager import PersonaManager
+
+    manager = ConversationManager(fast_reply=FastReplyEngine())
+    llm_calls = []
+
+    async def fake_llm(system_prompt, user_message, conversation_history=None, cache_key=None, context=None):
+        llm_calls.append(user_message)
+        return "Which account number should I use?"
+    manager.llm_client.generate_response = fake_llm
+
+    persona = PersonaManager().select_persona("bank_fraud")
+
+    def turn(message, turn_count):
+        return asyncio.run(manager.generate_response(
+            message=message,
+            conversation_id="conv_fast",
+            history=[],
+            persona=persona,
+            scam_type="bank_fraud",
+            turn_count=turn_count
+        ))
+
+    first = turn("Your KYC has expired, account will be blocked today", 1)
+    assert llm_calls == []
+    assert first
+
+    assert turn("Pay Rs 500 processing fee now", 5) == "Which account number should I use?"
+    assert llm_calls == ["Pay Rs 500 processing fee now"]
+
+
+def test_streamed_fast_reply_is_recorded_if_the_client_disconnects():
+    """Test that a streamed template reply is saved even when the stream is closed right after it"""
+    pytest.importorskip("httpx")
+    from src.agent.conversation_manager import ConversationManager
+    from src.personas.persona_manager import PersonaManager
+
+    manager = ConversationManager(fast_reply=FastReplyEngine())
+    persona = PersonaManager().select_persona("bank_fraud")
+
+    async def run():
+        stream = manager.stream_response(
+            message="Your KYC has expired, account will be blocked today",
+            conversation_id="conv_fast_stream",
+            history=[],
+            persona=persona,
+            scam_type="bank_fraud",
+            turn_count=1
+        )
+        reply = await stream.__anext__()
+        await stream.aclose()  # client went away
+        return reply
+
+    reply = asyncio.run(run())
+
+    assert manager.state_store.get("conv_fast_stream")["last_response"] == reply
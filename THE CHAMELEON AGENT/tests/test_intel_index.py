@@ -0,0 +1,137 @@
+"""
+Test Intelligence Index (cross-conversation entity lookup)
+"""
+
+import asyncio
+
+import pytest
+from src.agent.conversation_manager import ConversationManager
+from src.extraction.entity_extractor import EntityExtractor
+from src.storage.event_log import EventLog
+from src.storage.intel_index import IntelIndex, normalize
+from src.storage.state_store import MemoryStateStore
+
+
+def test_spellings_of_one_entity_share_a_key():
+    """Test that case, URL scheme and phone prefixes are normalized away"""
+    assert normalize("upi", " Refund@YBL ") == "refund@ybl"
+    assert normalize("phone", "+91 98765-43210") == normalize("phone", "9876543210") == "9876543210"
+    assert normalize("url", "HTTPS://www.sbi-kyc.tk/") == normalize("url", "sbi-kyc.tk") == "sbi-kyc.tk"
+    assert normalize("account", "1234 5678 901") == "12345678901"
+    assert normalize("account", "n/a") is None
+
+
+def test_lookup_counts_conversations_and_personas():
+    """Test that an entity seen in 300 conversations across three personas is reported as such"""
+    index = IntelIndex()
+    personas = ["Ramesh Kumar", "Priya Sharma", "Arjun Mehta"]
+    for i in range(300):
+        index.add(f"conv_{i}", [("upi", "xyz@ybl"), ("account", "12345678901")], personas[i % 3], ts=1000.0 + i)
+        # Later turns of the same conversation re-report what was already found
+        index.add(f"conv_{i}", [("upi", "XYZ@ybl")], personas[i % 3], ts=2000.0 + i)
+
+    result = index.lookup("upi", "xyz@ybl", limit=2)
+
+    assert result["conversations"] == 300
+    assert result["personas"] == {name: 100 for name in personas}
+    assert (result["first_seen"], result["last_seen"]) == (1000.0, 2299.0)
+    assert result["conversation_ids"] == ["conv_298", "conv_299"]
+    assert index.lookup("account", "12345678901")["last_seen"] == 1299.0
+    assert index.lookup("upi", "abc@ybl") is None
+    assert [r["kind"] for r in index.search("12345678901")] == ["account"]
+    assert index.stats() == {"entities": 2, "conversations": 300, "postings": 600}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """Test that a saved index answers the same after loading and keeps deduplicating"""
+    index = IntelIndex()
+    index.add("c1", [("phone", "9876543210"), ("url", "http://kyc.tk")], "Ramesh Kumar", ts=5.0)
+    index.add("c2", [("phone", "+919876543210")], ts=6.0)
+    path = str(tmp_path / "intel.json")
+    index.save(path)
+
+    loaded = IntelIndex.load(path)
+    loaded.add("c1", [("phone", "9876543210")], ts=7.0)
+
+    result = loaded.lookup("phone", "9876543210")
+    assert result["conversations"] == 2
+    assert result["personas"] == {"Ramesh Kumar": 1, "unknown": 1}
+    assert (result["first_seen"], result["last_seen"]) == (5.0, 7.0)
+    assert loaded.lookup("url", "kyc.tk")["conversation_ids"] == ["c1"]
+
+
+def test_workers_saving_to_one_path_keep_each_others_entities(tmp_path):
+    """Test that entities from every worker survive when all of them save on shutdown"""
+    path = str(tmp_path / "intel.json")
+    first, second = IntelIndex(), IntelIndex()
+    first.add("c1", [("upi", "shared@ybl"), ("phone", "9876543210")], "Ramesh Kumar", ts=1.0)
+    second.add("c2", [("upi", "SHARED@ybl"), ("url", "kyc.tk")], ts=2.0)
+
+    first.save(path)
+    second.save(path)
+    # A restarted worker starts from the merged file and saves it again unchanged
+    IntelIndex.load(path).save(path)
+    loaded = IntelIndex.load(path)
+
+    shared = loaded.lookup("upi", "shared@ybl")
+    assert shared["conversations"] == 2
+    assert (shared["first_seen"], shared["last_seen"]) == (1.0, 2.0)
+    assert shared["personas"] == {"Ramesh Kumar": 1, "unknown": 1}
+    assert loaded.lookup("url", "kyc.tk")["conversation_ids"] == ["c2"]
+    assert loaded.stats() == {"entities": 3, "conversations": 2, "postings": 4}
+
+
+def test_extraction_updates_index_and_replay_rebuilds_it(tmp_path):
+    """Test that extraction feeds the index and a restart rebuilds it from the event log"""
+    manager = ConversationManager(
+        state_store=MemoryStateStore(), event_log=EventLog(str(tmp_path)), intel_index=IntelIndex()
+    )
+    extractor = EntityExtractor()
+    for conversation_id in ("conv_a", "conv_b"):
+        manager.state_store.set(conversation_id, {"persona": "Ramesh Kumar", "extracted_data": {}})
+        manager.extract_intelligence(conversation_id, ["Pay the fee to scam@ybl"], extractor)
+    manager.event_log.close()
+
+    assert manager.intel_index.lookup("upi", "scam@ybl")["conversations"] == 2
+
+    restarted = ConversationManager(
+        state_store=MemoryStateStore(), event_log=EventLog(str(tmp_path)), intel_index=IntelIndex()
+    )
+    restarted.restore_from_log()
+
+    assert restarted.intel_index.lookup("upi", "scam@ybl")["conversations"] == 2
+
+
+def test_intel_search_endpoint(monkeypatch):
+    """Test that /intel/search finds an entity across conversations"""
+    pytest.importorskip("fastapi")
+    httpx = pytest.importorskip("httpx")
+    monkeypatch.setenv("HONEYPOT_API_KEY", "test-api-key")
+
+    import importlib
+    import main
+    main = importlib.reload(main)
+    main.conversation_manager.fast_reply = None
+
+    async def llm(system_prompt, user_message, conversation_history=None, cache_key=None, context=None):
+        return "Which app should I use, beta?"
+    main.conversation_manager.llm_client.generate_response = llm
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        headers = {"X-API-Key": "test-api-key"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            for i in range(3):
+                await api.post("/honeypot", headers=headers, json={
+                    "message": "Your KYC expired, pay 10 rupees to verify@paytm", "conversation_id": f"kyc_{i}"
+                })
+            found = await api.get("/intel/search", params={"value": "Verify@Paytm"}, headers=headers)
+            bad_kind = await api.get("/intel/search", params={"value": "x", "kind": "email"}, headers=headers)
+            return found, bad_kind
+
+    found, bad_kind = asyncio.run(run())
+
+    [result] = found.json()["results"]
+    assert result["kind"] == "upi" and result["conversations"] == 3
+    assert sorted(result["conversation_ids"]) == ["kyc_0", "kyc_1", "kyc_2"]
+    assert bad_kind.status_code == 400
@@ -0,0 +1,219 @@
+"""
+Test LLM Client transport (runs against a local mock provider)
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from src.agent.llm_client import LLMClient
+from tests.conftest import make_mock_provider, make_streaming_provider, run_with_client
+
+
+MOCK_LATENCY = 0.3
+
+
+def test_gemini_request_shape(gemini_env):
+    """Test that the REST payload and auth header are sent"""
+    calls = []
+    client = LLMClient(transport=make_mock_provider(calls=calls))
+
+    reply = run_with_client(client, lambda: client.generate_response("SYSTEM", "Your KYC expired"))
+
+    assert reply == "Beta, which button?"
+    assert calls[0].headers["x-goog-api-key"] == "test-key"
+    assert calls[0].url.path.endswith(f"/models/{client.model_name}:generateContent")
+
+
+def test_concurrent_calls_overlap(gemini_env):
+    """Test that N concurrent calls finish in roughly the time of one"""
+    client = LLMClient(transport=make_mock_provider(latency=MOCK_LATENCY))
+
+    start = time.perf_counter()
+    replies = run_with_client(client, lambda: asyncio.gather(*[
+        client.generate_response("SYSTEM", f"message {i}") for i in range(20)
+    ]))
+    elapsed = time.perf_counter() - start
+
+    assert len(replies) == 20
+    assert elapsed < MOCK_LATENCY * 3
+
+
+def test_timeout_returns_fallback(gemini_env, monkeypatch):
+    """Test that LLM_TIMEOUT is enforced and a fallback reply is served"""
+    monkeypatch.setenv("LLM_TIMEOUT", "0.1")
+    client = LLMClient(transport=make_mock_provider(latency=1.0))
+
+    start = time.perf_counter()
+    reply = run_with_client(client, lambda: client.generate_response("SYSTEM", "Your bank account is blocked"))
+
+    assert time.perf_counter() - start < 0.5
+    assert reply == client._get_fallback_response("Your bank account is blocked")
+
+
+def test_concurrent_honeypot_requests(gemini_env, monkeypatch):
+    """Test that concurrent /honeypot requests do not queue behind each other"""
+    pytest.importorskip("fastapi")
+    monkeypatch.setenv("HONEYPOT_API_KEY", "test-api-key")
+
+    import importlib
+    import main
+    main = importlib.reload(main)
+    main.conversation_manager.llm_client = LLMClient(transport=make_mock_provider(latency=MOCK_LATENCY))
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            try:
+                return await asyncio.gather(*[
+                    api.post(
+                        "/honeypot",
+                        json={"message": "Update your KYC now", "conversation_id": f"conv_{i}"},
+                        headers={"X-API-Key": "test-api-key"},
+                    )
+                    for i in range(10)
+                ])
+            finally:
+                await main.conversation_manager.llm_client.aclose()
+
+    start = time.perf_counter()
+    responses = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["agent_response"] == "Beta, which button?" for r in responses)
+    assert elapsed < MOCK_LATENCY * 3
+
+
+def test_stream_yields_tokens_before_completion(gemini_env):
+    """Test that the first chunk arrives after one chunk delay, not the whole reply"""
+    chunks = [" Beta,", " which", " button?"]
+    client = LLMClient(transport=make_streaming_provider(chunks, delay=0.2))
+
+    async def read():
+        start = time.perf_counter()
+        return [
+            (chunk, time.perf_counter() - start)
+            async for chunk in client.stream_response("SYSTEM", "Your KYC expired")
+        ]
+
+    received = run_with_client(client, read)
+
+    assert "".join(chunk for chunk, _ in received) == "Beta, which button?"
+    assert received[0][1] < 0.2 * 2
+    assert received[-1][1] >= 0.2 * len(chunks)
+
+
+def test_stream_error_yields_fallback(gemini_env):
+    """Test that a provider error before any token falls back to the canned reply"""
+    client = LLMClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+
+    async def read():
+        return [chunk async for chunk in client.stream_response("SYSTEM", "You won a lottery prize")]
+
+    assert run_with_client(client, read) == [client._get_fallback_response("You won a lottery prize")]
+
+
+def test_slow_reader_does_not_hold_slot_or_time_out(gemini_env, monkeypatch):
+    """Test that a slow stream reader neither holds the concurrency slot nor runs into the LLM deadline"""
+    monkeypatch.setenv("LLM_TIMEOUT", "0.3")
+    chunks = [" Beta,", " which", " button", " to", " press?"]
+    client = LLMClient(transport=make_streaming_provider(chunks, delay=0.01))
+
+    async def read():
+        received, in_flight = [], []
+        async for chunk in client.stream_response("SYSTEM", "Your KYC expired"):
+            received.append(chunk)
+            await asyncio.sleep(0.15)
+            in_flight.append(client._in_flight)
+        return received, in_flight
+
+    received, in_flight = run_with_client(client, read)
+
+    assert "".join(received) == "Beta, which button to press?"
+    assert in_flight[-1] == 0
+
+
+def test_honeypot_stream_endpoint(gemini_env, monkeypatch):
+    """Test that /honeypot/stream sends token frames then a final frame"""
+    pytest.importorskip("fastapi")
+    monkeypatch.setenv("HONEYPOT_API_KEY", "test-api-key")
+
+    import importlib
+    import main
+    main = importlib.reload(main)
+    main.conversation_manager.llm_client = LLMClient(
+        transport=make_streaming_provider(["Send", " me", " your UPI 9876543210@paytm"], delay=0)
+    )
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            try:
+                return await api.post(
+                    "/honeypot/stream",
+                    json={"message": "Congratulations! You won 5 lakh rupees", "conversation_id": "stream_1"},
+                    headers={"X-API-Key": "test-api-key"},
+                )
+            finally:
+                await main.conversation_manager.llm_client.aclose()
+
+    response = asyncio.run(run())
+    frames = [json.loads(line) for line in response.text.splitlines() if line]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [f["type"] for f in frames] == ["token", "token", "token", "final"]
+    final = frames[-1]["response"]
+    assert final["agent_response"] == "Send me your UPI 9876543210@paytm"
+    assert final["scam_type"] == "prize"
+    assert final["extracted_intelligence"]["upi_ids"][0]["upi_id"] == "9876543210@paytm"
+
+
+def test_import_does_not_load_http_stack():
+    """Test that importing the app leaves httpx to the first LLM call or /ready"""
+    pytest.importorskip("fastapi")
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('httpx' in sys.modules)"],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_ready_probe_warms_llm_client(gemini_env, monkeypatch):
+    """Test that /ready answers 503 while the LLM client warms up, then 200"""
+    pytest.importorskip("fastapi")
+
+    import importlib
+    import main
+    main = importlib.reload(main)
+    main.conversation_manager.llm_client = LLMClient(transport=make_mock_provider(latency=MOCK_LATENCY))
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            try:
+                first = await api.get("/ready")
+                for _ in range(100):
+                    await asyncio.sleep(0.01)
+                    second = await api.get("/ready")
+                    if second.status_code == 200:
+                        break
+                return first, second
+            finally:
+                await main.conversation_manager.aclose()
+
+    first, second = asyncio.run(run())
+
+    assert first.status_code == 503 and first.json() == {"status": "warming"}
+    assert second.status_code == 200 and second.json() == {"status": "ready"}
+    assert main.conversation_manager.llm_client._http is None  # closed again by aclose()
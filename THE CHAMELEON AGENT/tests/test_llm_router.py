@@ -0,0 +1,156 @@
+"""
+Test LLM Router (backend ranking, failover and hedged requests)
+"""
+
+import asyncio
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from src.agent.llm_client import LLMClient
+from src.agent.llm_router import Backend, LLMRouter
+
+
+def make_backend(name):
+    return Backend(provider="gemini", model_name=name, api_key="k", base_url="http://mock")
+
+
+def test_ranks_fastest_healthy_backend_first():
+    """Test that backends are ordered by expected latency, benched ones last"""
+    slow, fast, broken = make_backend("slow"), make_backend("fast"), make_backend("broken")
+    router = LLMRouter([slow, fast, broken], max_failures=2, cooldown=60)
+    for _ in range(5):
+        router.record_success(slow, 0.8)
+        router.record_success(fast, 0.1)
+    router.record_failure(broken)
+    router.record_failure(broken)
+
+    assert [b.model_name for b in router.ranked()] == ["fast", "slow", "broken"]
+    assert not broken.healthy(time.monotonic())
+
+
+def test_errors_raise_expected_latency():
+    """Test that a fast but flaky backend loses to a slightly slower reliable one"""
+    flaky, steady = make_backend("flaky"), make_backend("steady")
+    router = LLMRouter([flaky, steady], max_failures=100)
+    for i in range(10):
+        router.record_success(steady, 0.3)
+        if i % 2:
+            router.record_success(flaky, 0.2)
+        else:
+            router.record_failure(flaky)
+
+    assert router.ranked()[0] is steady
+
+
+def test_hedge_delay_is_p95_after_warmup():
+    """Test that hedging waits for enough samples, then uses the rolling p95"""
+    backend = make_backend("m")
+    router = LLMRouter([backend], hedge=True, hedge_min_samples=20)
+    for i in range(19):
+        router.record_success(backend, 0.1)
+    assert router.hedge_delay(backend) is None
+
+    router.record_success(backend, 2.0)
+    assert router.hedge_delay(backend) == 2.0
+    for i in range(20):
+        router.record_success(backend, 0.1)
+    assert router.hedge_delay(backend) == pytest.approx(0.1)
+
+
+def make_two_provider_mock(gemini, groq):
+    """Mock serving Gemini and Groq routes; each handler returns (delay, status)"""
+    calls = []
+
+    async def handler(request):
+        if request.url.path.endswith(":generateContent"):
+            delay, status = gemini()
+            calls.append("gemini")
+            body = {"candidates": [{"content": {"parts": [{"text": "from gemini"}]}}]}
+        else:
+            delay, status = groq()
+            calls.append("groq")
+            body = {"choices": [{"message": {"content": "from groq"}}]}
+        await asyncio.sleep(delay)
+        return httpx.Response(status, json=body)
+    return httpx.MockTransport(handler), calls
+
+
+@pytest.fixture
+def two_backends(monkeypatch):
+    monkeypatch.setenv("LLM_BACKENDS", "gemini:gemini-2.0-flash,groq:llama-3.1-8b-instant")
+    monkeypatch.setenv("GOOGLE_API_KEY", "g-key")
+    monkeypatch.setenv("GROQ_API_KEY", "q-key")
+    monkeypatch.setenv("LLM_TIMEOUT", "2")
+    monkeypatch.setenv("LLM_CACHE_BACKEND", "off")
+
+
+def test_failover_survives_provider_outage(two_backends):
+    """Test that a Gemini outage is answered by Groq instead of the fallback text"""
+    transport, calls = make_two_provider_mock(gemini=lambda: (0, 503), groq=lambda: (0, 200))
+    client = LLMClient(transport=transport)
+
+    async def run():
+        try:
+            return [await client.generate_response("SYSTEM", "Your KYC expired") for _ in range(5)]
+        finally:
+            await client.aclose()
+
+    replies = asyncio.run(run())
+
+    assert replies == ["from groq"] * 5
+    # Gemini is benched after LLM_BACKEND_MAX_FAILURES errors and no longer tried first
+    assert calls.count("gemini") == 3
+    assert client.router.ranked()[0].provider == "groq"
+
+
+def test_stream_fails_over_before_first_chunk(two_backends):
+    """Test that a stream whose first backend errors is served by the next one"""
+    async def handler(request):
+        if ":streamGenerateContent" in request.url.path:
+            return httpx.Response(503)
+        body = b'data: {"choices": [{"delta": {"content": "from groq"}}]}\n\ndata: [DONE]\n\n'
+        return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+    client = LLMClient(transport=httpx.MockTransport(handler))
+
+    async def run():
+        try:
+            return [chunk async for chunk in client.stream_response("SYSTEM", "Your KYC expired")]
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == ["from groq"]
+
+
+def test_hedged_request_cuts_tail_latency(two_backends, monkeypatch):
+    """Test that a call stuck past the p95 is hedged and the faster reply wins"""
+    monkeypatch.setenv("LLM_HEDGE", "true")
+    monkeypatch.setenv("LLM_HEDGE_MIN_SAMPLES", "5")
+    gemini_delays = iter([0.05] * 5 + [1.5])
+    transport, calls = make_two_provider_mock(
+        gemini=lambda: (next(gemini_delays), 200), groq=lambda: (0.05, 200)
+    )
+    client = LLMClient(transport=transport)
+    gemini, groq = client.router.backends
+    for _ in range(5):
+        client.router.record_success(groq, 0.5)  # groq known to be slower on average
+
+    async def run():
+        try:
+            for _ in range(5):
+                await client.generate_response("SYSTEM", "warm up")
+            start = time.perf_counter()
+            reply = await client.generate_response("SYSTEM", "Your KYC expired")
+            return reply, time.perf_counter() - start
+        finally:
+            await client.aclose()
+
+    reply, elapsed = asyncio.run(run())
+
+    assert reply == "from groq"
+    assert elapsed < 0.5
+    assert calls == ["gemini"] * 6 + ["groq"]
+    # The cancelled Gemini call still counts as a (lower bound) latency sample
+    assert len(gemini.latencies) == 6 and gemini.latencies[-1] > 0.05
@@ -0,0 +1,95 @@
+"""
+Test Prometheus Metrics
+"""
+
+import asyncio
+
+import pytest
+
+from src.monitoring.metrics import Registry
+
+
+def test_counter_and_gauge_render():
+    """Test text exposition of labelled counters and callback gauges"""
+    registry = Registry()
+    counter = registry.counter("test_replies_total", "Replies", ["reason"])
+    gauge = registry.gauge("test_sessions", "Sessions")
+    counter.inc(reason="timeout")
+    counter.inc(2, reason="timeout")
+    gauge.set_function(lambda: 7)
+
+    text = registry.render()
+
+    assert "# TYPE test_replies_total counter" in text
+    assert 'test_replies_total{reason="timeout"} 3' in text
+    assert "test_sessions 7" in text
+    assert text.endswith("\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that bucket counts accumulate and +Inf equals the count"""
+    registry = Registry()
+    histogram = registry.histogram("test_seconds", "Latency", ["stage"], buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, stage="llm")
+
+    lines = registry.render().splitlines()
+
+    assert 'test_seconds_bucket{stage="llm",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="llm",le="1"} 2' in lines
+    assert 'test_seconds_bucket{stage="llm",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="llm"} 3' in lines
+    assert 'test_seconds_sum{stage="llm"} 5.55' in lines
+
+
+def test_labels_must_match():
+    """Test that a metric rejects unknown or missing labels"""
+    counter = Registry().counter("test_total", "Count", ["provider"])
+    with pytest.raises(ValueError):
+        counter.inc(model="x")
+
+
+def test_metrics_endpoint_after_honeypot(monkeypatch):
+    """Test /metrics reports stage timings and fallbacks without an API key"""
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("fastapi")
+    monkeypatch.setenv("HONEYPOT_API_KEY", "test-api-key")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+    import importlib
+    import main
+    main = importlib.reload(main)
+
+    async def failing_provider(request):
+        raise httpx.ConnectError("provider down")
+    client = main.conversation_manager.llm_client
+    client._transport = httpx.MockTransport(failing_provider)
+
+    from src.monitoring.metrics import STAGE_SECONDS, FALLBACK_REPLIES
+    detections = STAGE_SECONDS.count(stage="detection")
+    fallbacks = FALLBACK_REPLIES.value(reason="error")
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            honeypot = await api.post(
+                "/honeypot",
+                json={"message": "Your KYC will expire today. Update immediately or your account will be blocked.", "conversation_id": "metrics_1", "history": []},
+                headers={"X-API-Key": "test-api-key"}
+            )
+            metrics = await api.get("/metrics")
+            await client.aclose()
+            return honeypot, metrics
+
+    honeypot, metrics = asyncio.run(run())
+
+    assert honeypot.status_code == 200
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert STAGE_SECONDS.count(stage="detection") == detections + 1
+    assert FALLBACK_REPLIES.value(reason="error") == fallbacks + 1
+    for stage in ("detection", "persona_selection", "prompt_build", "response_generation", "extraction"):
+        assert f'chameleon_stage_seconds_count{{stage="{stage}"}}' in metrics.text
+    assert 'outcome="error"' in metrics.text
+    assert "chameleon_live_sessions" in metrics.text
+    assert honeypot.json()["engagement_metrics"]["engagement_duration_seconds"] == 0
@@ -0,0 +1,80 @@
+"""
+Test LLM Response Cache
+"""
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from src.agent.llm_client import LLMClient
+from src.agent.response_cache import ResponseCache
+from src.storage.state_store import MemoryStateStore, SQLiteStateStore
+from tests.conftest import make_mock_provider, run_with_client
+
+
+def make_counting_provider(calls):
+    """Gemini-compatible mock that numbers its replies"""
+    return make_mock_provider(reply=lambda count: f"Reply {count}", calls=calls)
+
+
+def test_key_normalization():
+    """Test that case, punctuation and spacing do not change the key"""
+    key = ResponseCache.make_key("Ramesh", "trust_building", ["Your KYC will expire TODAY!!"])
+    
+    assert key == ResponseCache.make_key("Ramesh", "trust_building", ["your kyc  will expire today"])
+    assert key != ResponseCache.make_key("Ramesh", "extraction", ["your kyc will expire today"])
+    assert key != ResponseCache.make_key("Priya", "trust_building", ["your kyc will expire today"])
+
+
+def test_serves_variants_after_filling(gemini_env):
+    """Test that a key is filled with N LLM replies, then served from cache"""
+    calls = []
+    cache = ResponseCache(MemoryStateStore(), variants=2)
+    client = LLMClient(transport=make_counting_provider(calls), cache=cache)
+    key = ResponseCache.make_key("Ramesh", "trust_building", ["Your KYC will expire today"])
+    
+    async def converse():
+        return [await client.generate_response("SYSTEM", "Your KYC will expire today", cache_key=key)
+                for _ in range(10)]
+    
+    replies = run_with_client(client, converse)
+    
+    assert len(calls) == 2
+    assert replies[:2] == ["Reply 1", "Reply 2"]
+    assert set(replies[2:]) <= {"Reply 1", "Reply 2"}
+    assert cache.stats()["hits"] == 8
+    assert cache.stats()["misses"] == 2
+
+
+def test_fallback_is_not_cached(gemini_env):
+    """Test that provider failures do not poison the cache"""
+    async def failing(request):
+        return httpx.Response(500)
+    
+    cache = ResponseCache(MemoryStateStore(), variants=1)
+    client = LLMClient(transport=httpx.MockTransport(failing), cache=cache)
+    
+    run_with_client(client, lambda: client.generate_response("SYSTEM", "Your KYC will expire", cache_key="k"))
+    assert cache.get("k") is None
+
+
+def test_stream_uses_cache(gemini_env):
+    """Test that a cached reply is streamed as one chunk without a provider call"""
+    calls = []
+    cache = ResponseCache(MemoryStateStore(), variants=1)
+    cache.put("k", "Oh no, what should I do?")
+    client = LLMClient(transport=make_counting_provider(calls), cache=cache)
+    
+    async def read():
+        return [chunk async for chunk in client.stream_response("SYSTEM", "hi", cache_key="k")]
+    
+    assert run_with_client(client, read) == ["Oh no, what should I do?"]
+    assert calls == []
+
+
+def test_persistent_cache(tmp_path):
+    """Test that the sqlite backend keeps replies across restarts"""
+    path = str(tmp_path / "cache.db")
+    ResponseCache(SQLiteStateStore(path=path), variants=1).put("k", "Which button?")
+    
+    assert ResponseCache(SQLiteStateStore(path=path), variants=1).get("k") == "Which button?"
@@ -101,3 +101,67 @@ def test_mixed_language_scam(detector):
     
     assert result["is_scam"] == True
     assert result["scam_type"] == "financial"
+
+
+def reference_analyze(detector, message):
+    """The original scan-per-keyword implementation, used as the oracle"""
+    import re
+    message_lower = message.lower()
+    scores = {}
+    for scam_type, patterns in detector.scam_patterns.items():
+        keyword_matches = sum(1 for keyword in patterns["keywords"] if keyword in message_lower)
+        pattern_matches = sum(1 for pattern in patterns["patterns"] if re.search(pattern, message_lower))
+        scores[scam_type] = min(keyword_matches * 0.1, 0.5) + min(pattern_matches * 0.2, 0.6)
+    best = max(scores, key=scores.get)
+    score = scores[best]
+    signals = []
+    for name, boost, patterns in (
+        ("urgency", 0.1, detector.urgency_patterns),
+        ("authority_claim", 0.15, detector.authority_patterns),
+        ("action_request", 0.15, detector.action_patterns),
+    ):
+        if any(re.search(p, message_lower) for p in patterns):
+            signals.append(name)
+            score += boost
+    confidence = min(score, 1.0)
+    return {
+        "is_scam": confidence >= 0.3,
+        "scam_type": best if confidence >= 0.3 else None,
+        "confidence": round(confidence, 2),
+        "signals_detected": signals,
+        "all_scores": {k: round(v, 2) for k, v in scores.items()}
+    }
+
+
+def test_matches_reference_on_scenarios(detector):
+    """Test that the compiled matcher gives identical results on realistic messages"""
+    from tests.mock_scenarios import MOCK_SCENARIOS
+
+    messages = [turn["message"] for s in MOCK_SCENARIOS for turn in s["conversation"]]
+    for message in messages + [" ".join(messages)]:
+        assert detector.analyze(message) == reference_analyze(detector, message)
+
+
+def test_matches_reference_on_overlapping_fragments(detector):
+    """Test overlapping and nested keywords/patterns (e.g. 'computer problem', 'lucky draw')"""
+    import random
+
+    rng = random.Random(7)
+    vocabulary = [kw for p in detector.scam_patterns.values() for kw in p["keywords"]]
+    vocabulary += ["your computer is infected", "won 5 lakh", "call us", "act now", "pay 500",
+                   "registration fee", "hi darling", "upcoming", "companion", "sbin", "x", " ", "."]
+    for _ in range(300):
+        parts = rng.choices(vocabulary, k=rng.randint(1, 25))
+        message = rng.choice(["", " "]).join(parts)
+        assert detector.analyze(message) == reference_analyze(detector, message)
+
+
+def test_literal_prefixes():
+    """Test the literal prefilter extracted from each pattern"""
+    from src.detection.matcher import literal_prefixes
+
+    assert literal_prefixes(r"(virus|malware) detected") == (frozenset({"virus detected", "malware detected"}), True)
+    assert literal_prefixes(r"won.*(lakh|crore)") == (frozenset({"won"}), False)
+    assert literal_prefixes(r"\d+ rupees") == (None, False)
+    assert literal_prefixes(r"(urgent|)now") == (frozenset({"urgentnow", "now"}), True)
+    assert literal_prefixes(r"(urgent|)") == (None, False)
@@ -0,0 +1,168 @@
+"""
+Test Conversation State Stores
+"""
+
+import asyncio
+import fnmatch
+import time
+
+import pytest
+from src.storage.state_store import (
+    MemoryStateStore, RedisStateStore, SQLiteStateStore, create_state_store
+)
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the redis-py client calls the store uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def _alive(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def getex(self, key, ex=None):
+        entry = self._alive(key)
+        if entry is None:
+            return None
+        self.data[key] = (entry[0], time.monotonic() + ex)
+        return entry[0]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value.encode(), time.monotonic() + ex)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match="*", count=None):
+        return [k for k in list(self.data) if self._alive(k) and fnmatch.fnmatch(k, match)]
+
+
+@pytest.fixture(params=["memory", "redis", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStateStore(max_sessions=100, ttl_seconds=60)
+    if request.param == "redis":
+        return RedisStateStore(client=FakeRedis(), ttl_seconds=60)
+    return SQLiteStateStore(path=str(tmp_path / "state.db"), ttl_seconds=60)
+
+
+def test_roundtrip(store):
+    """Test that stored state comes back unchanged"""
+    state = {"persona": "Ramesh Kumar", "turn_count": 2, "extracted_data": {"upi_ids": ["a@ybl"]}}
+    store.set("conv_1", state)
+
+    assert store.get("conv_1") == state
+    assert "conv_1" in store
+    assert store.get("missing") is None
+    assert len(store) == 1
+
+
+def test_delete(store):
+    """Test that deleted sessions are gone"""
+    store.set("conv_1", {"turn_count": 1})
+    store.delete("conv_1")
+
+    assert store.get("conv_1") is None
+    assert len(store) == 0
+
+
+def test_ttl_expiry(store):
+    """Test that sessions expire after the TTL without activity"""
+    store.ttl_seconds = 1
+    store.set("conv_1", {"turn_count": 1})
+    time.sleep(1.1)
+
+    assert store.get("conv_1") is None
+    assert len(store) == 0
+
+
+def test_memory_store_evicts_least_recently_used():
+    """Test that the memory backend stays under its session cap"""
+    store = MemoryStateStore(max_sessions=3, ttl_seconds=60)
+    for i in range(3):
+        store.set(f"conv_{i}", {"turn_count": i})
+    store.get("conv_0")  # conv_1 becomes the least recently used
+    store.set("conv_3", {"turn_count": 3})
+
+    assert len(store) == 3
+    assert store.get("conv_1") is None
+    assert store.get("conv_0") is not None
+
+
+def test_redis_len_reuses_a_recent_scan():
+    """Test that len() on the Redis backend scans at most once per count_ttl_seconds"""
+    client = FakeRedis()
+    scans = []
+    scan_iter = client.scan_iter
+    client.scan_iter = lambda **kwargs: scans.append(kwargs) or scan_iter(**kwargs)
+    store = RedisStateStore(client=client, ttl_seconds=60, count_ttl_seconds=0.2)
+    other_worker = RedisStateStore(client=client, ttl_seconds=60)
+    store.set("conv_1", {"turn_count": 1})
+
+    assert [len(store) for _ in range(100)] == [1] * 100
+    other_worker.set("conv_2", {"turn_count": 1})
+    assert len(store) == 1
+    time.sleep(0.25)
+    assert len(store) == 2
+    assert len(scans) == 2
+
+
+def test_sqlite_store_survives_reopen(tmp_path):
+    """Test that SQLite state is visible to a new store instance (restart/other worker)"""
+    path = str(tmp_path / "state.db")
+    SQLiteStateStore(path=path).set("conv_1", {"turn_count": 4})
+
+    assert SQLiteStateStore(path=path).get("conv_1") == {"turn_count": 4}
+
+
+def test_create_state_store_from_env(monkeypatch, tmp_path):
+    """Test backend selection via STATE_BACKEND"""
+    monkeypatch.setenv("STATE_BACKEND", "sqlite")
+    monkeypatch.setenv("STATE_SQLITE_PATH", str(tmp_path / "env.db"))
+    assert isinstance(create_state_store(), SQLiteStateStore)
+
+    monkeypatch.setenv("STATE_BACKEND", "memory")
+    monkeypatch.setenv("STATE_MAX_SESSIONS", "5")
+    store = create_state_store()
+    assert isinstance(store, MemoryStateStore)
+    assert store.max_sessions == 5
+
+    monkeypatch.setenv("STATE_BACKEND", "bogus")
+    with pytest.raises(ValueError):
+        create_state_store()
+
+
+def test_conversation_manager_shares_state_through_store():
+    """Test that two managers (e.g. two workers) see each other's conversations"""
+    pytest.importorskip("httpx")
+    from src.agent.conversation_manager import ConversationManager
+    from src.personas.persona_manager import PersonaManager
+
+    shared = RedisStateStore(client=FakeRedis())
+    worker_a = ConversationManager(state_store=shared)
+    worker_b = ConversationManager(state_store=shared)
+
+    async def fake_llm(system_prompt, user_message, conversation_history=None, cache_key=None, context=None):
+        return "Which button, beta?"
+    worker_a.llm_client.generate_response = fake_llm
+
+    persona = PersonaManager().select_persona("tech_support")
+    asyncio.run(worker_a.generate_response(
+        message="Your computer has virus",
+        conversation_id="conv_shared",
+        history=[],
+        persona=persona,
+        scam_type="tech_support",
+        turn_count=1
+    ))
+
+    metrics = worker_b.get_conversation_metrics("conv_shared")
+    assert metrics["turn_count"] == 1
+    assert metrics["persona_used"] == persona.name
@@ -0,0 +1,111 @@
+"""
+Test Turn Coalescer (per-conversation serialization and message coalescing)
+"""
+
+import asyncio
+
+import pytest
+from src.agent.turn_coalescer import TurnCoalescer
+
+
+def test_turns_for_one_conversation_never_overlap():
+    """Test that turns run one at a time per conversation but in parallel across them"""
+    coalescer = TurnCoalescer()
+    running = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+
+    async def send(conversation_id, message):
+        async with coalescer.turn(conversation_id, message) as turn:
+            if turn.answered:
+                return turn.reply
+            running[conversation_id] += 1
+            peak[conversation_id] = max(peak[conversation_id], running[conversation_id])
+            await asyncio.sleep(0.02)
+            running[conversation_id] -= 1
+            turn.resolve("+".join(turn.items))
+            return turn.reply
+
+    async def run():
+        return await asyncio.gather(*[send(cid, f"{cid}{i}") for i in range(4) for cid in ("a", "b")])
+
+    replies = asyncio.run(run())
+
+    assert peak == {"a": 1, "b": 1}
+    # The first message runs alone, the rest queued behind it share one reply
+    assert replies[0] == "a0" and replies[2] == replies[4] == replies[6] == "a1+a2+a3"
+    assert len(coalescer) == 0
+
+
+def test_failed_turn_leaves_queued_messages_for_the_next_caller():
+    """Test that messages coalesced into a failed turn are answered by another caller"""
+    coalescer = TurnCoalescer()
+
+    async def send(message, fail=False):
+        async with coalescer.turn("c", message) as turn:
+            if turn.answered:
+                return turn.reply
+            await asyncio.sleep(0.02)
+            if fail and message in turn.items:
+                raise RuntimeError("LLM down")
+            turn.resolve("+".join(turn.items))
+            return turn.reply
+
+    async def run():
+        first = asyncio.ensure_future(send("m0"))
+        await asyncio.sleep(0.005)
+        return await asyncio.gather(first, send("m1", fail=True), send("m2"), return_exceptions=True)
+
+    first, failed, last = asyncio.run(run())
+
+    assert first == "m0"
+    assert isinstance(failed, RuntimeError)
+    assert last == "m2"
+
+
+def test_conversation_manager_coalesces_concurrent_messages(tmp_path):
+    """Test that a burst for one conversation costs two LLM calls and keeps extraction state"""
+    pytest.importorskip("httpx")
+    from src.agent.conversation_manager import ConversationManager
+    from src.personas.persona_manager import PersonaManager
+    from src.storage.state_store import SQLiteStateStore
+
+    # A store that returns copies, like Redis/SQLite in production, to catch lost updates
+    manager = ConversationManager(state_store=SQLiteStateStore(path=str(tmp_path / "state.db")))
+    manager.fast_reply = None
+    prompts = []
+
+    async def slow_llm(system_prompt, user_message, conversation_history=None, cache_key=None, context=None):
+        prompts.append(user_message)
+        # Another request's extraction lands while this turn waits on the LLM
+        state = manager.state_store.get("conv_burst")
+        if state is not None:
+            state["extracted_data"] = {"upi_ids": [{"upi_id": "scam@ybl"}]}
+            manager.state_store.set("conv_burst", state)
+        await asyncio.sleep(0.05)
+        return f"reply {len(prompts)}"
+    manager.llm_client.generate_response = slow_llm
+
+    persona = PersonaManager().select_persona("upi_fraud")
+
+    def send(message):
+        return manager.generate_response(
+            message=message,
+            conversation_id="conv_burst",
+            history=[],
+            persona=persona,
+            scam_type="upi_fraud",
+            turn_count=1
+        )
+
+    async def run():
+        first = asyncio.ensure_future(send("Pay now"))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, *[send(f"Hello {i}") for i in range(4)])
+
+    replies = asyncio.run(run())
+
+    assert prompts == ["Pay now", "Hello 0\nHello 1\nHello 2\nHello 3"]
+    assert replies == ["reply 1"] + ["reply 2"] * 4
+    state = manager.state_store.get("conv_burst")
+    assert state["last_response"] == "reply 2"
+    assert state["extracted_data"] == {"upi_ids": [{"upi_id": "scam@ybl"}]}
@@ -0,0 +1,182 @@
+import time
+import asyncio
+import concurrent.futures
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.metrics import ADMISSION_WAIT_SECONDS, ADMISSION_REJECTED
+
+
+class Overloaded(Exception):
+    """A request refused admission. retry_after is a hint in seconds for the client."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"LLM pool overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded admission in front of the LLM thread pool.
+
+    At most `max_in_flight` LLM calls run at once and up to `max_queue` more wait
+    for a slot in arrival order. A slot belongs to one pool task (a hedge takes its
+    own) and is held until that task has finished, even if its caller gave up. A
+    request is refused straight away instead of queueing when the queue is full,
+    when its API key already has `per_key_limit` calls running or waiting (0 = no
+    limit), or when the expected wait would not leave enough of its deadline for
+    the call itself. Runs on one event loop.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, per_key_limit: int = 0, window: int = 100):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.per_key_limit = per_key_limit
+
+        self.in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.Future, str]] = deque()
+        self._per_key: Dict[str, int] = {}
+        # How long admitted calls held their slot, for the expected wait
+        self._service_times: deque = deque(maxlen=window)
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def mean_service_time(self) -> float:
+        if not self._service_times:
+            return 0.0
+        return sum(self._service_times) / len(self._service_times)
+
+    def expected_wait(self) -> float:
+        """Seconds a request arriving now would wait for a slot (0 while one is free)"""
+        if self.in_flight < self.max_in_flight:
+            return 0.0
+        # Slots free up at roughly max_in_flight per mean service time
+        return (self.queue_depth + 1) / self.max_in_flight * self.mean_service_time()
+
+    def _reject(self, reason: str, retry_after: float):
+        self.rejected += 1
+        ADMISSION_REJECTED.inc(reason=reason)
+        raise Overloaded(reason, retry_after)
+
+    def _check(self, client_id: str, deadline: float):
+        """Refuses the request now if it cannot be admitted in time."""
+        if self.per_key_limit and self._per_key.get(client_id, 0) >= self.per_key_limit:
+            self._reject("per_key_limit", self.mean_service_time())
+        if self.in_flight >= self.max_in_flight:
+            if self.queue_depth >= self.max_queue:
+                self._reject("queue_full", self.expected_wait())
+            wait = self.expected_wait()
+            if wait + self.mean_service_time() > deadline - asyncio.get_running_loop().time():
+                self._reject("deadline", wait)
+
+    async def acquire(self, client_id: str, deadline: float):
+        """
+        Takes one LLM slot, waiting in line for it if none is free. Every acquire is
+        matched by one release_after() for the pool task that uses the slot.
+
+        Args:
+            client_id: API key the request came in with (per-key limit)
+            deadline: loop.time() by which the whole call must finish; the queue
+                wait is taken out of it
+
+        Raises:
+            Overloaded: the request was refused or waited past its deadline
+        """
+        self._check(client_id, deadline)
+        self._per_key[client_id] = self._per_key.get(client_id, 0) + 1
+        queued_at = time.perf_counter()
+        try:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+            else:
+                await self._wait_for_slot(client_id, deadline - asyncio.get_running_loop().time())
+        except BaseException:
+            self._forget(client_id)
+            raise
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - queued_at)
+        self.admitted += 1
+
+    def try_acquire(self, client_id: str) -> bool:
+        """Takes a slot only if one is free right now (hedged calls never queue)."""
+        if self.in_flight >= self.max_in_flight or self._waiters:
+            return False
+        if self.per_key_limit and self._per_key.get(client_id, 0) >= self.per_key_limit:
+            return False
+        self._per_key[client_id] = self._per_key.get(client_id, 0) + 1
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release_after(self, client_id: str, task: Optional[concurrent.futures.Future], started: float):
+        """
+        Gives the slot back once `task`, the pool task holding it, has finished (now when
+        it is None or already done). A caller that stops waiting on a timeout or
+        cancellation does not free the slot: the SDK call cannot be interrupted and keeps
+        its pool thread busy until it returns.
+        """
+        loop = asyncio.get_running_loop()
+
+        def release():
+            self._service_times.append(time.perf_counter() - started)
+            self._release()
+            self._forget(client_id)
+
+        def done(_):
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                pass  # the loop has been closed (shutdown)
+
+        if task is None or task.done():
+            release()
+        else:
+            task.add_done_callback(done)
+
+    def _forget(self, client_id: str):
+        remaining = self._per_key[client_id] - 1
+        if remaining:
+            self._per_key[client_id] = remaining
+        else:
+            del self._per_key[client_id]
+
+    async def _wait_for_slot(self, client_id: str, timeout: float):
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, client_id)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=max(timeout, 0))
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self._release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(entry)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("queue_timeout", self.expected_wait())
+            raise
+
+    def _release(self):
+        """Hands the slot to the oldest waiter, or frees it"""
+        while self._waiters:
+            waiter, _ = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # in_flight stays the same: the slot changes hands
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queue_depth,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "expected_wait_seconds": round(self.expected_wait(), 3)
+        }
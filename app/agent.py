@@ -1,60 +1,302 @@
-import google.generativeai as genai
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
+import time
 import asyncio
+import importlib
+import threading
 import concurrent.futures
-from app.config import GEMINI_API_KEY
+from app.config import (
+    GEMINI_API_KEY, LLM_POOL_SIZE, LLM_TIMEOUT_SECONDS, LLM_MODELS,
+    LLM_MODEL_MAX_FAILURES, LLM_MODEL_COOLDOWN_SECONDS, LLM_HEDGE, LLM_HEDGE_MIN_SAMPLES,
+    ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE, ADMISSION_PER_KEY_LIMIT, OVERLOAD_MODE,
+    SESSION_SPILL, SESSION_SPILL_PATH, SESSION_REHYDRATE
+)
 from app.personas import PersonaManager
-
-# Configure Gemini once at module load
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+from app.state_store import create_state_store
+from app.session import Message, SessionRecord, TranscriptArchive
+from app.rehydration import create_rehydrator
+from app.intel_index import create_intel_index
+from app.response_cache import ResponseCache, create_response_cache
+from app.llm_router import Backend, LLMRouter
+from app.admission import AdmissionController, Overloaded
+from app.turn_coalescer import TurnCoalescer
+from app.metrics import (
+    STAGE_SECONDS, LLM_SECONDS, LLM_TIMEOUTS, LLM_HEDGED, LLM_FAILOVERS, FALLBACK_REPLIES,
+    LIVE_SESSIONS, LLM_QUEUE_DEPTH, ADMISSION_QUEUE_DEPTH, ADMISSION_IN_FLIGHT
+)
 
 class ConversationManager:
     """
     Manages the conversation state and interaction with the LLM.
     """
     
-    # In-memory storage for MVP. For production/scaling, use Redis.
-    _states = {}
-    _executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    # Pluggable backend (STATE_BACKEND): bounded in-memory LRU by default, Redis/SQLite to share across workers
+    _store = create_state_store()
+    # Messages that leave a session's window are archived here (SESSION_SPILL=sqlite) or dropped (None)
+    _archive = TranscriptArchive(SESSION_SPILL_PATH) if SESSION_SPILL == "sqlite" else None
+    _executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=LLM_POOL_SIZE, thread_name_prefix="gemini"
+    )
+    # google.generativeai takes ~1s to import and opens gRPC channels that must not exist
+    # before gunicorn forks, so it is loaded on the first Gemini call or /ready warm-up
+    _genai = None
+    _genai_lock = threading.Lock()
+    _warmup: Optional[asyncio.Future] = None
+    _models: Dict[str, Any] = {}
+    # Rolling latency/error stats per model (LLM_MODELS) for routing, failover and hedging
+    _router = LLMRouter(
+        [Backend(model_name) for model_name in LLM_MODELS],
+        hedge=LLM_HEDGE, hedge_min_samples=LLM_HEDGE_MIN_SAMPLES,
+        max_failures=LLM_MODEL_MAX_FAILURES, cooldown=LLM_MODEL_COOLDOWN_SECONDS
+    )
+    # Bounded queue and per-API-key limits in front of the pool; overload is refused fast
+    _admission = AdmissionController(ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE, ADMISSION_PER_KEY_LIMIT)
+    # One turn at a time per conversation; messages sent mid-turn share the next reply
+    _turns = TurnCoalescer()
+    # Sessions rebuilt from client-supplied history (SESSION_REHYDRATE, None when off)
+    _rehydrator = create_rehydrator()
+    # Repeated openers are answered from earlier Gemini replies (LLM_CACHE_BACKEND, None when off)
+    _cache = create_response_cache()
+    # Entities across all sessions for /intel/search (INTEL_INDEX, None when off)
+    _intel = create_intel_index()
+    # Messages (newest last, including the incoming one) that make up the cache key, with their roles
+    CACHE_HISTORY_MESSAGES = 3
+
+    @classmethod
+    def get_session(cls, conversation_id: str) -> Optional[SessionRecord]:
+        value = cls._store.get(conversation_id)
+        if value is None or isinstance(value, SessionRecord):
+            return value
+        return SessionRecord.from_dict(value)
 
     @classmethod
-    def get_state(cls, conversation_id: str) -> Dict[str, Any]:
-        return cls._states.get(conversation_id, {})
+    def save_session(cls, conversation_id: str, session: SessionRecord):
+        spill = session.take_spill()
+        if spill and cls._archive is not None:
+            cls._archive.append(conversation_id, spill)
+        cls._store.set(conversation_id, session if cls._store.keeps_objects else session.to_dict())
+
+    @classmethod
+    def resume_session(cls, conversation_id: str, history: List[Message]) -> Optional[SessionRecord]:
+        """
+        Session to continue with this turn: the stored one, or one rebuilt from the client's
+        history (prior messages as (role, text)) when there is none or SESSION_REHYDRATE=always.
+        """
+        if cls._rehydrator is None:
+            return cls.get_session(conversation_id)
+        if SESSION_REHYDRATE != "always":
+            session = cls.get_session(conversation_id)
+            if session is not None:
+                return session
+        if not history:
+            # First turn: nothing stored on this worker may leak into it
+            cls._store.delete(conversation_id)
+            return None
+        session = cls._rehydrator.rehydrate(history)
+        cls.save_session(conversation_id, session)
+        return session
+
+    @classmethod
+    def remember_turn(cls, conversation_id: str, history: List[Message]):
+        """
+        Caches the session after this turn under `history` (the previous history plus this turn's
+        message and reply), i.e. what the client will send next time.
+        """
+        if cls._rehydrator is None:
+            return
+        session = cls.get_session(conversation_id)
+        # Only when the stored session is exactly that history (not coalesced or a failed turn)
+        if session is not None and session.message_count == len(history) and session.recent() == history[-session.window:]:
+            cls._rehydrator.remember(history, session)
 
     @classmethod
-    def update_state(cls, conversation_id: str, state: Dict[str, Any]):
-        cls._states[conversation_id] = state
+    def _save_turn(cls, conversation_id: str, session: SessionRecord):
+        """Saves the turn, keeping intelligence stored by other requests while it ran."""
+        stored = cls.get_session(conversation_id)
+        if stored is not None and stored is not session:
+            session.intelligence = stored.intelligence
+        cls.save_session(conversation_id, session)
+
+    @classmethod
+    def _sdk(cls):
+        """The Gemini SDK, imported and configured on first use."""
+        if cls._genai is None:
+            with cls._genai_lock:
+                if cls._genai is None:
+                    genai = importlib.import_module("google.generativeai")
+                    if GEMINI_API_KEY:
+                        genai.configure(api_key=GEMINI_API_KEY)
+                    cls._genai = genai
+        return cls._genai
+
+    @classmethod
+    def _get_model(cls, model_name: str):
+        model = cls._models.get(model_name)
+        if model is None:
+            model = cls._models[model_name] = cls._sdk().GenerativeModel(model_name)
+        return model
+
+    @classmethod
+    def _warm(cls):
+        for backend in cls._router.backends:
+            cls._get_model(backend.model_name)
+
+    @classmethod
+    def warm_up(cls) -> bool:
+        """
+        Starts loading the SDK and the LLM_MODELS clients on the Gemini pool (first call only).
+        True once they are loaded; a failed warm-up is retried by the next call.
+        """
+        warmup = cls._warmup
+        if warmup is not None and warmup.done() and (warmup.cancelled() or warmup.exception() is not None):
+            print(f"Gemini warm-up failed, retrying: {warmup.exception() if not warmup.cancelled() else 'cancelled'}")
+            warmup = None
+        if warmup is None:
+            warmup = cls._warmup = asyncio.get_running_loop().run_in_executor(cls._executor, cls._warm)
+        return warmup.done()
 
     @classmethod
-    def _call_gemini(cls, full_prompt: str) -> str:
-        """Synchronous Gemini API call - runs in thread pool"""
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(full_prompt)
+    def _call_gemini(cls, full_prompt: str, model_name: str, timeout: float = LLM_TIMEOUT_SECONDS) -> str:
+        """Synchronous Gemini API call - runs in thread pool, so the SDK timeout is what frees the thread"""
+        response = cls._get_model(model_name).generate_content(full_prompt, request_options={"timeout": timeout})
         return response.text.strip()
 
     @classmethod
-    def generate_response(cls, conversation_id: str, user_message: str, scam_type: str) -> str:
-        state = cls.get_state(conversation_id)
-        
-        # Validate state integrity
-        if not state or "history" not in state or "persona" not in state:
-            persona = PersonaManager.get_persona(scam_type)
-            if not state:
-                state = {}
-            
-            if "scam_type" not in state:
-                state["scam_type"] = scam_type
-            if "persona" not in state:
-                state["persona"] = persona
-            if "history" not in state:
-                state["history"] = []
+    def _stream_gemini(cls, full_prompt: str, model_name: str, timeout: float = LLM_TIMEOUT_SECONDS) -> Iterator[str]:
+        """Synchronous streaming Gemini call - each next() runs in thread pool"""
+        response = cls._get_model(model_name).generate_content(
+            full_prompt, stream=True, request_options={"timeout": timeout}
+        )
+        for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+    @classmethod
+    def _record_llm(cls, backend: Backend, started: float, outcome: str):
+        """Feeds one Gemini attempt into the router stats and the metrics."""
+        elapsed = time.perf_counter() - started
+        if outcome == "ok":
+            cls._router.record_success(backend, elapsed)
+        elif outcome == "error":
+            cls._router.record_failure(backend)
+        elif outcome == "timeout":
+            cls._router.record_failure(backend)
+            cls._router.record_cancelled(backend, elapsed)
+            LLM_TIMEOUTS.inc(provider="gemini", model=backend.model_name)
+        else:  # cancelled: lost a hedge race
+            cls._router.record_cancelled(backend, elapsed)
+        LLM_SECONDS.observe(elapsed, provider="gemini", model=backend.model_name, outcome=outcome)
+
+    @classmethod
+    async def _attempt_gemini(cls, backend: Backend, full_prompt: str, deadline: float,
+                              client_id: str, admitted: bool = False) -> str:
+        """
+        One Gemini call in the thread pool, bounded by the request deadline. Takes an admission
+        slot first unless `admitted` (already taken); the slot is held until the pool task ends.
+        """
+        loop = asyncio.get_running_loop()
+        if not admitted:
+            await cls._admission.acquire(client_id, deadline)
+        started = time.perf_counter()
+        remaining = max(deadline - loop.time(), 0)
+        try:
+            task = cls._executor.submit(cls._call_gemini, full_prompt, backend.model_name, max(remaining, 0.001))
+        except BaseException:
+            cls._admission.release_after(client_id, None, started)
+            raise
+        cls._admission.release_after(client_id, task, started)
+        try:
+            reply_text = await asyncio.wait_for(asyncio.wrap_future(task), timeout=remaining)
+        except asyncio.TimeoutError:
+            cls._record_llm(backend, started, "timeout")
+            raise
+        except asyncio.CancelledError:
+            # The SDK call cannot be interrupted; its thread finishes and the result is dropped
+            cls._record_llm(backend, started, "cancelled")
+            raise
+        except Exception:
+            cls._record_llm(backend, started, "error")
+            raise
+        cls._record_llm(backend, started, "ok")
+        return reply_text
+
+    @classmethod
+    async def _hedged_gemini(cls, backend: Backend, spare: List[Backend], tried: List[Backend],
+                             full_prompt: str, deadline: float, client_id: str) -> str:
+        """
+        Calls backend; if it is still running after its p95 latency, sends the same prompt
+        to the next model (or the same one again) and returns whichever answers first.
+        The hedge needs an admission slot of its own and is skipped when none is free.
+        """
+        def attempt(target: Backend, admitted: bool = False) -> asyncio.Future:
+            tried.append(target)
+            return asyncio.ensure_future(cls._attempt_gemini(target, full_prompt, deadline, client_id, admitted))
+
+        pending = {attempt(backend)}
+        try:
+            delay = cls._router.hedge_delay(backend)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and cls._admission.try_acquire(client_id):
+                    hedge = spare[0] if spare else backend
+                    LLM_HEDGED.inc(model=hedge.model_name)
+                    pending.add(attempt(hedge, admitted=True))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @classmethod
+    async def _call_gemini_async(cls, full_prompt: str, deadline: float, client_id: str = "anonymous") -> str:
+        """
+        Runs the blocking SDK call off the event loop and enforces the deadline (loop time).
+        Models are tried fastest first; an error fails over to the next one, the deadline covers all attempts.
+        Each attempt is admitted separately (Overloaded when refused).
+        """
+        models = cls._router.ranked()
+        tried: List[Backend] = []
+        last_error = None
+        for backend in models:
+            if backend in tried:
+                continue
+            if last_error is not None:
+                print(f"Gemini failover to {backend.model_name} after {type(last_error).__name__}: {last_error}")
+                LLM_FAILOVERS.inc(model=backend.model_name)
+            spare = [other for other in models if other is not backend and other not in tried]
+            try:
+                return await cls._hedged_gemini(backend, spare, tried, full_prompt, deadline, client_id)
+            except (asyncio.TimeoutError, Overloaded):
+                raise
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    @classmethod
+    def _prepare_turn(cls, conversation_id: str, user_messages: List[str], scam_type: str) -> Tuple[SessionRecord, str, str]:
+        """Records the incoming message(s) and builds the full prompt and response cache key for this turn."""
+        with STAGE_SECONDS.time(stage="prompt_build"):
+            return cls._build_prompt(conversation_id, user_messages, scam_type)
+
+    @classmethod
+    def _build_prompt(cls, conversation_id: str, user_messages: List[str], scam_type: str) -> Tuple[SessionRecord, str, str]:
+        session = cls.get_session(conversation_id)
+        if session is None:
+            with STAGE_SECONDS.time(stage="persona_selection"):
+                session = SessionRecord(scam_type, PersonaManager.get_persona_key(scam_type))
         
-        state["history"].append({"role": "user", "parts": [user_message]})
-        recent_history = state["history"][-10:]
+        for user_message in user_messages:
+            session.add("user", user_message)
+        recent_history = session.recent()
         
         # --- STRATEGY ENGINE ---
-        turn_count = len([m for m in state["history"] if m["role"] == "user"])
+        turn_count = session.turn_count
         
         current_phase = "TRUST_BUILDING"
         phase_instruction = ""
@@ -69,7 +311,7 @@ class ConversationManager:
             current_phase = "DEEP_EXTRACTION"
             phase_instruction = "PHASE 3 (DEEP EXTRACT): Claim the previous method failed. Ask for a different Phone Number or URL. wasting their time."
 
-        persona_prompt = state["persona"]["prompt"]
+        persona_prompt = session.persona["prompt"]
         system_instruction = f"""
         {persona_prompt}
         
@@ -81,30 +323,204 @@ class ConversationManager:
         Keep the response short (1-2 sentences).
         """
 
+        full_prompt = f"{system_instruction}\n\nCONVERSATION SO FAR:\n"
+        for role, text in recent_history:
+            role = "Scammer" if role == "user" else "You"
+            full_prompt += f"{role}: {text}\n"
+        full_prompt += "You: "
+
+        # Same prompt fields except the window's older messages: the last few decide the reply,
+        # and keying on the whole window would stop replies being reused across sessions
+        cache_key = ResponseCache.make_key(
+            session.persona["name"], current_phase, turn_count,
+            recent_history[-cls.CACHE_HISTORY_MESSAGES:]
+        )
+        return session, full_prompt, cache_key
+
+    @classmethod
+    def _degraded_reply(cls, session: SessionRecord, error: Overloaded) -> str:
+        """Rule-based persona reply for a turn refused an LLM slot; re-raises when OVERLOAD_MODE=reject."""
+        if OVERLOAD_MODE == "reject":
+            raise error
+        FALLBACK_REPLIES.inc(reason="overloaded")
+        return PersonaManager.get_stall_reply(session.scam_type, session.turn_count)
+
+    @classmethod
+    async def generate_response(cls, conversation_id: str, user_message: str, scam_type: str,
+                                client_id: str = "anonymous") -> str:
+        """
+        Agent reply for this turn. client_id (the caller's API key) is used for per-key admission limits;
+        Overloaded is raised only when OVERLOAD_MODE=reject.
+        Messages for the same conversation that arrive while a reply is being generated are answered
+        together by one reply.
+        """
+        async with cls._turns.turn(conversation_id, user_message) as turn:
+            if turn.answered:
+                return turn.reply
+            reply_text = await cls._respond(conversation_id, turn.items, scam_type, client_id)
+            turn.resolve(reply_text)
+            return reply_text
+
+    @classmethod
+    async def _respond(cls, conversation_id: str, user_messages: List[str], scam_type: str, client_id: str) -> str:
+        session, full_prompt, cache_key = cls._prepare_turn(conversation_id, user_messages, scam_type)
+
         try:
             if not GEMINI_API_KEY:
+                FALLBACK_REPLIES.inc(reason="no_api_key")
                 return "System Error: Gemini API Key not configured."
 
-            full_prompt = f"{system_instruction}\n\nCONVERSATION SO FAR:\n"
-            for msg in recent_history:
-                role = "Scammer" if msg["role"] == "user" else "You"
-                text = msg["parts"][0]
-                full_prompt += f"{role}: {text}\n"
-            full_prompt += "You: "
-
-            # Use thread pool with timeout to avoid hanging
-            future = cls._executor.submit(cls._call_gemini, full_prompt)
-            try:
-                reply_text = future.result(timeout=15)  # 15 second timeout
-            except concurrent.futures.TimeoutError:
-                print("Gemini API call timed out after 15 seconds")
-                return "Sorry, I'm having connection issues. Can you repeat that?"
+            reply_text = cls._cache.get(cache_key) if cls._cache is not None else None
+            if reply_text is None:
+                # Await the call so other sessions keep being served while Gemini thinks.
+                # Time spent queueing for a slot counts against the same deadline.
+                deadline = asyncio.get_running_loop().time() + LLM_TIMEOUT_SECONDS
+                try:
+                    with STAGE_SECONDS.time(stage="llm"):
+                        reply_text = await cls._call_gemini_async(full_prompt, deadline, client_id)
+                except asyncio.TimeoutError:
+                    print(f"Gemini API call timed out after {LLM_TIMEOUT_SECONDS:g} seconds")
+                    FALLBACK_REPLIES.inc(reason="timeout")
+                    return "Sorry, I'm having connection issues. Can you repeat that?"
+                except Overloaded as e:
+                    reply_text = cls._degraded_reply(session, e)
+                else:
+                    if cls._cache is not None and reply_text:
+                        cls._cache.put(cache_key, reply_text)
             
-            state["history"].append({"role": "model", "parts": [reply_text]})
-            cls.update_state(conversation_id, state)
+            with STAGE_SECONDS.time(stage="state_update"):
+                session.add("model", reply_text)
+                cls._save_turn(conversation_id, session)
             
             return reply_text
-            
+
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Gemini API Error: {type(e).__name__}: {str(e)}")
+            FALLBACK_REPLIES.inc(reason="error")
             return "I am having some network trouble, please wait."
+
+    @classmethod
+    async def stream_response(cls, conversation_id: str, user_message: str, scam_type: str,
+                              client_id: str = "anonymous") -> AsyncIterator[str]:
+        """
+        Same as generate_response, but yields the reply in pieces as Gemini produces them.
+        The LLM timeout covers the whole stream; on failure the usual fallback text is sent.
+        With OVERLOAD_MODE=reject, Overloaded is raised before the first chunk.
+        """
+        async with cls._turns.turn(conversation_id, user_message) as turn:
+            if turn.answered:
+                yield turn.reply
+                return
+            parts: List[str] = []
+            async for chunk in cls._stream_turn(conversation_id, turn.items, scam_type, client_id):
+                parts.append(chunk)
+                yield chunk
+            turn.resolve("".join(parts).strip())
+
+    @classmethod
+    async def _stream_turn(cls, conversation_id: str, user_messages: List[str], scam_type: str,
+                           client_id: str) -> AsyncIterator[str]:
+        session, full_prompt, cache_key = cls._prepare_turn(conversation_id, user_messages, scam_type)
+
+        if not GEMINI_API_KEY:
+            FALLBACK_REPLIES.inc(reason="no_api_key")
+            yield "System Error: Gemini API Key not configured."
+            return
+
+        cached = cls._cache.get(cache_key) if cls._cache is not None else None
+        if cached is not None:
+            session.add("model", cached)
+            cls._save_turn(conversation_id, session)
+            yield cached
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LLM_TIMEOUT_SECONDS
+        parts: List[str] = []
+        models = cls._router.ranked()
+
+        try:
+            await cls._admission.acquire(client_id, deadline)
+            # The stream's pool tasks (one per chunk) run one at a time under this slot; it is
+            # given back when the last of them has finished, even if we stopped waiting for it
+            admitted = time.perf_counter()
+            task: Optional[concurrent.futures.Future] = None
+            try:
+                # Fail over to the next model only while nothing has been sent yet; streams are not hedged
+                for index, backend in enumerate(models):
+                    if index:
+                        LLM_FAILOVERS.inc(model=backend.model_name)
+                    started = time.perf_counter()
+                    try:
+                        chunks = cls._stream_gemini(
+                            full_prompt, backend.model_name, max(deadline - loop.time(), 0.001)
+                        )
+                        while True:
+                            task = cls._executor.submit(next, chunks, None)
+                            chunk = await asyncio.wait_for(
+                                asyncio.wrap_future(task), timeout=max(deadline - loop.time(), 0)
+                            )
+                            if chunk is None:
+                                break
+                            if not parts:
+                                chunk = chunk.lstrip()
+                            parts.append(chunk)
+                            yield chunk
+                    except asyncio.TimeoutError:
+                        cls._record_llm(backend, started, "timeout")
+                        raise
+                    except Exception:
+                        cls._record_llm(backend, started, "error")
+                        if parts or index == len(models) - 1:
+                            raise
+                        continue
+                    cls._record_llm(backend, started, "ok")
+                    break
+            finally:
+                cls._admission.release_after(client_id, task, admitted)
+
+        except Overloaded as e:
+            reply_text = cls._degraded_reply(session, e)
+            session.add("model", reply_text)
+            cls._save_turn(conversation_id, session)
+            yield reply_text
+            return
+
+        except asyncio.TimeoutError:
+            print(f"Gemini API stream timed out after {LLM_TIMEOUT_SECONDS:g} seconds")
+            cls._save_broken_turn(conversation_id, session, parts)
+            if not parts:
+                FALLBACK_REPLIES.inc(reason="timeout")
+                yield "Sorry, I'm having connection issues. Can you repeat that?"
+            return
+
+        except Exception as e:
+            print(f"Gemini API Error: {type(e).__name__}: {str(e)}")
+            cls._save_broken_turn(conversation_id, session, parts)
+            if not parts:
+                FALLBACK_REPLIES.inc(reason="error")
+                yield "I am having some network trouble, please wait."
+            return
+
+        reply_text = "".join(parts).strip()
+        if cls._cache is not None and reply_text:
+            cls._cache.put(cache_key, reply_text)
+        session.add("model", reply_text)
+        cls._save_turn(conversation_id, session)
+
+    @classmethod
+    def _save_broken_turn(cls, conversation_id: str, session: SessionRecord, parts: List[str]):
+        """Saves a turn whose stream failed: the scammer's message(s) and whatever of the reply was sent."""
+        reply_text = "".join(parts).strip()
+        if reply_text:
+            session.add("model", reply_text)
+        cls._save_turn(conversation_id, session)
+
+
+# Sampled on each /metrics scrape
+LIVE_SESSIONS.set_function(lambda: len(ConversationManager._store))
+LLM_QUEUE_DEPTH.set_function(lambda: ConversationManager._executor._work_queue.qsize())
+ADMISSION_QUEUE_DEPTH.set_function(lambda: ConversationManager._admission.queue_depth)
+ADMISSION_IN_FLIGHT.set_function(lambda: ConversationManager._admission.in_flight)
@@ -8,3 +8,67 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     # Warning instead of error to allow app to start for testing other parts
     print("WARNING: GEMINI_API_KEY is not set in environment variables.")
+
+# Thread pool used for the blocking Gemini SDK calls. Each in-flight
+# conversation holds one worker while it waits on the network, so this caps
+# how many LLM calls a single uvicorn worker can have outstanding.
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "256"))
+
+# Per-call deadline for the LLM, enforced on the event loop.
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "15"))
+
+# Gemini models to route between, comma separated. Each call goes to the model
+# with the lowest rolling latency/error rate and fails over to the next on error.
+LLM_MODELS = [m.strip() for m in os.getenv("LLM_MODELS", "gemini-2.0-flash").split(",") if m.strip()]
+# A model failing this many calls in a row is benched for the cooldown.
+LLM_MODEL_MAX_FAILURES = int(os.getenv("LLM_MODEL_MAX_FAILURES", "3"))
+LLM_MODEL_COOLDOWN_SECONDS = float(os.getenv("LLM_MODEL_COOLDOWN_SECONDS", "30"))
+# Hedging: when a call runs past its model's p95 latency, send the same prompt to the
+# next model too and keep whichever answers first (costs ~5% extra calls).
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Admission control in front of the LLM pool: at most ADMISSION_MAX_IN_FLIGHT calls
+# run and ADMISSION_MAX_QUEUE wait; beyond that (or when the expected wait would
+# eat the LLM_TIMEOUT_SECONDS deadline) requests are refused immediately.
+# ADMISSION_PER_KEY_LIMIT caps running + waiting calls per API key (0 = no cap).
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", str(LLM_POOL_SIZE)))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "256"))
+ADMISSION_PER_KEY_LIMIT = int(os.getenv("ADMISSION_PER_KEY_LIMIT", "64"))
+# Refused requests get a rule-based persona reply ("degrade") or HTTP 429 ("reject").
+OVERLOAD_MODE = os.getenv("OVERLOAD_MODE", "degrade").lower()
+
+# Conversation state backend: "memory" (per process), "redis" (shared by all
+# workers/nodes) or "sqlite" (survives restarts, shared on one machine).
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+STATE_TTL_SECONDS = float(os.getenv("STATE_TTL_SECONDS", "86400"))
+STATE_MAX_SESSIONS = int(os.getenv("STATE_MAX_SESSIONS", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+STATE_SQLITE_PATH = os.getenv("STATE_SQLITE_PATH", "honeypot_state.db")
+# Messages kept per session (the prompt window). Older ones are dropped, or archived
+# to SQLite at SESSION_SPILL_PATH when SESSION_SPILL=sqlite.
+SESSION_WINDOW = int(os.getenv("SESSION_WINDOW", "10"))
+SESSION_SPILL = os.getenv("SESSION_SPILL", "off").lower()
+SESSION_SPILL_PATH = os.getenv("SESSION_SPILL_PATH", "honeypot_transcripts.db")
+# Rebuilding sessions from the conversationHistory the hackathon endpoint receives:
+# "missing" when this worker has no state for the session (a restart, or earlier turns
+# served by another worker), "always" to ignore server state entirely (stateless workers,
+# no sticky sessions needed) or "off". Rebuilt sessions are cached per worker by history hash.
+SESSION_REHYDRATE = os.getenv("SESSION_REHYDRATE", "missing").lower()
+REHYDRATE_CACHE_MAX_ENTRIES = int(os.getenv("REHYDRATE_CACHE_MAX_ENTRIES", "10000"))
+REHYDRATE_CACHE_TTL_SECONDS = float(os.getenv("REHYDRATE_CACHE_TTL_SECONDS", "3600"))
+
+# LLM reply cache: repeated scam openers reuse earlier replies instead of a new
+# Gemini call. "memory", "sqlite" (persistent), "redis" (shared) or "off".
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+LLM_CACHE_VARIANTS = int(os.getenv("LLM_CACHE_VARIANTS", "3"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH", "honeypot_llm_cache.db")
+
+# Cross-session index of extracted UPI IDs, accounts, phones and URLs behind
+# GET /intel/search ("on" or "off"). Per worker process; when INTEL_INDEX_PATH is
+# set it is loaded from that JSON file at startup, and on shutdown every worker
+# merges its part back into it.
+INTEL_INDEX = os.getenv("INTEL_INDEX", "on").lower()
+INTEL_INDEX_PATH = os.getenv("INTEL_INDEX_PATH", "")
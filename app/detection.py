@@ -1,5 +1,5 @@
-import re
 from typing import Tuple, Optional
+from app.matcher import MultiPatternMatcher
 
 class ScamDetector:
     """
@@ -31,6 +31,22 @@ class ScamDetector:
         ]
     }
 
+    _matcher = None
+
+    @classmethod
+    def _get_matcher(cls) -> MultiPatternMatcher:
+        """Compiles every keyword list into one matcher, once per process."""
+        if cls._matcher is None:
+            keywords, patterns = [], {}
+            for scam_type, type_patterns in cls.SCAM_KEYWORDS.items():
+                for i, pattern in enumerate(type_patterns):
+                    if any(char in pattern for char in ".^$*+?{}[]\\|()"):
+                        patterns[f"{scam_type}:{i}"] = pattern
+                    else:
+                        keywords.append(pattern)  # plain text: matched via the keyword trie
+            cls._matcher = MultiPatternMatcher(keywords, patterns)
+        return cls._matcher
+
     @classmethod
     def analyze(cls, message: str) -> Tuple[bool, Optional[str], float]:
         """
@@ -41,10 +57,13 @@ class ScamDetector:
         
         detected_types = {}
         
+        # One pass over the message finds every keyword of every scam type
+        keywords_found, patterns_found = cls._get_matcher().scan(message_lower)
+        
         for scam_type, patterns in cls.SCAM_KEYWORDS.items():
             count = 0
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
+            for i, pattern in enumerate(patterns):
+                if pattern in keywords_found or f"{scam_type}:{i}" in patterns_found:
                     count += 1
             if count > 0:
                 detected_types[scam_type] = count
@@ -19,6 +19,9 @@ class IntelligenceExtractor:
         "url": r"https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+[^\s]*"
     }
 
+    # Compiled once at import (shared by preforked workers)
+    _COMPILED = {key: re.compile(pattern) for key, pattern in PATTERNS.items()}
+
     @classmethod
     def extract(cls, message: str, current_data: IntelligenceData) -> IntelligenceData:
         """
@@ -31,8 +34,8 @@ class IntelligenceExtractor:
 
         extracted = current_data.dict()
         
-        for key, pattern in cls.PATTERNS.items():
-            match = re.search(pattern, message)
+        for key, pattern in cls._COMPILED.items():
+            match = pattern.search(message)
             if match:
                 value = match.group(0)
                 # Simple heuristic: if we found something and it's not already stored
@@ -0,0 +1,264 @@
+import os
+import re
+import sys
+import json
+import time
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from app.config import INTEL_INDEX, INTEL_INDEX_PATH
+
+try:
+    import fcntl
+except ImportError:  # Windows: single worker only
+    fcntl = None
+
+KINDS = ("upi", "account", "phone", "url")
+
+# IntelligenceData field -> index kind
+INTELLIGENCE_KINDS = {"upi_id": "upi", "bank_account": "account", "phone_number": "phone", "url": "url"}
+
+_NON_DIGITS = re.compile(r"\D")
+_URL_PREFIX = re.compile(r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?")
+
+
+def normalize(kind: str, value: str) -> Optional[str]:
+    """
+    Canonical spelling of an entity: UPI IDs and URLs lowercased (URLs without scheme,
+    "www." and trailing slash), accounts as digits, phones as their last 10 digits.
+    None when nothing is left to index.
+    """
+    value = value.strip()
+    if kind == "upi":
+        value = value.lower()
+    elif kind == "account":
+        value = _NON_DIGITS.sub("", value)
+    elif kind == "phone":
+        value = _NON_DIGITS.sub("", value)[-10:]
+    elif kind == "url":
+        value = _URL_PREFIX.sub("", value.lower()).rstrip("/")
+    else:
+        raise ValueError(f"Unknown entity kind: {kind}")
+    return value or None
+
+
+class IntelIndex:
+    """
+    Inverted index from normalized entities to the sessions they appeared in; a lookup
+    is one dict probe. Session IDs and personas are interned to small integers, each
+    entity's sessions are an array('I') posting list and its first/last-seen times sit
+    in array('d') columns, so the index stays small as sessions accumulate. Re-adding
+    an entity a session already has only moves its last-seen time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # "kind:value" -> entity number, and the columns indexed by it
+        self._keys: Dict[str, int] = {}
+        self._postings: List[array] = []
+        self._first_seen = array("d")
+        self._last_seen = array("d")
+        # Session number -> ID, persona number and entity numbers (for deduplication)
+        self._sessions: Dict[str, int] = {}
+        self._session_ids: List[str] = []
+        self._session_personas = array("H")
+        self._session_entities: List[array] = []
+        # Persona number -> name; 0 is "unknown"
+        self._personas: Dict[str, int] = {"unknown": 0}
+        self._persona_names: List[str] = ["unknown"]
+
+    def add(self, session_id: str, entities: Iterable[Tuple[str, str]],
+            persona: Optional[str] = None, ts: Optional[float] = None):
+        """Records (kind, value) pairs seen in a session, at `ts` (default now)."""
+        keys = []
+        for kind, value in entities:
+            normalized = normalize(kind, value)
+            if normalized is not None:
+                keys.append(f"{kind}:{normalized}")
+        if not keys:
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            session = self._session_number(session_id, persona)
+            seen = self._session_entities[session]
+            for key in keys:
+                number = self._keys.get(key)
+                if number is None:
+                    number = self._keys[sys.intern(key)] = len(self._postings)
+                    self._postings.append(array("I"))
+                    self._first_seen.append(ts)
+                    self._last_seen.append(ts)
+                else:
+                    self._first_seen[number] = min(self._first_seen[number], ts)
+                    self._last_seen[number] = max(self._last_seen[number], ts)
+                if number not in seen:
+                    seen.append(number)
+                    self._postings[number].append(session)
+
+    @staticmethod
+    def entities(intelligence: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+        """(kind, value) pairs of the indexed fields of an IntelligenceData dict."""
+        for field, kind in INTELLIGENCE_KINDS.items():
+            if intelligence.get(field):
+                yield kind, str(intelligence[field])
+
+    def _session_number(self, session_id: str, persona: Optional[str]) -> int:
+        # Caller holds the lock
+        number = self._sessions.get(session_id)
+        persona_number = 0
+        if persona:
+            persona_number = self._personas.get(persona)
+            if persona_number is None:
+                persona_number = self._personas[sys.intern(persona)] = len(self._persona_names)
+                self._persona_names.append(persona)
+        if number is None:
+            number = self._sessions[sys.intern(session_id)] = len(self._session_ids)
+            self._session_ids.append(session_id)
+            self._session_personas.append(persona_number)
+            self._session_entities.append(array("I"))
+        elif persona_number and not self._session_personas[number]:
+            self._session_personas[number] = persona_number
+        return number
+
+    def lookup(self, kind: str, value: str, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """Session count, first/last seen, sessions per persona and the `limit` latest session IDs."""
+        normalized = normalize(kind, value)
+        if normalized is None:
+            return None
+        with self._lock:
+            number = self._keys.get(f"{kind}:{normalized}")
+            if number is None:
+                return None
+            postings = self._postings[number]
+            personas: Dict[str, int] = {}
+            for session in postings:
+                name = self._persona_names[self._session_personas[session]]
+                personas[name] = personas.get(name, 0) + 1
+            return {
+                "kind": kind,
+                "value": normalized,
+                "sessions": len(postings),
+                "first_seen": self._first_seen[number],
+                "last_seen": self._last_seen[number],
+                "personas": personas,
+                "session_ids": [self._session_ids[s] for s in postings[-limit:]] if limit > 0 else [],
+            }
+
+    def search(self, value: str, kind: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Lookups of `value` as `kind`, or as every kind (one probe each) when kind is None."""
+        results = []
+        for candidate in ((kind,) if kind else KINDS):
+            result = self.lookup(candidate, value, limit)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entities": len(self._postings),
+                "sessions": len(self._session_ids),
+                "postings": sum(len(postings) for postings in self._postings),
+            }
+
+    def merge(self, other: "IntelIndex"):
+        """Adds everything `other` has seen; merging the same index again changes nothing."""
+        with other._lock:
+            entities = [
+                (key, other._first_seen[number], other._last_seen[number],
+                 [(other._session_ids[s], other._persona_names[other._session_personas[s]])
+                  for s in other._postings[number]])
+                for key, number in other._keys.items()
+            ]
+        with self._lock:
+            for key, first_seen, last_seen, sessions in entities:
+                number = self._keys.get(key)
+                if number is None:
+                    number = self._keys[sys.intern(key)] = len(self._postings)
+                    self._postings.append(array("I"))
+                    self._first_seen.append(first_seen)
+                    self._last_seen.append(last_seen)
+                else:
+                    self._first_seen[number] = min(self._first_seen[number], first_seen)
+                    self._last_seen[number] = max(self._last_seen[number], last_seen)
+                for session_id, persona in sessions:
+                    session = self._session_number(session_id, persona if persona != "unknown" else None)
+                    seen = self._session_entities[session]
+                    if number not in seen:
+                        seen.append(number)
+                        self._postings[number].append(session)
+
+    def save(self, path: str):
+        """
+        Merges the index into the JSON file at `path`. Every gunicorn worker saves its own
+        part on shutdown, so the file is read, merged and rewritten (atomically) under an
+        exclusive lock instead of being overwritten by whichever worker exits last.
+        """
+        with _locked(f"{path}.lock"):
+            merged = IntelIndex.load(path) if os.path.exists(path) else IntelIndex()
+            merged.merge(self)
+            merged._write(path)
+
+    def _write(self, path: str):
+        """Writes the index as JSON, atomically (a temporary file is renamed over `path`)."""
+        with self._lock:
+            data = {
+                "sessions": self._session_ids,
+                "session_personas": self._session_personas.tolist(),
+                "personas": self._persona_names,
+                "entities": [
+                    [key, self._first_seen[number], self._last_seen[number], self._postings[number].tolist()]
+                    for key, number in self._keys.items()
+                ],
+            }
+            temporary = f"{path}.tmp{os.getpid()}"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IntelIndex":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls()
+        index._persona_names = data["personas"]
+        index._personas = {sys.intern(name): number for number, name in enumerate(index._persona_names)}
+        index._session_ids = data["sessions"]
+        index._sessions = {sys.intern(sid): number for number, sid in enumerate(index._session_ids)}
+        index._session_personas = array("H", data["session_personas"])
+        index._session_entities = [array("I") for _ in index._session_ids]
+        for number, (key, first_seen, last_seen, postings) in enumerate(data["entities"]):
+            index._keys[sys.intern(key)] = number
+            index._first_seen.append(first_seen)
+            index._last_seen.append(last_seen)
+            index._postings.append(array("I", postings))
+            for session in postings:
+                index._session_entities[session].append(number)
+        return index
+
+
+@contextmanager
+def _locked(path: str):
+    """Exclusive lock on `path` across processes (no-op without fcntl)."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def create_intel_index() -> Optional[IntelIndex]:
+    """Builds the index selected by INTEL_INDEX, loading INTEL_INDEX_PATH if it exists."""
+    if INTEL_INDEX == "off":
+        return None
+    if INTEL_INDEX != "on":
+        raise ValueError(f"Unsupported INTEL_INDEX: {INTEL_INDEX}")
+    if INTEL_INDEX_PATH and os.path.exists(INTEL_INDEX_PATH):
+        index = IntelIndex.load(INTEL_INDEX_PATH)
+        print(f"Loaded intelligence index from {INTEL_INDEX_PATH}: {index.stats()}")
+        return index
+    return IntelIndex()
@@ -0,0 +1,165 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+
+MAX_PREFIXES = 64
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Build a regex that matches the longest of `words` starting at a position.
+
+    Words sharing a prefix share a branch ("computer|computer problem" becomes
+    "computer(?: problem)?"), so the engine tests each character once instead of
+    once per word.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A word ends here; longer words are optional (greedy, so longest wins)
+            if len(branches) == 1:
+                body = "(?:" + body + ")"
+            body += "?"
+        return body
+
+    return build(trie)
+
+
+def _prefixes(items: List[Tuple], limit: int) -> Tuple[Set[str], bool]:
+    """
+    Literal strings every match of the parsed items must start with.
+
+    Returns (prefixes, complete) where complete means the items are fully
+    literal, so whatever follows them can extend the prefixes further.
+    """
+    result = {""}
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            alternatives, complete = {chr(av)}, True
+        elif op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            alternatives, complete = _prefixes(av[3].data, limit)
+        elif op is sre_parse.BRANCH:
+            alternatives, complete = set(), True
+            for branch in av[1]:
+                branch_prefixes, branch_complete = _prefixes(branch.data, limit)
+                alternatives |= branch_prefixes
+                complete = complete and branch_complete
+        else:
+            return result, False
+
+        extended = {prefix + alt for prefix in result for alt in alternatives}
+        if len(extended) > limit:
+            return result, False
+        result = extended
+        if not complete:
+            return result, False
+    return result, True
+
+
+def literal_prefixes(pattern: str) -> Tuple[Optional[FrozenSet[str]], bool]:
+    """
+    Literal strings that every match of `pattern` starts with, e.g.
+    "(virus|malware) detected" -> {"virus detected", "malware detected"}.
+
+    Returns:
+        (prefixes, exact). prefixes is None when the pattern can start with
+        arbitrary text and must always be checked; exact means the pattern is
+        nothing but those literals, so finding one of them is a match.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None, False
+    if parsed.state.flags & (re.IGNORECASE | re.VERBOSE):
+        return None, False
+    prefixes, complete = _prefixes(list(parsed.data), MAX_PREFIXES)
+    if "" in prefixes:
+        return None, False
+    return frozenset(prefixes), complete
+
+
+class MultiPatternMatcher:
+    """
+    Precompiled matcher for a fixed set of substring keywords and named regexes.
+
+    `scan` reports exactly what `keyword in text` and `re.search(pattern, text)`
+    would report for each entry. One trie regex walks the text once and collects
+    every keyword together with the literal prefixes of the patterns; a pattern
+    is only run (with its own precompiled regex) when one of its prefixes occurred,
+    and purely literal patterns need no regex run at all.
+    """
+
+    def __init__(self, keywords: Iterable[str], patterns: Optional[Dict[str, str]] = None):
+        self.keywords = frozenset(keywords)
+        self.patterns = dict(patterns or {})
+
+        self._compiled = {name: re.compile(pattern) for name, pattern in self.patterns.items()}
+        self._prefixes: Dict[str, Optional[FrozenSet[str]]] = {}
+        self._exact: Set[str] = set()
+        for name, pattern in self.patterns.items():
+            self._prefixes[name], exact = literal_prefixes(pattern)
+            if exact:
+                self._exact.add(name)
+
+        literals = set(self.keywords)
+        for prefixes in self._prefixes.values():
+            literals.update(prefixes or ())
+
+        # Literals contained in another literal: finding the longer one at a
+        # position implies the shorter ones are present too.
+        self._implied: Dict[str, Tuple[str, ...]] = {
+            outer: tuple(inner for inner in literals if inner != outer and inner in outer)
+            for outer in literals
+        }
+        # The trie only pays off when it also collects pattern prefixes: for plain
+        # keywords CPython's substring search (a C loop per keyword) is faster
+        # than stepping the regex engine through every position.
+        self._literal_regex = re.compile(_trie_regex(literals)) if self.patterns and literals else None
+
+    def scan(self, text: str) -> Tuple[Set[str], Set[str]]:
+        """
+        Find everything present in text
+
+        Returns:
+            (keywords found, pattern names found)
+        """
+        if self._literal_regex is None:
+            keywords_found = {keyword for keyword in self.keywords if keyword in text}
+            return keywords_found, {name for name, compiled in self._compiled.items() if compiled.search(text)}
+
+        seen: Set[str] = set()
+        search = self._literal_regex.search
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            literal = match.group()
+            if literal not in seen:
+                seen.add(literal)
+                seen.update(self._implied[literal])
+            # Resume one character later so overlapping literals are not skipped
+            pos = match.start() + 1
+
+        patterns_found = set()
+        for name, prefixes in self._prefixes.items():
+            if prefixes is not None and prefixes.isdisjoint(seen):
+                continue
+            if name in self._exact or self._compiled[name].search(text):
+                patterns_found.add(name)
+        return seen & self.keywords, patterns_found
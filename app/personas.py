@@ -106,7 +106,52 @@ You ask simple questions to understand what the other person wants.
         }
     }
 
+    # In-character stalling lines sent without an LLM call when the server is overloaded
+    STALL_REPLIES = {
+        "tech_support": [
+            "Beta, one minute, my phone is hanging. What should I do next?",
+            "Wait, wait, I am writing it down. Can you tell me again slowly?",
+            "Rahul is not home to help me. Which button should I press?",
+        ],
+        "financial": [
+            "Hold on, I have a customer at the counter. Give me two minutes.",
+            "One second, I am opening my bank app. Which account is this for?",
+            "The network in the shop is bad. Can you send the details again?",
+        ],
+        "lottery": [
+            "OMG wait, I am telling my friend! What do I do next??",
+            "Sorry my net is so slow 😭 can you send that again?",
+            "Hold on, I am checking my account balance. Where do I send it?",
+        ],
+        "job": [
+            "Sorry sir, I am filling the form. What is the next step?",
+            "One minute sir, my phone battery is low. Can you repeat the details?",
+            "Thank you sir, I am ready. Where should I send my documents?",
+        ],
+        "romance": [
+            "Sorry dear, the power went out here. Are you still there?",
+            "I was just thinking about you. Tell me again what you need?",
+            "Give me a moment, I am making tea. Where did you say to send it?",
+        ],
+        "default": [
+            "Sorry, I missed that. Can you explain again?",
+            "One moment please, I am checking. Who did you say this is?",
+            "My network is weak here. Can you send that message again?",
+        ],
+    }
+
     @classmethod
     def get_persona(cls, scam_type: str) -> Dict[str, str]:
         """Returns the persona configuration for the given scam type."""
-        return cls.PERSONAS.get(scam_type, cls.PERSONAS["default"])
+        return cls.PERSONAS[cls.get_persona_key(scam_type)]
+
+    @classmethod
+    def get_persona_key(cls, scam_type: str) -> str:
+        """Key into PERSONAS for the given scam type."""
+        return scam_type if scam_type in cls.PERSONAS else "default"
+
+    @classmethod
+    def get_stall_reply(cls, scam_type: str, turn_count: int) -> str:
+        """Rule-based reply for the given scam type, rotated by turn so it does not repeat."""
+        replies = cls.STALL_REPLIES.get(scam_type, cls.STALL_REPLIES["default"])
+        return replies[turn_count % len(replies)]
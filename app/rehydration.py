@@ -0,0 +1,108 @@
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional
+
+from app.config import SESSION_REHYDRATE, REHYDRATE_CACHE_MAX_ENTRIES, REHYDRATE_CACHE_TTL_SECONDS
+from app.detection import ScamDetector
+from app.extraction import IntelligenceExtractor
+from app.models import IntelligenceData
+from app.personas import PersonaManager
+from app.session import Message, SessionRecord
+from app.state_store import StateStore, MemoryStateStore
+from app.metrics import REHYDRATIONS
+
+
+class SessionRehydrator:
+    """
+    Rebuilds a session from the conversationHistory the client sends with each turn,
+    so any worker can serve any turn without shared state.
+
+    The history is replayed once into a fresh SessionRecord the way the live turns
+    built it: scam type (hence persona) from the first scammer message, turn count,
+    message window and accumulated intelligence. Rebuilt sessions are cached under a
+    hash of the history's content; after a reply the session is also cached under the
+    history the client will send next, so a follow-up turn on the same worker only
+    costs the hash.
+    """
+
+    def __init__(self, store: StateStore):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse(history: List[Dict[str, Any]]) -> List[Message]:
+        """conversationHistory entries ({"sender", "text", "timestamp"}) as (role, text); the scammer is "user"."""
+        return [
+            ("user" if entry.get("sender") == "scammer" else "model", entry["text"])
+            for entry in history if entry.get("text")
+        ]
+
+    @staticmethod
+    def history_key(messages: List[Message]) -> str:
+        digest = hashlib.sha256()
+        for role, text in messages:
+            digest.update(f"{role}\x1f{text}\x1e".encode("utf-8"))
+        return digest.hexdigest()
+
+    def rehydrate(self, messages: List[Message]) -> SessionRecord:
+        cached = self.store.get(self.history_key(messages))
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            REHYDRATIONS.inc(result="hit")
+            session = SessionRecord.from_dict(cached)
+            session.intelligence = dict(session.intelligence) if session.intelligence else None
+            return session
+
+        REHYDRATIONS.inc(result="miss")
+        session = self.rebuild(messages)
+        self.store.set(self.history_key(messages), session.to_dict())
+        return session
+
+    def remember(self, messages: List[Message], session: SessionRecord):
+        """Caches the session as the state after `messages` (the client's next history)."""
+        self.store.set(self.history_key(messages), session.to_dict())
+
+    @staticmethod
+    def rebuild(messages: List[Message]) -> SessionRecord:
+        """One pass over the history; the same detection and extraction as the live endpoints."""
+        first = next((text for role, text in messages if role == "user"), "")
+        _, detected_type, confidence = ScamDetector.analyze(first)
+        scam_type = detected_type if detected_type else "default"
+
+        session = SessionRecord(scam_type, PersonaManager.get_persona_key(scam_type))
+        intelligence = IntelligenceData()
+        for role, text in messages:
+            session.add(role, text)
+            if role == "user":
+                intelligence = IntelligenceExtractor.extract(text, intelligence)
+        intelligence.confidence_score = max(intelligence.confidence_score, confidence)
+        if intelligence.scam_type is None:
+            intelligence.scam_type = scam_type
+        session.intelligence = intelligence.dict()
+        session.spill = None  # the client holds the full transcript
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "mode": SESSION_REHYDRATE,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.store),
+        }
+
+
+def create_rehydrator() -> Optional[SessionRehydrator]:
+    """Builds the rehydrator selected by SESSION_REHYDRATE (missing, always or off)."""
+    if SESSION_REHYDRATE == "off":
+        return None
+    if SESSION_REHYDRATE in ("missing", "always"):
+        return SessionRehydrator(MemoryStateStore(REHYDRATE_CACHE_MAX_ENTRIES, REHYDRATE_CACHE_TTL_SECONDS))
+    raise ValueError(f"Unsupported SESSION_REHYDRATE: {SESSION_REHYDRATE}")
@@ -0,0 +1,76 @@
+import re
+import random
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from app.config import (
+    LLM_CACHE_BACKEND, LLM_CACHE_VARIANTS, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_SQLITE_PATH
+)
+from app.state_store import StateStore, MemoryStateStore, RedisStateStore, SQLiteStateStore
+
+_NON_WORD = re.compile(r"[^\w@]+")
+
+
+class ResponseCache:
+    """
+    LLM reply cache keyed on persona, strategy phase and recent history.
+    A key collects up to `variants` distinct replies (lookups miss until then), after which
+    one is picked at random per hit so scammers don't keep seeing the identical text.
+    """
+
+    def __init__(self, store: StateStore, variants: int = LLM_CACHE_VARIANTS):
+        self.store = store
+        self.variants = max(variants, 1)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(persona: str, phase: str, turn_count: int, messages: List[Tuple[str, str]]) -> str:
+        """
+        Key for a prompt built from persona, phase, turn number and (role, text) messages, so
+        two user messages in a row (a coalesced turn) never share a key with a user/model pair.
+        Messages differing only in case, punctuation or spacing share a key.
+        """
+        normalized = [f"{role}:{_NON_WORD.sub(' ', text.lower()).strip()}" for role, text in messages]
+        return hashlib.sha256("\x1f".join([persona, phase, str(turn_count)] + normalized).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.store.get(key)
+        replies = entry["replies"] if entry else []
+        with self._lock:
+            if len(replies) >= self.variants:
+                self.hits += 1
+                return random.choice(replies)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, reply: str) -> None:
+        entry = self.store.get(key) or {"replies": []}
+        if reply in entry["replies"] or len(entry["replies"]) >= self.variants:
+            return
+        entry["replies"].append(reply)
+        self.store.set(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.store),
+            "variants": self.variants,
+        }
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Builds the cache selected by LLM_CACHE_BACKEND (memory, sqlite, redis or off)."""
+    if LLM_CACHE_BACKEND == "off":
+        return None
+    if LLM_CACHE_BACKEND == "memory":
+        return ResponseCache(MemoryStateStore(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS))
+    if LLM_CACHE_BACKEND == "sqlite":
+        return ResponseCache(SQLiteStateStore(LLM_CACHE_SQLITE_PATH, LLM_CACHE_TTL_SECONDS))
+    if LLM_CACHE_BACKEND == "redis":
+        return ResponseCache(RedisStateStore(prefix="honeypot:llm-cache:", ttl_seconds=LLM_CACHE_TTL_SECONDS))
+    raise ValueError(f"Unsupported LLM_CACHE_BACKEND: {LLM_CACHE_BACKEND}")
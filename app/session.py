@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.config import SESSION_WINDOW
+from app.personas import PersonaManager
+
+Message = Tuple[str, str]  # (role, text); role is "user" (scammer) or "model" (agent)
+
+
+class SessionRecord:
+    """
+    Compact per-conversation state.
+
+    Only the last `window` messages (all the prompt ever shows) are kept, in a
+    fixed-capacity ring buffer; the turn counter is maintained on append instead of
+    recounted. The persona is referenced by key rather than copied. Messages pushed
+    out of the window wait in `spill` until the manager hands them to the transcript
+    archive (if one is configured), so per-session memory stays bounded.
+    """
+
+    __slots__ = ("scam_type", "persona_key", "turn_count", "message_count", "intelligence", "_ring", "spill")
+
+    def __init__(self, scam_type: str, persona_key: str, turn_count: int = 0,
+                 intelligence: Optional[Dict[str, Any]] = None, window: int = SESSION_WINDOW):
+        self.scam_type = scam_type
+        self.persona_key = persona_key
+        # Scammer messages so far, and all messages so far (ring position / archive sequence)
+        self.turn_count = turn_count
+        self.message_count = 0
+        self.intelligence = intelligence
+        self._ring: List[Optional[Message]] = [None] * window
+        self.spill: Optional[List[Tuple[int, Message]]] = None
+
+    @property
+    def persona(self) -> Dict[str, str]:
+        return PersonaManager.PERSONAS[self.persona_key]
+
+    @property
+    def window(self) -> int:
+        return len(self._ring)
+
+    def add(self, role: str, text: str):
+        """Appends a message, moving the one it overwrites to `spill`."""
+        slot = self.message_count % self.window
+        evicted = self._ring[slot]
+        if evicted is not None:
+            if self.spill is None:
+                self.spill = []
+            self.spill.append((self.message_count - self.window, evicted))
+        self._ring[slot] = (role, text)
+        self.message_count += 1
+        if role == "user":
+            self.turn_count += 1
+
+    def recent(self) -> List[Message]:
+        """Messages in the window, oldest first."""
+        start = self.message_count % self.window
+        return [m for m in self._ring[start:] + self._ring[:start] if m is not None]
+
+    def take_spill(self) -> List[Tuple[int, Message]]:
+        """Messages that left the window since the last call, with their sequence numbers."""
+        spill, self.spill = self.spill or [], None
+        return spill
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON form for the Redis/SQLite state backends."""
+        return {
+            "scam_type": self.scam_type,
+            "persona_key": self.persona_key,
+            "turn_count": self.turn_count,
+            "message_count": self.message_count,
+            "recent": [list(m) for m in self.recent()],
+            "intelligence": self.intelligence,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionRecord":
+        if "history" in data:
+            return cls._from_legacy(data)
+        record = cls(data["scam_type"], data["persona_key"], data["turn_count"], data.get("intelligence"))
+        recent = data["recent"][-record.window:]
+        # Lay the window out where add() would have put it
+        record.message_count = data["message_count"] - len(recent)
+        for role, text in recent:
+            record._ring[record.message_count % record.window] = (role, text)
+            record.message_count += 1
+        return record
+
+    @classmethod
+    def _from_legacy(cls, data: Dict[str, Any]) -> "SessionRecord":
+        """Sessions stored before the compact format: {"history": [{"role", "parts"}], "persona": {...}}"""
+        scam_type = data.get("scam_type", "default")
+        record = cls(scam_type, PersonaManager.get_persona_key(scam_type), intelligence=data.get("intelligence"))
+        for msg in data["history"]:
+            record.add(msg["role"], msg["parts"][0])
+        record.spill = None  # already persisted in full under the old format
+        return record
+
+
+class TranscriptArchive:
+    """
+    Full transcripts in SQLite, fed with the messages that leave a session's window.
+    Lets sessions stay small in memory without losing older turns. One connection per thread/process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS transcripts "
+            "(conversation_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, text TEXT NOT NULL, "
+            "PRIMARY KEY (conversation_id, seq))"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def append(self, conversation_id: str, messages: List[Tuple[int, Message]]):
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO transcripts (conversation_id, seq, role, text) VALUES (?, ?, ?, ?)",
+            [(conversation_id, seq, role, text) for seq, (role, text) in messages]
+        )
+
+    def load(self, conversation_id: str) -> List[Message]:
+        """Archived messages of a conversation, oldest first (the live window is not included)."""
+        return [tuple(row) for row in self._connection().execute(
+            "SELECT role, text FROM transcripts WHERE conversation_id = ? ORDER BY seq", (conversation_id,)
+        )]
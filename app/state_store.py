@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from app.config import (
+    STATE_BACKEND, STATE_TTL_SECONDS, STATE_MAX_SESSIONS, REDIS_URL, STATE_SQLITE_PATH
+)
+
+
+class StateStore(ABC):
+    """
+    Storage for per-conversation state.
+    Values are JSON-serializable dicts; a session expires after `ttl_seconds` without
+    being read or written. Always call `set` after mutating a state.
+    Stores with `keeps_objects` hold values as-is, so any object may be stored.
+    """
+
+    keeps_objects = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+
+class MemoryStateStore(StateStore):
+    """Process-local LRU with sliding TTL and a max-sessions cap."""
+
+    keeps_objects = True
+
+    def __init__(self, max_sessions: int, ttl_seconds: float):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        # Least recently used first; every access refreshes the TTL, so this is also expiry order
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._data[key]
+                return None
+            self._data[key] = (now + self.ttl_seconds, entry[1])
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(time.monotonic())
+            return len(self._data)
+
+    def _evict(self, now: float) -> None:
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now and len(self._data) <= self.max_sessions:
+                break
+            del self._data[key]
+
+
+class RedisStateStore(StateStore):
+    """Shared across workers and nodes. Accepts any redis-py compatible client (or a fake)."""
+
+    def __init__(self, client: Any = None, url: str = REDIS_URL,
+                 prefix: str = "honeypot:state:", ttl_seconds: float = STATE_TTL_SECONDS,
+                 count_ttl_seconds: float = 10.0):
+        if client is None:
+            import redis  # optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = int(ttl_seconds)
+        # len() is a SCAN of the keyspace, so its result is reused for this long
+        self.count_ttl_seconds = count_ttl_seconds
+        self._count: Optional[Tuple[float, int]] = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.getex(self.prefix + key, ex=self.ttl_seconds)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def __len__(self) -> int:
+        # Read by the live-sessions gauge on every /metrics scrape; a fresh count would make each
+        # scrape walk the whole keyspace. Other workers' writes and TTL expiries are only visible
+        # to Redis, so the count is cached rather than kept up to date on set/delete.
+        now = time.monotonic()
+        if self._count is None or now - self._count[0] >= self.count_ttl_seconds:
+            self._count = (now, sum(1 for _ in self.client.scan_iter(match=self.prefix + "*", count=1000)))
+        return self._count[1]
+
+
+class SQLiteStateStore(StateStore):
+    """Survives restarts; shareable by the workers of one machine. One connection per thread/process."""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str = STATE_SQLITE_PATH, ttl_seconds: float = STATE_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS sessions "
+                     "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT value FROM sessions WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE sessions SET expires_at = ? WHERE key = ?", (now + self.ttl_seconds, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+                     (key, json.dumps(value), now + self.ttl_seconds))
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+
+def create_state_store() -> StateStore:
+    """Builds the backend selected by STATE_BACKEND (memory, redis or sqlite)."""
+    if STATE_BACKEND == "memory":
+        return MemoryStateStore(STATE_MAX_SESSIONS, STATE_TTL_SECONDS)
+    if STATE_BACKEND == "redis":
+        return RedisStateStore()
+    if STATE_BACKEND == "sqlite":
+        return SQLiteStateStore()
+    raise ValueError(f"Unsupported STATE_BACKEND: {STATE_BACKEND}")
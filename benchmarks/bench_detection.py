@@ -0,0 +1,106 @@
+"""
+Scam detector benchmark: compiled single-pass matcher vs. the old per-keyword scans.
+
+Run from the repository root:
+    python benchmarks/bench_detection.py [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAMELEON = os.path.join(ROOT, "THE CHAMELEON AGENT")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, CHAMELEON)
+
+from app.detection import ScamDetector as RootScamDetector  # noqa: E402
+from src.detection.scam_detector import ScamDetector  # noqa: E402
+
+FILLER = (
+    "Dear customer, as per the latest guidelines we are reaching out regarding your records. "
+    "Please read this message carefully and keep it for future reference. "
+)
+SCAM_TAIL = (
+    "Your bank account has been blocked. Update your KYC immediately or call us. "
+    "Congratulations you won 5 lakh in the lucky draw, pay the registration fee now."
+)
+
+
+def legacy_chameleon(detector, message):
+    """Previous ScamDetector.analyze: one substring scan per keyword, one re.search per pattern"""
+    message_lower = message.lower()
+    scores = {}
+    for scam_type, patterns in detector.scam_patterns.items():
+        keyword_matches = sum(1 for keyword in patterns["keywords"] if keyword in message_lower)
+        pattern_matches = sum(1 for pattern in patterns["patterns"] if re.search(pattern, message_lower))
+        scores[scam_type] = min(keyword_matches * 0.1, 0.5) + min(pattern_matches * 0.2, 0.6)
+    best = max(scores, key=scores.get)
+    score = scores[best]
+    signals = []
+    for signal, weight, patterns in (
+        ("urgency", 0.1, detector.urgency_patterns),
+        ("authority_claim", 0.15, detector.authority_patterns),
+        ("action_request", 0.15, detector.action_patterns),
+    ):
+        if any(re.search(pattern, message_lower) for pattern in patterns):
+            signals.append(signal)
+            score += weight
+    confidence = min(score, 1.0)
+    return {
+        "is_scam": confidence >= 0.3,
+        "scam_type": best if confidence >= 0.3 else None,
+        "confidence": round(confidence, 2),
+        "signals_detected": signals,
+        "all_scores": {k: round(v, 2) for k, v in scores.items()},
+    }
+
+
+def legacy_root(message):
+    """Previous root ScamDetector.analyze: one re.search per keyword"""
+    message_lower = message.lower()
+    detected = {}
+    for scam_type, patterns in RootScamDetector.SCAM_KEYWORDS.items():
+        count = sum(1 for pattern in patterns if re.search(pattern, message_lower))
+        if count:
+            detected[scam_type] = count
+    if not detected:
+        return False, None, 0.0
+    best = max(detected, key=detected.get)
+    return True, best, min(0.5 + detected[best] * 0.1, 0.95)
+
+
+def timeit(fn, repeat):
+    fn()  # warm caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    detector = ScamDetector()
+    sample = FILLER + SCAM_TAIL
+    assert legacy_chameleon(detector, sample) == detector.analyze(sample)
+    assert legacy_root(sample) == RootScamDetector.analyze(sample)
+
+    print(f"{'detector':<12}{'chars':>8}{'legacy ms':>12}{'compiled ms':>14}{'speedup':>10}")
+    for length in (200, 2_000, 20_000, 100_000):
+        message = (FILLER * (length // len(FILLER) + 1))[:length - len(SCAM_TAIL)] + SCAM_TAIL
+        repeat = max(args.repeat * 2_000 // length, 5)
+        for name, legacy, compiled in (
+            ("chameleon", lambda: legacy_chameleon(detector, message), lambda: detector.analyze(message)),
+            ("root", lambda: legacy_root(message), lambda: RootScamDetector.analyze(message)),
+        ):
+            old_ms, new_ms = timeit(legacy, repeat), timeit(compiled, repeat)
+            print(f"{name:<12}{len(message):>8}{old_ms:>12.3f}{new_ms:>14.3f}{old_ms / new_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
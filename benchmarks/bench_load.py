@@ -0,0 +1,164 @@
+"""
+Load benchmark: drives /honeypot and / (hackathon format) of the root app and
+/honeypot of THE CHAMELEON AGENT in-process against a mock LLM with fixed latency.
+
+Reports p50/p95/p99 latency and requests/sec per concurrency level, plus memory
+growth per 10k sessions. Run from the repository root:
+    python benchmarks/bench_load.py
+    python benchmarks/bench_load.py --latency 0.5 --concurrency 10 100 --requests 2000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mock_llm  # noqa: E402  (sets the environment before the apps are imported)
+
+import httpx  # noqa: E402
+
+MESSAGES = [
+    "Your KYC will expire today. Update immediately or your account will be blocked.",
+    "Congratulations! You have won 5 lakh rupees in KBC lottery! Pay 2000 processing fee.",
+    "This is Microsoft support. Your computer has a virus. Call 9876543210 now.",
+    "Work from home and earn 50000 per month. Registration fee 500 to 9876543210@paytm.",
+]
+
+
+def root_honeypot(i, session_id):
+    return {"conversation_id": session_id, "message": MESSAGES[i % len(MESSAGES)]}
+
+
+def root_hackathon(i, session_id):
+    return {
+        "sessionId": session_id,
+        "message": {"sender": "scammer", "text": MESSAGES[i % len(MESSAGES)], "timestamp": 0},
+        "conversationHistory": [],
+    }
+
+
+def chameleon_honeypot(i, session_id):
+    return {"message": MESSAGES[i % len(MESSAGES)], "conversation_id": session_id, "history": []}
+
+
+def build_targets(latency):
+    """(name, ASGI app, path, payload builder) for every endpoint under test"""
+    root_app = mock_llm.load_root_app(latency)
+    chameleon_app = mock_llm.load_chameleon_app(latency)
+    return [
+        ("root POST /honeypot", root_app, "/honeypot", root_honeypot),
+        ("root POST / (hackathon)", root_app, "/", root_hackathon),
+        ("chameleon POST /honeypot", chameleon_app, "/honeypot", chameleon_honeypot),
+    ]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(p / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def drive(app, path, payload, requests, concurrency, run_id):
+    """Send `requests` requests (each a new session) with `concurrency` in flight"""
+    transport = httpx.ASGITransport(app=app)
+    headers = {"X-API-Key": mock_llm.API_KEY}
+    latencies, errors = [], 0
+    next_index = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def worker():
+            nonlocal next_index, errors
+            while next_index < requests:
+                i = next_index
+                next_index += 1
+                start = time.perf_counter()
+                response = await client.post(path, json=payload(i, f"{run_id}-{i}"), headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def memory_per_10k_sessions(app, path, payload, sessions, run_id):
+    """Traced Python heap growth after `sessions` new sessions, scaled to 10k"""
+    await drive(app, path, payload, 200, 50, f"{run_id}-warm")  # warm imports and caches
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        await drive(app, path, payload, sessions, 100, run_id)
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / sessions * 10_000 / 1024 / 1024
+
+
+def run(args):
+    targets = build_targets(args.latency)
+    results = {"latency_s": args.latency, "load": [], "memory_mb_per_10k_sessions": {}}
+
+    print(f"Mock LLM latency {args.latency * 1000:.0f} ms, {args.requests} requests per level")
+    print(f"{'endpoint':<28}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, app, path, payload in targets:
+        for concurrency in args.concurrency:
+            stats = asyncio.run(drive(app, path, payload, args.requests, concurrency, f"{name}-{concurrency}"))
+            stats["endpoint"] = name
+            results["load"].append(stats)
+            print(f"{name:<28}{concurrency:>6}{stats['rps']:>10.1f}{stats['p50_ms']:>10.1f}"
+                  f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['errors']:>8}")
+
+    if args.memory_sessions:
+        print(f"\nMemory growth ({args.memory_sessions} new sessions, scaled to 10k)")
+        for name, app, path, payload in build_targets(0):
+            mb = asyncio.run(memory_per_10k_sessions(app, path, payload, args.memory_sessions, f"{name}-mem"))
+            results["memory_mb_per_10k_sessions"][name] = mb
+            print(f"{name:<28}{mb:>10.2f} MB / 10k sessions")
+
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--memory-sessions", type=int, default=10_000,
+                        help="Sessions for the memory measurement (0 to skip)")
+    parser.add_argument("--cache", action="store_true", help="Keep the LLM reply cache enabled")
+    parser.add_argument("--json", help="Write results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mock_llm.set_cache(args.cache)
+    results = run(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmarks for the CPU-bound request path: ScamDetector.analyze and entity
+extraction of both apps, on a single SMS, a 10-turn conversation and a 10 KB paste.
+
+Run from the repository root:
+    python benchmarks/bench_micro.py [--seconds 0.5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mock_llm  # noqa: E402,F401  (puts both apps on sys.path)
+
+from app.detection import ScamDetector as RootScamDetector  # noqa: E402
+from app.extraction import IntelligenceExtractor  # noqa: E402
+from app.models import IntelligenceData  # noqa: E402
+from src.detection.scam_detector import ScamDetector  # noqa: E402
+from src.extraction.entity_extractor import EntityExtractor  # noqa: E402
+
+SMS = "Your SBI account is blocked. Update KYC immediately at http://sbi-kyc-update.tk or call 9876543210"
+TURNS = [
+    "Congratulations! You have won 5 lakh rupees in KBC lottery!",
+    "Really? How do I claim it?",
+    "Pay processing fee of 5000 rupees to 9876543210@paytm",
+    "Can I pay by bank transfer instead?",
+    "Account: 12345678901, IFSC: SBIN0001234, Name: Ramesh Kumar",
+] * 2
+PASTE = (" ".join(TURNS) + " ") * 20
+
+
+def measure(fn, seconds):
+    """Mean microseconds per call over roughly `seconds` of repeated calls"""
+    fn()
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(seconds):
+    detector, extractor = ScamDetector(), EntityExtractor()
+    inputs = {"sms": [SMS], "conversation": TURNS, "paste_10kb": [PASTE[:10_000]]}
+    cases = []
+    for label, messages in inputs.items():
+        text = " ".join(messages)
+        cases += [
+            ("chameleon ScamDetector.analyze", label, lambda text=text: detector.analyze(text)),
+            ("chameleon EntityExtractor.extract", label, lambda m=messages: extractor.extract(m)),
+            ("root ScamDetector.analyze", label, lambda text=text: RootScamDetector.analyze(text)),
+            ("root IntelligenceExtractor.extract", label,
+             lambda text=text: IntelligenceExtractor.extract(text, IntelligenceData())),
+        ]
+
+    results = []
+    print(f"{'function':<38}{'input':>14}{'us/call':>12}{'calls/s':>12}")
+    for name, label, fn in cases:
+        us = measure(fn, seconds)
+        results.append({"function": name, "input": label, "us_per_call": us, "calls_per_s": 1e6 / us})
+        print(f"{name:<38}{label:>14}{us:>12.1f}{1e6 / us:>12.0f}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Time spent per case")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.getLogger("src.extraction").setLevel(logging.WARNING)
+    results = run(args.seconds)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark: time to import each app in a fresh interpreter, with the LLM
+client stack loaded lazily (as deployed) and eagerly (loaded at import, as before).
+The difference is what every worker start saves; /ready pays it in the background.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAMELEON_ROOT = os.path.join(REPO_ROOT, "THE CHAMELEON AGENT")
+
+# (app, mode, working directory, code run after `import main` that loads the LLM stack)
+CASES = [
+    ("root", "lazy", REPO_ROOT, ""),
+    ("root", "eager", REPO_ROOT, "main.ConversationManager._sdk()"),
+    ("chameleon", "lazy", CHAMELEON_ROOT, ""),
+    ("chameleon", "eager", CHAMELEON_ROOT, "main.conversation_manager.llm_client.http"),
+]
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+import main
+{load}
+print("STARTUP", time.perf_counter() - start, "google.generativeai" in sys.modules, "httpx" in sys.modules)
+"""
+
+
+def measure(cwd, load):
+    """(seconds, SDK loaded, httpx loaded) for one import of main in a new interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD.format(load=load)],
+        cwd=cwd, capture_output=True, text=True, check=True
+    )
+    line = next(line for line in result.stdout.splitlines() if line.startswith("STARTUP"))
+    _, seconds, sdk, http = line.split()
+    return float(seconds), sdk == "True", http == "True"
+
+
+def run(runs):
+    results = []
+    print(f"{'app':<11}{'mode':<7}{'median ms':>11}{'min ms':>9}{'  loaded at import'}")
+    for app, mode, cwd, load in CASES:
+        measure(cwd, load)  # warm the OS file cache and .pyc files
+        samples = [measure(cwd, load) for _ in range(runs)]
+        times = [seconds * 1000 for seconds, _, _ in samples]
+        _, sdk, http = samples[-1]
+        loaded = ", ".join(name for name, flag in (("google.generativeai", sdk), ("httpx", http)) if flag) or "-"
+        results.append({
+            "app": app, "mode": mode, "median_ms": statistics.median(times), "min_ms": min(times), "loaded": loaded
+        })
+        print(f"{app:<11}{mode:<7}{statistics.median(times):>11.0f}{min(times):>9.0f}  {loaded}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
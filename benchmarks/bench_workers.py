@@ -0,0 +1,171 @@
+"""
+Worker scaling benchmark: serves the root app with gunicorn (gunicorn.conf.py: uvicorn
+workers, preloaded app, SQLite-shared state) at several worker counts against the mock
+LLM, and drives POST /honeypot over HTTP from separate client processes. Each session
+sends several turns in a row, so they land on different workers.
+
+Reports requests/sec and latency per worker count. Run from the repository root:
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --requests 6000 --clients 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+from bench_load import MESSAGES, percentile  # noqa: E402
+from mock_llm import API_KEY  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, port, latency, state_dir):
+    """gunicorn with the production config, serving the mock-LLM app; returns once it answers"""
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        PORT=str(port),
+        MOCK_LLM_LATENCY=str(latency),
+        STATE_BACKEND="sqlite",
+        STATE_SQLITE_PATH=os.path.join(state_dir, f"state-{workers}.db"),
+        LLM_CACHE_BACKEND="off",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(ROOT, "gunicorn.conf.py"),
+         "--pythonpath", BENCH_DIR, "mock_llm:create_root_app()"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("gunicorn did not become ready within 60s")
+
+
+async def drive(url, sessions, turns, concurrency, start_at):
+    """Plays `sessions` conversations of `turns` messages, `concurrency` conversations at a time"""
+    latencies, errors = [], 0
+    queue = list(sessions)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while queue:
+                session_id = queue.pop()
+                for turn in range(turns):
+                    payload = {"conversation_id": session_id, "message": MESSAGES[turn % len(MESSAGES)]}
+                    start = time.perf_counter()
+                    try:
+                        response = await client.post("/honeypot", json=payload, headers={"X-API-Key": API_KEY})
+                    except httpx.HTTPError:
+                        errors += 1  # e.g. a connection reset by a worker gunicorn restarted
+                        continue
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        errors += 1
+
+        await asyncio.sleep(max(start_at - time.time(), 0))
+        started = time.time()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, started, time.time()
+
+
+def client_process(url, sessions, turns, concurrency, start_at):
+    return asyncio.run(drive(url, sessions, turns, concurrency, start_at))
+
+
+def measure(port, args, run_id):
+    """Splits the sessions over --clients processes that start together; aggregates their results"""
+    sessions = [f"{run_id}-{i}" for i in range(args.requests // args.turns)]
+    url = f"http://127.0.0.1:{port}"
+    start_at = time.time() + 1.0  # let every client process get going first
+    with ProcessPoolExecutor(args.clients) as pool:
+        futures = [
+            pool.submit(client_process, url, sessions[i::args.clients], args.turns,
+                        max(args.concurrency // args.clients, 1), start_at)
+            for i in range(args.clients)
+        ]
+        results = [future.result() for future in futures]
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    elapsed = max(result[3] for result in results) - min(result[2] for result in results)
+    return {
+        "requests": len(latencies) + sum(result[1] for result in results),
+        "errors": sum(result[1] for result in results),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def run(args):
+    results = {"latency_s": args.latency, "cpus": os.cpu_count(), "workers": []}
+    print(f"Mock LLM latency {args.latency * 1000:.0f} ms, {args.requests} requests "
+          f"({args.turns} turns per session), concurrency {args.concurrency}, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    with tempfile.TemporaryDirectory() as state_dir:
+        for workers in args.workers:
+            port = free_port()
+            server = start_server(workers, port, args.latency, state_dir)
+            try:
+                measure(port, argparse.Namespace(**{**vars(args), "requests": args.requests // 10}), f"warm{workers}")
+                stats = measure(port, args, f"w{workers}")
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            stats["workers"] = workers
+            base = results["workers"][0]["rps"] if results["workers"] else stats["rps"]
+            stats["speedup"] = stats["rps"] / base
+            results["workers"].append(stats)
+            print(f"{workers:>8}{stats['rps']:>10.1f}{stats['speedup']:>8.2f}x{stats['p50_ms']:>10.1f}"
+                  f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['errors']:>8}")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock LLM latency in seconds")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per worker count")
+    parser.add_argument("--turns", type=int, default=3, help="Messages per session")
+    parser.add_argument("--concurrency", type=int, default=64, help="Sessions in flight (over all clients)")
+    parser.add_argument("--clients", type=int, default=2, help="Client processes generating load")
+    parser.add_argument("--json", help="Write results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
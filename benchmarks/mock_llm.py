@@ -0,0 +1,81 @@
+"""
+Local mock LLM for benchmarks.
+
+Loads the root app and THE CHAMELEON AGENT app in-process with their Gemini calls
+replaced by a fake that answers after a fixed latency, so runs are reproducible and
+free. Import this module before anything from either app: it sets the environment
+both apps read at import time.
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAMELEON = os.path.join(ROOT, "THE CHAMELEON AGENT")
+for path in (ROOT, CHAMELEON):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+API_KEY = "bench-api-key"
+MOCK_REPLY = "Oh no beta, which button should I press? Please tell me slowly, I am not good with phones."
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("GEMINI_API_KEY", "mock")  # root app skips the LLM without a key
+os.environ["HONEYPOT_API_KEY"] = API_KEY
+os.environ["LLM_PROVIDER"] = "gemini"
+os.environ.setdefault("LLM_MAX_CONCURRENCY", "1024")
+os.environ.setdefault("STATE_BACKEND", "memory")
+
+
+def set_cache(enabled: bool) -> None:
+    """Benchmarks measure the LLM path unless the reply cache is explicitly wanted"""
+    os.environ["LLM_CACHE_BACKEND"] = "memory" if enabled else "off"
+
+
+def _load(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_root_app(latency: float):
+    """Root FastAPI app with ConversationManager._call_gemini/_stream_gemini mocked"""
+    from app import agent
+
+    def call(cls, full_prompt, model_name=None, timeout=None):
+        time.sleep(latency)  # runs in the Gemini thread pool, like the real SDK call
+        return MOCK_REPLY
+
+    def stream(cls, full_prompt, model_name=None, timeout=None):
+        words = MOCK_REPLY.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(latency / len(words))
+            yield word if i == 0 else " " + word
+
+    agent.GEMINI_API_KEY = "mock"
+    agent.ConversationManager._call_gemini = classmethod(call)
+    agent.ConversationManager._stream_gemini = classmethod(stream)
+    return _load("root_main", os.path.join(ROOT, "main.py")).create_app()
+
+
+def create_root_app():
+    """gunicorn app factory: the root app with the mock LLM, latency from MOCK_LLM_LATENCY (seconds)"""
+    return load_root_app(float(os.getenv("MOCK_LLM_LATENCY", "0")))
+
+
+def load_chameleon_app(latency: float):
+    """Chameleon FastAPI app whose LLMClient talks to an in-process mock provider"""
+    import httpx
+    from src.agent.llm_client import LLMClient
+
+    async def handler(request):
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": MOCK_REPLY}]}}]})
+
+    module = _load("chameleon_main", os.path.join(CHAMELEON, "main.py"))
+    module.conversation_manager.llm_client = LLMClient(transport=httpx.MockTransport(handler))
+    return module.app
@@ -0,0 +1,82 @@
+"""
+Pre-deploy performance check: microbenchmarks + load benchmark against the mock LLM,
+optionally compared with the results of the last deploy.
+
+Run from the repository root:
+    python benchmarks/run_all.py --json bench_results.json
+    python benchmarks/run_all.py --baseline bench_results.json --max-regression 0.2
+
+Exits with status 1 when p95 latency, requests/sec or microbenchmark time regressed
+by more than --max-regression compared with the baseline.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mock_llm  # noqa: E402
+
+import bench_load  # noqa: E402
+import bench_micro  # noqa: E402
+
+
+def compare(current, baseline, max_regression):
+    """Human-readable descriptions of every metric that regressed beyond the threshold"""
+    regressions = []
+
+    base_load = {(r["endpoint"], r["concurrency"]): r for r in baseline.get("load", {}).get("load", [])}
+    for r in current["load"]["load"]:
+        base = base_load.get((r["endpoint"], r["concurrency"]))
+        if base is None:
+            continue
+        if r["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{r['endpoint']} c={r['concurrency']}: p95 {base['p95_ms']:.1f} -> {r['p95_ms']:.1f} ms")
+        if r["rps"] < base["rps"] * (1 - max_regression):
+            regressions.append(f"{r['endpoint']} c={r['concurrency']}: {base['rps']:.1f} -> {r['rps']:.1f} req/s")
+
+    base_micro = {(r["function"], r["input"]): r for r in baseline.get("micro", [])}
+    for r in current["micro"]:
+        base = base_micro.get((r["function"], r["input"]))
+        if base is not None and r["us_per_call"] > base["us_per_call"] * (1 + max_regression):
+            regressions.append(f"{r['function']} ({r['input']}): "
+                               f"{base['us_per_call']:.1f} -> {r['us_per_call']:.1f} us/call")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock LLM latency in seconds")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--json", help="Write combined results to this file")
+    parser.add_argument("--baseline", help="Results file of a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    mock_llm.set_cache(False)
+    print("== Microbenchmarks ==")
+    micro = bench_micro.run(seconds=0.5)
+    print("\n== Load ==")
+    load = bench_load.run(bench_load.parse_args([
+        "--latency", str(args.latency), "--requests", str(args.requests),
+    ]))
+    results = {"micro": micro, "load": load}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\nRegressions beyond {args.max_regression:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
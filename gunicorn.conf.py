@@ -0,0 +1,32 @@
+# Multi-worker production mode: gunicorn -c gunicorn.conf.py
+# One uvicorn event loop per worker process, app loaded once in the master (preload)
+# and forked, so read-only tables are shared copy-on-write between the workers.
+import gc
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+wsgi_app = "main:create_app()"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+# Must exceed LLM_TIMEOUT_SECONDS plus queueing, or busy workers get killed mid-reply
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Conversations must be visible to whichever worker gets the next turn: unless a
+# backend is chosen explicitly, share state through SQLite on this machine.
+if workers > 1:
+    os.environ.setdefault("STATE_BACKEND", "sqlite")
+
+
+def when_ready(server):
+    # Runs in the master after the preload, before any worker is forked. The preloaded
+    # objects live for the whole process; moving them out of the collector's reach keeps
+    # GC passes in the workers from writing to (and so un-sharing) their pages.
+    gc.freeze()
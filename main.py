@@ -1,17 +1,35 @@
 import uvicorn
 import asyncio
+import json
+import math
+from contextlib import asynccontextmanager
+from typing import Tuple, Optional
 from fastapi import FastAPI, HTTPException, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, Response, JSONResponse
 from app.models import (
     HoneypotRequest, HoneypotResponse, IntelligenceData,
     HackathonRequest, HackathonResponse
 )
-from app.config import GEMINI_API_KEY
+from app.config import GEMINI_API_KEY, INTEL_INDEX_PATH
 from app.detection import ScamDetector
 from app.extraction import IntelligenceExtractor
 from app.agent import ConversationManager
+from app.admission import Overloaded
+from app.session import SessionRecord
+from app.rehydration import SessionRehydrator
+from app.personas import PersonaManager
+from app.intel_index import KINDS
+from app.metrics import REGISTRY, STAGE_SECONDS
 
-app = FastAPI(title="Agentic Honey-Pot API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Merge this worker's intelligence index into the saved one (loaded again at startup)
+    if ConversationManager._intel is not None and INTEL_INDEX_PATH:
+        ConversationManager._intel.save(INTEL_INDEX_PATH)
+
+app = FastAPI(title="Agentic Honey-Pot API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,9 +46,42 @@ async def verify_api_key(x_api_key: str = Header(...)):
         raise HTTPException(status_code=403, detail="API Key required")
     return x_api_key
 
+
+def _too_busy(error: Overloaded) -> HTTPException:
+    # Only reached with OVERLOAD_MODE=reject; the default sends a rule-based reply instead
+    return HTTPException(
+        status_code=429,
+        detail=f"Server overloaded ({error.reason}), retry later",
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))},
+    )
+
 @app.get("/health")
 def health_check():
-    return {"status": "active", "service": "Agentic Honey-Pot"}
+    cache = ConversationManager._cache
+    return {
+        "status": "active",
+        "service": "Agentic Honey-Pot",
+        "llm_cache": cache.stats() if cache is not None else None,
+        "llm_models": ConversationManager._router.stats(),
+        "admission": ConversationManager._admission.stats(),
+        "rehydration": ConversationManager._rehydrator.stats() if ConversationManager._rehydrator is not None else None,
+        "intel_index": ConversationManager._intel.stats() if ConversationManager._intel is not None else None,
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    # Readiness probe: the first probe starts loading the Gemini SDK in the background,
+    # 503 until it is loaded so no user request pays for the import
+    if not ConversationManager.warm_up():
+        return JSONResponse(status_code=503, content={"status": "warming"})
+    return {"status": "ready"}
+
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text format; values are per worker process
+    return Response(content=REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
 
 
 @app.post("/", response_model=HackathonResponse)
@@ -44,28 +95,34 @@ async def hackathon_endpoint(payload: HackathonRequest, x_api_key: str = Header(
         session_id = payload.sessionId
         message_text = payload.message.text
         
-        # Use existing conversation logic
-        state = ConversationManager.get_state(session_id)
+        # Use existing conversation logic; without server state the session is rebuilt from the history
+        history = SessionRehydrator.parse(payload.conversationHistory)
+        session = ConversationManager.resume_session(session_id, history)
         
         # Scam Detection
         is_scam = False
         scam_type = "default"
         
-        if state:
+        if session is not None:
             is_scam = True
-            scam_type = state.get("scam_type", "default")
+            scam_type = session.scam_type
         else:
             is_scam, detected_type, confidence = ScamDetector.analyze(message_text)
             scam_type = detected_type if detected_type else "default"
         
         # Generate response using existing agent
-        agent_response = ConversationManager.generate_response(session_id, message_text, scam_type)
+        agent_response = await ConversationManager.generate_response(
+            session_id, message_text, scam_type, client_id=x_api_key
+        )
+        ConversationManager.remember_turn(session_id, history + [("user", message_text), ("model", agent_response)])
         
         return HackathonResponse(
             status="success",
             reply=agent_response
         )
         
+    except Overloaded as e:
+        raise _too_busy(e)
     except Exception as e:
         # Return a valid response even on error
         return HackathonResponse(
@@ -73,38 +130,39 @@ async def hackathon_endpoint(payload: HackathonRequest, x_api_key: str = Header(
             reply="I'm sorry, could you please repeat that? I didn't quite understand."
         )
 
-@app.post("/honeypot", response_model=HoneypotResponse)
-async def honeypot_endpoint(payload: HoneypotRequest, api_key: str = Depends(verify_api_key)):
+def _analyze_honeypot_turn(payload: HoneypotRequest) -> Tuple[bool, str, IntelligenceData]:
     """
-    Main endpoint for the honeypot system.
-    Receives a message, detects scam, engages via agent, and extracts intelligence.
+    Runs extraction and detection for an incoming honeypot message.
+    Returns (is_scam, scam_type, updated_intelligence); scam_type selects the persona.
     """
     
     # 1. Retrieve or Initialize Conversation State
     conversation_id = payload.conversation_id
-    state = ConversationManager.get_state(conversation_id)
+    session = ConversationManager.get_session(conversation_id)
     
     # 2. Extract Intelligence from the incoming message immediately
     # We maintain previous intelligence if available, or start fresh
-    current_intelligence = state.get("intelligence", IntelligenceData())
-    if isinstance(current_intelligence, dict):
-        current_intelligence = IntelligenceData(**current_intelligence)
+    current_intelligence = IntelligenceData()
+    if session is not None and session.intelligence:
+        current_intelligence = IntelligenceData(**session.intelligence)
         
-    updated_intelligence = IntelligenceExtractor.extract(payload.message, current_intelligence)
+    with STAGE_SECONDS.time(stage="extraction"):
+        updated_intelligence = IntelligenceExtractor.extract(payload.message, current_intelligence)
     
     # 3. Scam Detection (if not already detected/established context)
     is_scam = False
     scam_type = "default"
     confidence = 0.0
     
-    if state:
+    if session is not None:
         # We are already in a conversation, so we assume the context continues
         is_scam = True 
-        scam_type = state.get("scam_type", "default")
+        scam_type = session.scam_type
         confidence = 0.95 # High confidence as we are already engaged
     else:
         # First turn or new conversation
-        is_scam, detected_type, confidence = ScamDetector.analyze(payload.message)
+        with STAGE_SECONDS.time(stage="detection"):
+            is_scam, detected_type, confidence = ScamDetector.analyze(payload.message)
         scam_type = detected_type if detected_type else "default"
         
         # If we didn't detect a scam but we want to be safe, or if this is a honey-pot explicitly:
@@ -119,28 +177,57 @@ async def honeypot_endpoint(payload: HoneypotRequest, api_key: str = Depends(ver
     if updated_intelligence.scam_type is None:
         updated_intelligence.scam_type = scam_type
 
-    # 4. Generate Agent Response
-    if is_scam or state: 
-        # Engage!
-        agent_response = ConversationManager.generate_response(conversation_id, payload.message, scam_type)
-        
-        # Update state with intelligence
-        current_state = ConversationManager.get_state(conversation_id)
-        current_state["intelligence"] = updated_intelligence.dict()
-        ConversationManager.update_state(conversation_id, current_state)
-        
-    else:
+    if not (is_scam or session is not None):
         # Not recognized as a scam yet, and no history.
         # We can either not engage, or engage cautiously.
         # For a Honeypot, we probably should engage to *find out*.
         # Let's use the 'default' persona to probe.
-        agent_response = ConversationManager.generate_response(conversation_id, payload.message, "default")
+        scam_type = "default"
         is_scam = True # We effectively treat it as a potential scam for the sake of the conversation
-        
-        # Update state with intelligence
-        current_state = ConversationManager.get_state(conversation_id)
-        current_state["intelligence"] = updated_intelligence.dict()
-        ConversationManager.update_state(conversation_id, current_state)
+
+    return is_scam, scam_type, updated_intelligence
+
+
+def _store_intelligence(conversation_id: str, intelligence: IntelligenceData):
+    """
+    Update state with intelligence once the agent has replied.
+    Merged into what is stored (first value found wins, as in the extractor), so
+    concurrent requests for one conversation do not drop each other's findings.
+    """
+    session = ConversationManager.get_session(conversation_id)
+    if session is None:
+        # No turn was saved (e.g. the LLM is not configured): keep the findings anyway
+        scam_type = intelligence.scam_type or "default"
+        session = SessionRecord(scam_type, PersonaManager.get_persona_key(scam_type))
+    merged = intelligence.dict()
+    for key, value in (session.intelligence or {}).items():
+        if key == "confidence_score":
+            merged[key] = max(merged[key], value)
+        elif value:
+            merged[key] = value
+    session.intelligence = merged
+    ConversationManager.save_session(conversation_id, session)
+    if ConversationManager._intel is not None:
+        ConversationManager._intel.add(conversation_id, ConversationManager._intel.entities(merged), session.persona_key)
+
+
+@app.post("/honeypot", response_model=HoneypotResponse)
+async def honeypot_endpoint(payload: HoneypotRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Main endpoint for the honeypot system.
+    Receives a message, detects scam, engages via agent, and extracts intelligence.
+    """
+    with STAGE_SECONDS.time(stage="total"):
+        is_scam, scam_type, updated_intelligence = _analyze_honeypot_turn(payload)
+
+        # 4. Generate Agent Response
+        try:
+            agent_response = await ConversationManager.generate_response(
+                payload.conversation_id, payload.message, scam_type, client_id=api_key
+            )
+        except Overloaded as e:
+            raise _too_busy(e)
+        _store_intelligence(payload.conversation_id, updated_intelligence)
 
     return HoneypotResponse(
         scam_detected=is_scam,
@@ -148,5 +235,64 @@ async def honeypot_endpoint(payload: HoneypotRequest, api_key: str = Depends(ver
         intelligence=updated_intelligence
     )
 
+
+@app.post("/honeypot/stream")
+async def honeypot_stream_endpoint(payload: HoneypotRequest, api_key: str = Depends(verify_api_key)):
+    """
+    Streaming variant of /honeypot.
+    Emits newline-delimited JSON: {"type": "token", "text": ...} frames while the agent
+    is typing, then one {"type": "final", "response": <HoneypotResponse>} frame.
+    """
+    is_scam, scam_type, updated_intelligence = _analyze_honeypot_turn(payload)
+    chunks = ConversationManager.stream_response(
+        payload.conversation_id, payload.message, scam_type, client_id=api_key
+    )
+
+    # Wait for the first chunk so an overload can still be answered with a 429 status
+    try:
+        first = [await chunks.__anext__()]
+    except StopAsyncIteration:
+        first = []
+    except Overloaded as e:
+        raise _too_busy(e)
+
+    async def frames():
+        parts = list(first)
+        for chunk in first:
+            yield json.dumps({"type": "token", "text": chunk}) + "\n"
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield json.dumps({"type": "token", "text": chunk}) + "\n"
+
+        _store_intelligence(payload.conversation_id, updated_intelligence)
+        final = HoneypotResponse(
+            scam_detected=is_scam,
+            response="".join(parts).strip(),
+            intelligence=updated_intelligence
+        )
+        yield json.dumps({"type": "final", "response": final.dict()}) + "\n"
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+@app.get("/intel/search")
+def intel_search(value: str, kind: Optional[str] = None, limit: int = 100, api_key: str = Depends(verify_api_key)):
+    # Sessions (on this worker) that mentioned a UPI ID, account, phone or URL; every kind is tried without `kind`
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown kind '{kind}', expected one of {', '.join(KINDS)}")
+    if ConversationManager._intel is None:
+        raise HTTPException(status_code=503, detail="Intelligence index is disabled (INTEL_INDEX=off)")
+    return {"query": value, "results": ConversationManager._intel.search(value, kind, max(limit, 0))}
+
+
+def create_app() -> FastAPI:
+    """
+    App factory for gunicorn (gunicorn.conf.py). Personas and extraction patterns are built at
+    import; this also builds the detector's keyword matcher, otherwise built on first use, so with
+    preload_app all of them exist once in the master and are shared copy-on-write by the workers.
+    """
+    ScamDetector._get_matcher()
+    return app
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
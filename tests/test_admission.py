@@ -0,0 +1,160 @@
+"""
+Test Admission Control (bounded queue, per-key limits, deadlines and slot handoff)
+"""
+
+import asyncio
+import threading
+import time
+import concurrent.futures
+
+import pytest
+from app.admission import AdmissionController, Overloaded
+
+
+def release(controller, client_id="key"):
+    controller.release_after(client_id, None, time.perf_counter())
+
+
+def test_full_queue_is_refused():
+    """Test that a request is refused at once when all slots are busy and the queue is full"""
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=1)
+        deadline = asyncio.get_running_loop().time() + 10
+        await controller.acquire("key", deadline)
+        waiting = asyncio.ensure_future(controller.acquire("key", deadline))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as refused:
+            await controller.acquire("key", deadline)
+        release(controller)
+        await waiting
+        return controller, refused.value
+
+    controller, error = asyncio.run(run())
+
+    assert error.reason == "queue_full"
+    assert (controller.admitted, controller.rejected, controller.in_flight) == (2, 1, 1)
+
+
+def test_per_key_limit():
+    """Test that one API key cannot hold more than per_key_limit slots while others still can"""
+    async def run():
+        controller = AdmissionController(max_in_flight=10, max_queue=10, per_key_limit=2)
+        deadline = asyncio.get_running_loop().time() + 10
+        await controller.acquire("greedy", deadline)
+        await controller.acquire("greedy", deadline)
+        with pytest.raises(Overloaded) as refused:
+            await controller.acquire("greedy", deadline)
+        await controller.acquire("polite", deadline)
+        hedge_allowed = controller.try_acquire("greedy")
+        release(controller, "greedy")
+        await controller.acquire("greedy", deadline)
+        return refused.value, hedge_allowed
+
+    error, hedge_allowed = asyncio.run(run())
+
+    assert error.reason == "per_key_limit"
+    assert hedge_allowed is False
+
+
+def test_expected_wait_past_deadline_is_refused():
+    """Test that a request whose expected queue wait would eat its deadline is refused up front"""
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        controller._service_times.append(5.0)
+        loop = asyncio.get_running_loop()
+        await controller.acquire("key", loop.time() + 60)
+        with pytest.raises(Overloaded) as refused:
+            await controller.acquire("key", loop.time() + 1)
+        return controller, refused.value
+
+    controller, error = asyncio.run(run())
+
+    assert error.reason == "deadline"
+    assert error.retry_after == pytest.approx(5.0)
+    assert controller.queue_depth == 0
+
+
+def test_release_hands_slot_to_oldest_waiter():
+    """Test that a freed slot goes to waiters in arrival order without dropping in_flight"""
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        deadline = asyncio.get_running_loop().time() + 10
+        await controller.acquire("a", deadline)
+        order = []
+
+        async def wait(client_id):
+            await controller.acquire(client_id, deadline)
+            order.append(client_id)
+
+        waiters = [asyncio.ensure_future(wait(client_id)) for client_id in ("b", "c", "d")]
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 3
+        # A waiter that gives up leaves the line without taking a slot
+        waiters[1].cancel()
+        for client_id in ("a", "b"):
+            release(controller, client_id)
+            await asyncio.sleep(0)
+            assert controller.in_flight == 1
+        await asyncio.gather(*waiters, return_exceptions=True)
+        release(controller, "d")
+        return controller, order
+
+    controller, order = asyncio.run(run())
+
+    assert order == ["b", "d"]
+    assert (controller.in_flight, controller.queue_depth, controller._per_key) == (0, 0, {})
+
+
+def test_slot_held_until_pool_task_finishes():
+    """Test that a caller timing out does not free the slot while the pool thread is still busy"""
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    finish = threading.Event()
+
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=0)
+        loop = asyncio.get_running_loop()
+        await controller.acquire("key", loop.time() + 10)
+        task = executor.submit(finish.wait, 5)
+        controller.release_after("key", task, time.perf_counter())
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.wrap_future(task), timeout=0.01)
+        held = controller.in_flight
+        with pytest.raises(Overloaded):
+            await controller.acquire("other", loop.time() + 10)
+        finish.set()
+        while controller.in_flight:
+            await asyncio.sleep(0.01)
+        return held
+
+    try:
+        assert asyncio.run(run()) == 1
+    finally:
+        finish.set()
+        executor.shutdown()
+
+
+def test_hedged_call_takes_its_own_slot(monkeypatch):
+    """Test that a hedge holds a second slot and both stay held past the deadline until their threads finish"""
+    from app.agent import ConversationManager
+
+    finish = threading.Event()
+    monkeypatch.setattr(ConversationManager, "_call_gemini",
+                        classmethod(lambda cls, prompt, model_name, timeout: finish.wait(5) and "reply"))
+    monkeypatch.setattr(ConversationManager, "_admission", AdmissionController(max_in_flight=4, max_queue=4))
+    monkeypatch.setattr(ConversationManager._router, "hedge_delay", lambda backend: 0.01)
+
+    async def run():
+        controller = ConversationManager._admission
+        loop = asyncio.get_running_loop()
+        with pytest.raises(asyncio.TimeoutError):
+            await ConversationManager._call_gemini_async("prompt", loop.time() + 0.1, "key")
+        held = controller.in_flight
+        finish.set()
+        while controller.in_flight:
+            await asyncio.sleep(0.01)
+        return held, controller.admitted
+
+    try:
+        assert asyncio.run(run()) == (2, 2)
+    finally:
+        finish.set()
@@ -0,0 +1,28 @@
+"""
+Test Intelligence Index (saving from several workers)
+"""
+
+from app.intel_index import IntelIndex
+
+
+def test_workers_saving_to_one_path_keep_each_others_entities(tmp_path):
+    """Test that every worker's entities survive when all of them save on shutdown"""
+    path = str(tmp_path / "intel.json")
+    first, second = IntelIndex(), IntelIndex()
+    first.add("s1", [("upi", "shared@ybl"), ("phone", "9876543210")], "Ramesh Kumar", ts=1.0)
+    second.add("s2", [("upi", "SHARED@ybl"), ("url", "kyc.tk")], ts=2.0)
+
+    first.save(path)
+    second.save(path)
+    # A restarted worker starts from the merged file and saves it again unchanged
+    restarted = IntelIndex.load(path)
+    restarted.save(path)
+    loaded = IntelIndex.load(path)
+
+    shared = loaded.lookup("upi", "shared@ybl")
+    assert shared["sessions"] == 2
+    assert (shared["first_seen"], shared["last_seen"]) == (1.0, 2.0)
+    assert shared["personas"] == {"Ramesh Kumar": 1, "unknown": 1}
+    assert loaded.lookup("phone", "9876543210")["session_ids"] == ["s1"]
+    assert loaded.lookup("url", "kyc.tk")["session_ids"] == ["s2"]
+    assert loaded.stats() == {"entities": 3, "sessions": 2, "postings": 4}
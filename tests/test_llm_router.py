@@ -0,0 +1,146 @@
+"""
+Test LLM Router (model ranking, benching, failover and hedged calls)
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.admission import AdmissionController
+from app.agent import ConversationManager
+from app.llm_router import Backend, LLMRouter
+
+
+def record(router, backend, latencies):
+    for latency in latencies:
+        router.record_success(backend, latency)
+
+
+def test_ranked_orders_by_expected_latency():
+    """Test that unmeasured models come first, then the fastest after counting errors"""
+    fast, flaky, slow, new = Backend("fast"), Backend("flaky"), Backend("slow"), Backend("new")
+    router = LLMRouter([slow, flaky, fast, new])
+    record(router, fast, [0.2] * 10)
+    record(router, slow, [0.5] * 10)
+    # Faster than `fast` when it answers, but half its calls fail
+    record(router, flaky, [0.15] * 5)
+    for _ in range(5):
+        router.record_failure(flaky)
+        router.record_success(flaky, 0.15)
+
+    assert [b.model_name for b in router.ranked()] == ["new", "fast", "flaky", "slow"]
+
+
+def test_hedge_delay_is_the_p95_once_known():
+    """Test that the hedge waits for the model's p95, and only with hedging on and enough samples"""
+    backend = Backend("m")
+    router = LLMRouter([backend], hedge=True, hedge_min_samples=20)
+    record(router, backend, [0.1] * 18)
+    assert router.hedge_delay(backend) is None
+
+    record(router, backend, [0.9, 1.0])
+    assert router.hedge_delay(backend) == pytest.approx(1.0)
+    assert LLMRouter([backend], hedge=False, hedge_min_samples=20).hedge_delay(backend) is None
+
+
+def test_failing_model_is_benched_then_retried():
+    """Test that max_failures errors in a row bench a model, and one failed trial after the cooldown benches it again"""
+    primary, backup = Backend("primary"), Backend("backup")
+    router = LLMRouter([primary, backup], max_failures=3, cooldown=0.1)
+    record(router, primary, [0.1])
+    record(router, backup, [0.5])
+
+    for _ in range(2):
+        router.record_failure(primary)
+    assert router.ranked()[0] is primary
+    router.record_failure(primary)
+    assert router.ranked() == [backup, primary]
+
+    time.sleep(0.15)
+    assert primary.healthy(time.monotonic())
+    router.record_failure(primary)
+    assert router.ranked() == [backup, primary]
+
+    time.sleep(0.15)
+    router.record_success(primary, 0.1)
+    assert router.ranked()[0] is primary
+    assert primary.consecutive_failures == 0
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """ConversationManager routing between model-a and model-b with hedging on, and fresh admission"""
+    model_a, model_b = Backend("model-a"), Backend("model-b")
+    router = LLMRouter([model_a, model_b], hedge=True, hedge_min_samples=5)
+    record(router, model_a, [0.01] * 5)
+    record(router, model_b, [0.5] * 5)
+    monkeypatch.setattr(ConversationManager, "_router", router)
+    monkeypatch.setattr(ConversationManager, "_admission", AdmissionController(max_in_flight=4, max_queue=4))
+    return model_a, model_b
+
+
+def fake_call(delays, calls):
+    """_call_gemini replacement: sleeps per model, raises when the delay is an exception"""
+    def call(cls, full_prompt, model_name=None, timeout=None):
+        calls.append(model_name)
+        delay = delays[model_name]
+        if isinstance(delay, Exception):
+            raise delay
+        time.sleep(delay)
+        return f"reply from {model_name}"
+    return classmethod(call)
+
+
+def call_gemini(timeout=2.0):
+    """_call_gemini_async, then wait until every pool task has given its admission slot back"""
+    async def run():
+        loop = asyncio.get_running_loop()
+        reply = await ConversationManager._call_gemini_async("prompt", loop.time() + timeout, "key")
+        while ConversationManager._admission.in_flight:
+            await asyncio.sleep(0.01)
+        return reply
+    return asyncio.run(run())
+
+
+def test_error_fails_over_to_the_next_model(models, monkeypatch):
+    """Test that a model error is answered by the next model and counted against the first"""
+    model_a, _ = models
+    monkeypatch.setattr(ConversationManager._router, "hedge", False)
+    calls = []
+    monkeypatch.setattr(ConversationManager, "_call_gemini",
+                        fake_call({"model-a": RuntimeError("429 quota exceeded"), "model-b": 0}, calls))
+
+    assert call_gemini() == "reply from model-b"
+    assert calls == ["model-a", "model-b"]
+    assert model_a.consecutive_failures == 1
+
+
+def test_slow_call_is_hedged_and_both_slots_are_released(models, monkeypatch):
+    """Test that a call past its p95 is duplicated on the next model, the faster reply wins and both slots come back"""
+    model_a, _ = models
+    calls = []
+    monkeypatch.setattr(ConversationManager, "_call_gemini", fake_call({"model-a": 0.3, "model-b": 0}, calls))
+
+    start = time.perf_counter()
+    reply = call_gemini()
+
+    admission = ConversationManager._admission
+    assert reply == "reply from model-b"
+    assert calls == ["model-a", "model-b"]
+    assert (admission.admitted, admission.in_flight, admission._per_key) == (2, 0, {})
+    # Released only once the slow thread finished, not when its caller gave up on it
+    assert time.perf_counter() - start >= 0.3
+    # The hedged-away call still counts as a (lower bound) latency sample
+    assert model_a.latencies[-1] > 0.01
+
+
+def test_no_hedge_without_a_free_slot(models, monkeypatch):
+    """Test that the hedge is skipped when admission has no slot to spare"""
+    calls = []
+    monkeypatch.setattr(ConversationManager, "_call_gemini", fake_call({"model-a": 0.05, "model-b": 0}, calls))
+    monkeypatch.setattr(ConversationManager, "_admission", AdmissionController(max_in_flight=1, max_queue=4))
+
+    assert call_gemini() == "reply from model-a"
+    assert calls == ["model-a"]
+    assert ConversationManager._admission.admitted == 1
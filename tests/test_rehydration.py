@@ -0,0 +1,126 @@
+"""
+Test Session Rehydration (rebuilding sessions from conversationHistory)
+"""
+
+import pytest
+
+from app import agent
+from app.agent import ConversationManager
+from app.personas import PersonaManager
+from app.rehydration import SessionRehydrator
+from app.state_store import MemoryStateStore
+
+HISTORY = [
+    {"sender": "scammer", "text": "Your bank account is blocked, verify KYC now", "timestamp": 1},
+    {"sender": "user", "text": "Oh no, what should I do?", "timestamp": 2},
+    {"sender": "scammer", "text": "Pay Rs 10 to fraud@ybl or call 9876543210", "timestamp": 3},
+    {"sender": "user", "text": "Which app beta?", "timestamp": 4},
+]
+
+
+def store():
+    return MemoryStateStore(max_sessions=100, ttl_seconds=3600)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """ConversationManager with fresh in-memory sessions and rehydration cache"""
+    monkeypatch.setattr(ConversationManager, "_store", store())
+    monkeypatch.setattr(ConversationManager, "_archive", None)
+    monkeypatch.setattr(ConversationManager, "_rehydrator", SessionRehydrator(store()))
+    return ConversationManager
+
+
+def test_rebuild_restores_persona_turns_and_intelligence():
+    """Test that replaying the history gives the session the live turns would have built"""
+    messages = SessionRehydrator.parse(HISTORY + [{"sender": "scammer", "text": ""}])
+
+    session = SessionRehydrator.rebuild(messages)
+
+    assert session.scam_type == "financial"
+    assert session.persona == PersonaManager.get_persona("financial")
+    assert session.turn_count == 2
+    assert session.message_count == 4
+    assert session.recent() == [("user" if e["sender"] == "scammer" else "model", e["text"]) for e in HISTORY]
+    assert session.intelligence["upi_id"] == "fraud@ybl"
+    assert session.intelligence["phone_number"] == "9876543210"
+    assert session.intelligence["scam_type"] == "financial"
+    assert session.intelligence["confidence_score"] > 0
+    assert session.take_spill() == []
+
+
+def test_rehydrated_session_continues_in_the_right_phase(manager, monkeypatch):
+    """Test that the next prompt for a rebuilt long conversation uses its persona and later phase"""
+    monkeypatch.setattr(agent, "SESSION_REHYDRATE", "missing")
+    messages = SessionRehydrator.parse(HISTORY)
+    messages += [("user", "Hurry up, send it"), ("model", "Network is slow beta")] * 3
+    manager.resume_session("conv", messages)
+
+    session, prompt, _ = manager._build_prompt("conv", ["Why is it not done yet?"], "lottery")
+
+    assert session.turn_count == 6
+    assert session.persona == PersonaManager.get_persona("financial")
+    assert session.persona["prompt"] in prompt
+    assert "CURRENT STRATEGY PHASE: DEEP_EXTRACTION (Turn 6)" in prompt
+
+
+def test_history_hash_cache_hit_and_miss():
+    """Test that an identical history is served from the cache and any change misses it"""
+    rehydrator = SessionRehydrator(store())
+    messages = SessionRehydrator.parse(HISTORY)
+
+    first = rehydrator.rehydrate(messages)
+    second = rehydrator.rehydrate(list(messages))
+    edited = rehydrator.rehydrate(messages[:-1] + [("model", "Which app, beta?")])
+
+    assert (rehydrator.hits, rehydrator.misses) == (1, 2)
+    assert second.to_dict() == first.to_dict()
+    # A hit is a copy: updating its intelligence leaves the cached entry alone
+    second.intelligence["upi_id"] = "changed@ybl"
+    assert rehydrator.rehydrate(messages).intelligence["upi_id"] == "fraud@ybl"
+    assert edited.recent()[-1] == ("model", "Which app, beta?")
+
+
+def test_missing_mode_prefers_stored_state(manager, monkeypatch):
+    """Test that SESSION_REHYDRATE=missing only rebuilds sessions this worker does not have"""
+    monkeypatch.setattr(agent, "SESSION_REHYDRATE", "missing")
+    messages = SessionRehydrator.parse(HISTORY)
+    stored = SessionRehydrator.rebuild(messages[:2])
+    manager.save_session("known", stored)
+
+    assert manager.resume_session("known", messages).turn_count == 1
+    assert manager.resume_session("unknown", messages).turn_count == 2
+    assert manager.get_session("unknown").turn_count == 2
+    assert manager._rehydrator.misses == 1
+
+
+def test_always_mode_ignores_stored_state(manager, monkeypatch):
+    """Test that SESSION_REHYDRATE=always rebuilds from the history even when state is stored"""
+    monkeypatch.setattr(agent, "SESSION_REHYDRATE", "always")
+    messages = SessionRehydrator.parse(HISTORY)
+    manager.save_session("known", SessionRehydrator.rebuild(messages[:2]))
+
+    assert manager.resume_session("known", messages).turn_count == 2
+    # No history means a first turn: stale state must not carry over
+    assert manager.resume_session("known", []) is None
+    assert manager.get_session("known") is None
+
+
+def test_remembered_turn_serves_the_extended_history(manager, monkeypatch):
+    """Test that after remember_turn the client's next history is a cache hit"""
+    monkeypatch.setattr(agent, "SESSION_REHYDRATE", "always")
+    messages = SessionRehydrator.parse(HISTORY)
+    session = manager.resume_session("conv", messages)
+    turn = [("user", "Send the OTP now"), ("model", "Which OTP beta?")]
+    for role, text in turn:
+        session.add(role, text)
+    manager.save_session("conv", session)
+
+    manager.remember_turn("conv", messages + turn)
+    resumed = manager.resume_session("other_worker", messages + turn)
+
+    rehydrator = manager._rehydrator
+    assert (rehydrator.hits, rehydrator.misses) == (1, 1)
+    assert resumed.turn_count == 3
+    assert resumed.recent() == (messages + turn)[-resumed.window:]
+    assert resumed.intelligence["upi_id"] == "fraud@ybl"
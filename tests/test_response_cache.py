@@ -0,0 +1,17 @@
+"""
+Test Response Cache keys
+"""
+
+from app.response_cache import ResponseCache
+
+
+def test_key_covers_roles_and_turn():
+    """Test that the key separates coalesced user/user turns from user/model ones and different turns"""
+    coalesced = [("user", "Pay now"), ("user", "Send OTP")]
+    answered = [("user", "Pay now"), ("model", "Send OTP")]
+
+    key = ResponseCache.make_key("Ramesh", "TRUST_BUILDING", 2, coalesced)
+
+    assert key != ResponseCache.make_key("Ramesh", "TRUST_BUILDING", 2, answered)
+    assert key != ResponseCache.make_key("Ramesh", "TRUST_BUILDING", 1, coalesced)
+    assert key == ResponseCache.make_key("Ramesh", "TRUST_BUILDING", 2, [("user", "PAY NOW!"), ("user", "send  otp")])
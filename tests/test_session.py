@@ -0,0 +1,107 @@
+"""
+Test Session Records (ring-buffer window, serialization and transcript spill)
+"""
+
+from app.config import SESSION_WINDOW
+from app.session import SessionRecord, TranscriptArchive
+
+
+def conversation(turns):
+    """Alternating scammer/agent messages, two per turn"""
+    messages = []
+    for i in range(turns):
+        messages.append(("user", f"scammer {i}"))
+        messages.append(("model", f"agent {i}"))
+    return messages
+
+
+def filled(messages, window=4):
+    record = SessionRecord("financial", "financial", window=window)
+    for role, text in messages:
+        record.add(role, text)
+    return record
+
+
+def test_ring_buffer_wraps_at_capacity():
+    """Test that only the last `window` messages are kept, oldest first, and the rest are spilled"""
+    messages = conversation(5)
+    record = filled(messages)
+
+    assert record.recent() == messages[-4:]
+    assert record.message_count == 10
+    assert record.take_spill() == list(enumerate(messages[:-4]))
+    assert record.take_spill() == []
+
+    record.add("user", "scammer 5")
+    assert record.recent() == messages[-3:] + [("user", "scammer 5")]
+    assert record.take_spill() == [(6, messages[6])]
+
+
+def test_turn_count_is_kept_on_append():
+    """Test that turn_count counts scammer messages as they are added, not by rescanning the window"""
+    record = filled(conversation(5))
+
+    assert record.turn_count == 5
+    # Only the counter is read: the window holds just two of the five scammer messages
+    assert sum(role == "user" for role, _ in record.recent()) == 2
+    record._ring = [None] * record.window
+    assert record.turn_count == 5
+
+    record.add("model", "agent 5")
+    assert record.turn_count == 5
+
+
+def test_dict_round_trip_keeps_the_window_in_place():
+    """Test that from_dict(to_dict()) restores the window, counters and intelligence"""
+    # Records are rebuilt with the configured window, so fill one of that size past capacity
+    messages = conversation(SESSION_WINDOW)
+    record = filled(messages, window=SESSION_WINDOW)
+    record.take_spill()
+    record.intelligence = {"upi_id": "fraud@ybl"}
+
+    restored = SessionRecord.from_dict(record.to_dict())
+
+    assert restored.to_dict() == record.to_dict()
+    assert restored.persona == record.persona
+    # The next message overwrites the oldest one, as it would have before the round trip
+    restored.add("user", "one more")
+    record.add("user", "one more")
+    assert restored.recent() == record.recent()
+    assert restored.take_spill() == record.take_spill() == [(SESSION_WINDOW, messages[SESSION_WINDOW])]
+
+
+def test_legacy_history_format_is_loaded():
+    """Test that sessions stored as {"history": [...]} load without spilling what was already stored"""
+    messages = conversation(6)
+    legacy = {
+        "scam_type": "lottery",
+        "persona": {"name": "old copy"},
+        "history": [{"role": role, "parts": [text]} for role, text in messages],
+        "intelligence": {"phone_number": "9876543210"},
+    }
+
+    record = SessionRecord.from_dict(legacy)
+
+    assert record.persona_key == "lottery"
+    assert record.turn_count == 6
+    assert record.message_count == 12
+    assert record.recent() == messages[-record.window:]
+    assert record.intelligence == {"phone_number": "9876543210"}
+    assert record.take_spill() == []
+
+
+def test_evicted_turns_are_archived_in_order(tmp_path):
+    """Test that spilled messages land in SQLite and the archive plus the window is the full transcript"""
+    archive = TranscriptArchive(str(tmp_path / "transcripts.db"))
+    messages = conversation(7)
+    record = SessionRecord("financial", "financial", window=4)
+    for i, (role, text) in enumerate(messages):
+        record.add(role, text)
+        if i % 3 == 0:  # saved every few messages, like the manager does per turn
+            archive.append("conv_1", record.take_spill())
+    archive.append("conv_1", record.take_spill())
+    archive.append("conv_2", [(0, ("user", "other conversation"))])
+
+    assert archive.load("conv_1") + record.recent() == messages
+    assert archive.load("conv_2") == [("user", "other conversation")]
+    assert archive.load("missing") == []
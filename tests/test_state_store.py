@@ -0,0 +1,45 @@
+"""
+Test State Stores (Redis session count)
+"""
+
+import fnmatch
+import time
+
+from app.state_store import RedisStateStore
+
+
+class FakeRedis:
+    """The redis-py calls RedisStateStore makes, without expiry, counting SCANs"""
+
+    def __init__(self):
+        self.data = {}
+        self.scans = 0
+
+    def getex(self, key, ex=None):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match="*", count=None):
+        self.scans += 1
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+
+def test_len_scans_at_most_once_per_count_ttl():
+    """Test that repeated /metrics reads of len() reuse one SCAN until count_ttl_seconds pass"""
+    client = FakeRedis()
+    store = RedisStateStore(client=client, ttl_seconds=60, count_ttl_seconds=0.2)
+    other_worker = RedisStateStore(client=client, ttl_seconds=60)
+    store.set("conv_1", {"turn_count": 1})
+
+    assert [len(store) for _ in range(100)] == [1] * 100
+    other_worker.set("conv_2", {"turn_count": 1})
+    assert len(store) == 1
+    time.sleep(0.25)
+
+    assert len(store) == 2
+    assert client.scans == 2
@@ -0,0 +1,160 @@
+"""
+Test Streaming Replies (stream_response and /honeypot/stream with a fake Gemini stream)
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app import agent
+from app.admission import AdmissionController
+from app.agent import ConversationManager
+from app.llm_router import Backend, LLMRouter
+from app.state_store import MemoryStateStore
+from app.turn_coalescer import TurnCoalescer
+
+SCAM_MESSAGE = "Your bank account is blocked, verify KYC now"
+NETWORK_TROUBLE = "I am having some network trouble, please wait."
+
+
+class ResourceExhausted(Exception):
+    """Stands in for the SDK's 429 quota error"""
+
+
+def fake_stream(script):
+    """_stream_gemini replacement: per model, the chunks to send; an exception in the list is raised there"""
+    def stream(cls, full_prompt, model_name=None, timeout=None):
+        for item in script[model_name]:
+            if isinstance(item, Exception):
+                raise item
+            if isinstance(item, float):
+                time.sleep(item)
+                continue
+            yield item
+    return classmethod(stream)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """ConversationManager with two models, fresh sessions and no reply cache"""
+    monkeypatch.setattr(agent, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(ConversationManager, "_store", MemoryStateStore(max_sessions=100, ttl_seconds=3600))
+    monkeypatch.setattr(ConversationManager, "_archive", None)
+    monkeypatch.setattr(ConversationManager, "_cache", None)
+    monkeypatch.setattr(ConversationManager, "_rehydrator", None)
+    monkeypatch.setattr(ConversationManager, "_turns", TurnCoalescer())
+    monkeypatch.setattr(ConversationManager, "_admission", AdmissionController(max_in_flight=4, max_queue=4))
+    monkeypatch.setattr(ConversationManager, "_router", LLMRouter([Backend("model-a"), Backend("model-b")]))
+    return ConversationManager
+
+
+def collect(manager, conversation_id="conv", message=SCAM_MESSAGE):
+    async def run():
+        return [chunk async for chunk in manager.stream_response(conversation_id, message, "financial")]
+    return asyncio.run(run())
+
+
+def test_stream_sends_chunks_and_saves_the_turn(manager, monkeypatch):
+    """Test that chunks are passed on as they come and the full reply is stored"""
+    monkeypatch.setattr(manager, "_stream_gemini", fake_stream({"model-a": [" Oh no,", " which", " bank?"]}))
+
+    chunks = collect(manager)
+
+    assert chunks == ["Oh no,", " which", " bank?"]
+    assert manager.get_session("conv").recent() == [("user", SCAM_MESSAGE), ("model", "Oh no, which bank?")]
+    assert manager._admission.in_flight == 0
+
+
+def test_quota_error_before_first_chunk_fails_over(manager, monkeypatch):
+    """Test that a 429 before anything was sent is retried on the next model"""
+    monkeypatch.setattr(manager, "_stream_gemini", fake_stream({
+        "model-a": [ResourceExhausted("429 quota exceeded")],
+        "model-b": ["Which", " bank?"],
+    }))
+
+    chunks = collect(manager)
+
+    assert chunks == ["Which", " bank?"]
+    model_a, model_b = manager._router.backends
+    assert (model_a.consecutive_failures, model_b.consecutive_failures) == (1, 0)
+    assert manager.get_session("conv").recent()[-1] == ("model", "Which bank?")
+
+
+def test_failure_mid_stream_keeps_the_turn(manager, monkeypatch):
+    """Test that an error after chunks were sent ends the stream and still stores the message and partial reply"""
+    monkeypatch.setattr(manager, "_stream_gemini", fake_stream({
+        "model-a": ["Oh no,", " which", ConnectionError("stream reset")],
+        "model-b": ["never", " used"],
+    }))
+
+    chunks = collect(manager)
+
+    assert chunks == ["Oh no,", " which"]
+    assert manager.get_session("conv").recent() == [("user", SCAM_MESSAGE), ("model", "Oh no, which")]
+
+
+def test_timeout_mid_stream_keeps_the_turn(manager, monkeypatch):
+    """Test that a stream running past the deadline stores what was sent before it"""
+    monkeypatch.setattr(agent, "LLM_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(manager, "_stream_gemini", fake_stream({"model-a": ["Oh no,", 0.5, " which"]}))
+
+    chunks = collect(manager)
+
+    assert chunks == ["Oh no,"]
+    assert manager.get_session("conv").recent() == [("user", SCAM_MESSAGE), ("model", "Oh no,")]
+
+
+def test_failure_before_any_chunk_keeps_the_message(manager, monkeypatch):
+    """Test that when every model fails the fallback is sent and the scammer's message is still stored"""
+    monkeypatch.setattr(manager, "_stream_gemini", fake_stream({
+        "model-a": [ResourceExhausted("429 quota exceeded")],
+        "model-b": [ResourceExhausted("429 quota exceeded")],
+    }))
+
+    assert collect(manager) == [NETWORK_TROUBLE]
+    session = manager.get_session("conv")
+    assert session.recent() == [("user", SCAM_MESSAGE)]
+    assert session.turn_count == 1
+
+
+def stream_endpoint(message, conversation_id):
+    """POST /honeypot/stream and return the decoded NDJSON frames"""
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("fastapi")
+    import main
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            return await api.post(
+                "/honeypot/stream",
+                json={"conversation_id": conversation_id, "message": message},
+                headers={"X-API-Key": "test-api-key"},
+            )
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+@pytest.mark.parametrize("script, tokens, reply", [
+    ({"model-a": ["Send", " me", " your UPI"]}, ["Send", " me", " your UPI"], "Send me your UPI"),
+    ({"model-a": [ResourceExhausted("429 quota exceeded")], "model-b": [ResourceExhausted("429")]},
+     [NETWORK_TROUBLE], NETWORK_TROUBLE),
+    ({"model-a": ["Send", " me", ConnectionError("stream reset")]}, ["Send", " me"], "Send me"),
+])
+def test_stream_endpoint_frames(manager, monkeypatch, script, tokens, reply):
+    """Test that /honeypot/stream sends token frames then a final frame, also when the stream fails"""
+    monkeypatch.setattr(manager, "_stream_gemini", fake_stream(script))
+
+    frames = stream_endpoint("Pay to fraud@ybl now or your account is blocked", "stream_conv")
+
+    assert [f["type"] for f in frames] == ["token"] * len(tokens) + ["final"]
+    assert [f["text"] for f in frames[:-1]] == tokens
+    final = frames[-1]["response"]
+    assert final["response"] == reply
+    assert final["intelligence"]["upi_id"] == "fraud@ybl"
+    assert manager.get_session("stream_conv").turn_count == 1
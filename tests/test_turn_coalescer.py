@@ -0,0 +1,161 @@
+"""
+Test Turn Coalescer (per-conversation serialization, merged turns and failures)
+"""
+
+import asyncio
+
+import pytest
+
+from app import agent
+from app.admission import Overloaded
+from app.agent import ConversationManager
+from app.metrics import COALESCED_MESSAGES
+from app.state_store import MemoryStateStore
+from app.turn_coalescer import TurnCoalescer
+
+
+def test_overlapping_turns_are_serialized_and_merged():
+    """Test that a conversation runs one turn at a time and messages sent meanwhile form the next turn"""
+    coalescer = TurnCoalescer()
+    running = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    batches = []
+
+    async def send(conversation_id, message):
+        async with coalescer.turn(conversation_id, message) as turn:
+            if turn.answered:
+                return turn.reply
+            batches.append(list(turn.items))
+            running[conversation_id] += 1
+            peak[conversation_id] = max(peak[conversation_id], running[conversation_id])
+            await asyncio.sleep(0.02)
+            running[conversation_id] -= 1
+            turn.resolve("+".join(turn.items))
+            return turn.reply
+
+    async def run():
+        return await asyncio.gather(*[send(cid, f"{cid}{i}") for i in range(3) for cid in ("a", "b")])
+
+    asyncio.run(run())
+
+    assert peak == {"a": 1, "b": 1}
+    assert sorted(batches) == [["a0"], ["a1", "a2"], ["b0"], ["b1", "b2"]]
+    assert len(coalescer) == 0
+
+
+def test_joint_reply_goes_to_every_waiter():
+    """Test that the callers whose messages were merged receive the reply without running a turn"""
+    coalescer = TurnCoalescer()
+    coalesced = COALESCED_MESSAGES.value()
+    ran = []
+
+    async def send(message):
+        async with coalescer.turn("c", message) as turn:
+            if turn.answered:
+                return turn.reply
+            ran.append(message)
+            await asyncio.sleep(0.02)
+            turn.resolve(f"reply to {' / '.join(turn.items)}")
+            return turn.reply
+
+    async def run():
+        first = asyncio.ensure_future(send("m0"))
+        await asyncio.sleep(0.005)
+        return await asyncio.gather(first, send("m1"), send("m2"), send("m3"))
+
+    replies = asyncio.run(run())
+
+    assert replies == ["reply to m0"] + ["reply to m1 / m2 / m3"] * 3
+    assert ran == ["m0", "m1"]
+    assert COALESCED_MESSAGES.value() == coalesced + 2
+
+
+def test_error_reaches_its_caller_and_queued_messages_move_on():
+    """Test that a failing turn raises in its own caller and the messages it held go to the next caller"""
+    coalescer = TurnCoalescer()
+
+    async def send(message, fail=False):
+        async with coalescer.turn("c", message) as turn:
+            if turn.answered:
+                return turn.reply
+            await asyncio.sleep(0.02)
+            if fail:
+                raise RuntimeError("LLM down")
+            turn.resolve("+".join(turn.items))
+            return turn.reply
+
+    async def run():
+        first = asyncio.ensure_future(send("m0"))
+        await asyncio.sleep(0.005)
+        return await asyncio.gather(first, send("m1", fail=True), send("m2"), send("m3"), return_exceptions=True)
+
+    first, failed, second, third = asyncio.run(run())
+
+    assert first == "m0"
+    assert isinstance(failed, RuntimeError)
+    # m1 failed on its own; m2 and m3 were queued with it and answered together afterwards
+    assert second == third == "m2+m3"
+    assert len(coalescer) == 0
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """ConversationManager with fresh sessions and coalescer, and no reply cache"""
+    monkeypatch.setattr(agent, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(ConversationManager, "_store", MemoryStateStore(max_sessions=100, ttl_seconds=3600))
+    monkeypatch.setattr(ConversationManager, "_archive", None)
+    monkeypatch.setattr(ConversationManager, "_cache", None)
+    monkeypatch.setattr(ConversationManager, "_turns", TurnCoalescer())
+    return ConversationManager
+
+
+def test_generate_response_answers_a_burst_with_one_call(manager, monkeypatch):
+    """Test that messages sent while a turn runs cost one more LLM call and all land in the session"""
+    prompts = []
+
+    async def fake_llm(cls, full_prompt, deadline, client_id="anonymous"):
+        prompts.append(full_prompt)
+        await asyncio.sleep(0.02)
+        return f"Reply {len(prompts)}"
+    monkeypatch.setattr(manager, "_call_gemini_async", classmethod(fake_llm))
+
+    async def run():
+        first = asyncio.ensure_future(manager.generate_response("conv", "Your KYC expired", "financial"))
+        await asyncio.sleep(0.005)
+        return await asyncio.gather(first, *[
+            manager.generate_response("conv", message, "financial")
+            for message in ("Send OTP", "Hurry up")
+        ])
+
+    replies = asyncio.run(run())
+
+    assert replies == ["Reply 1", "Reply 2", "Reply 2"]
+    assert len(prompts) == 2
+    assert "Scammer: Send OTP\nScammer: Hurry up\nYou: " in prompts[1]
+    session = manager.get_session("conv")
+    assert session.turn_count == 3
+    assert session.recent()[-1] == ("model", "Reply 2")
+
+
+def test_refused_turn_raises_for_each_caller_in_reject_mode(manager, monkeypatch):
+    """Test that with OVERLOAD_MODE=reject a refused turn raises for its caller, and queued callers retry"""
+    monkeypatch.setattr(agent, "OVERLOAD_MODE", "reject")
+    calls = []
+
+    async def refusing_llm(cls, full_prompt, deadline, client_id="anonymous"):
+        calls.append(full_prompt)
+        await asyncio.sleep(0.02)
+        raise Overloaded("queue_full", retry_after=1.0)
+    monkeypatch.setattr(manager, "_call_gemini_async", classmethod(refusing_llm))
+
+    async def run():
+        first = asyncio.ensure_future(manager.generate_response("conv", "Your KYC expired", "financial"))
+        await asyncio.sleep(0.005)
+        return await asyncio.gather(
+            first, manager.generate_response("conv", "Send OTP", "financial"), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, Overloaded) for result in results)
+    assert len(calls) == 2